@@ -1,14 +1,22 @@
-import requests, os, json, re, time
+import os, re
 from bs4 import BeautifulSoup
 from datetime import datetime, date
 from urllib.parse import urljoin
+import http_client
+from rate_limiter import limiter
+from notice_cache import notice_cache
+from cpv_store import cpv_store
+from tender_store import tender_store
+from tender_record import Tender
+from tender_io import find_tender_file
+from tender_log import TenderLog
 
 BASE_URL = "https://www.find-tender.service.gov.uk"
 START_URL = f"{BASE_URL}/Search/Results?sort=unix_published_date%3ADESC"
 OUTPUT_FILE = "output/tender_opportunities.json"
 
 # === Session setup ===
-session = requests.Session()
+# Requests share the pooled, retrying session in http_client
 headers = {"User-Agent": "Mozilla/5.0"}
 
 def parse_date(text):
@@ -17,10 +25,15 @@ def parse_date(text):
     except:
         return None
 
+def fetch_page(url, **kwargs):
+    return http_client.get(url, **kwargs)
+
 def extract_cpv_codes(detail_url):
     try:
-        res = session.get(detail_url, headers=headers, timeout=10)
-        soup = BeautifulSoup(res.content, "html.parser")
+        status, content = notice_cache.get(detail_url, fetch_page, headers=headers)
+        if content is None:
+            return []
+        soup = BeautifulSoup(content, "html.parser")
         ul = soup.find("ul", class_="govuk-list govuk-list--bullet")
         cpvs = []
         if ul:
@@ -36,17 +49,12 @@ def extract_cpv_codes(detail_url):
         return []
 
 def load_existing_data():
-    if not os.path.exists(OUTPUT_FILE):
-        return set(), None, {"tenders": [], "metadata": {}}
-
-    with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
-        tenders = data.get("tenders", [])
-        metadata = data.get("metadata", {})
-        existing_ids = {t["tender_id"] for t in tenders if "tender_id" in t}
-        last_scraped = metadata.get("last_scraped_at")
-        last_scraped_dt = datetime.fromisoformat(last_scraped) if last_scraped else None
-        return existing_ids, last_scraped_dt, data
+    """Known tender ids and the last scrape time from the tender store, importing OUTPUT_FILE on first use"""
+    if not tender_store.count() and os.path.exists(find_tender_file(OUTPUT_FILE)):
+        print(f"📥 Seeding the tender store from {OUTPUT_FILE}: {tender_store.import_json(OUTPUT_FILE)} tenders")
+    last_scraped = tender_store.get_metadata().get("last_scraped_at")
+    last_scraped_dt = datetime.fromisoformat(last_scraped) if last_scraped else None
+    return tender_store.tender_ids(), last_scraped_dt
 
 def scrape_newest_tenders(existing_ids, last_scraped_dt):
     page = 1
@@ -56,7 +64,7 @@ def scrape_newest_tenders(existing_ids, last_scraped_dt):
     while not stop:
         print(f"📄 Page {page}")
         url = f"{START_URL}&page={page}"
-        res = session.get(url, headers=headers)
+        res = fetch_page(url, headers=headers)
         soup = BeautifulSoup(res.content, "html.parser")
         results = soup.find_all("div", class_="search-result")
         if not results:
@@ -96,48 +104,58 @@ def scrape_newest_tenders(existing_ids, last_scraped_dt):
                 stop = True
                 break
 
-            cpv_data = extract_cpv_codes(link)
-            cpv_codes = [cpv["code"] for cpv in cpv_data]
-            cpv_descs = [cpv["description"] for cpv in cpv_data]
-
-            tender = {
-                "title": title,
-                "link": link,
-                "organisation": organisation,
-                "description": description,
-                "details": details,
-                "publication_date_text": details.get("Publication date"),
-                "publication_date_parsed": pub_date.isoformat() if pub_date else None,
-                "scraped_at": scraped_at.isoformat(),
-                "tender_id": tender_id,
-                "cpv_codes": cpv_codes,
-                "cpv_descriptions": cpv_descs
-            }
+            known = cpv_store.get(tender_id)
+            if known:
+                cpv_codes, cpv_descs = known
+            else:
+                cpv_data = extract_cpv_codes(link)
+                cpv_codes = [cpv["code"] for cpv in cpv_data]
+                cpv_descs = [cpv["description"] for cpv in cpv_data]
+                cpv_store.put(tender_id, cpv_codes, cpv_descs)
+
+            tender = Tender(
+                title=title,
+                link=link,
+                organisation=organisation,
+                description=description,
+                details=details,
+                publication_date_text=details.get("Publication date"),
+                publication_date=pub_date,
+                scraped_at=scraped_at,
+                tender_id=tender_id,
+                cpv_codes=cpv_codes,
+                cpv_descriptions=cpv_descs
+            )
             all_new.append(tender)
 
         page += 1
-        time.sleep(1)
 
     return all_new
 
-def append_to_json(new_tenders, existing_data):
+def save_new_tenders(new_tenders):
+    """Upsert new tenders into the tender store, append them to OUTPUT_FILE's log and compact the log
+    into OUTPUT_FILE, so the file, its last_scraped_at and readers of it stay current"""
     if new_tenders:
-        existing_data["tenders"] = new_tenders + existing_data.get("tenders", [])
-        existing_data["metadata"]["last_updated"] = datetime.now().isoformat()
-        existing_data["metadata"]["last_scraped_at"] = max(
-            t["scraped_at"] for t in new_tenders
-        )
-        existing_data["metadata"]["total_tenders"] = len(existing_data["tenders"])
-
+        last_scraped_at = max(t["scraped_at"] for t in new_tenders)
+        tender_store.upsert_tenders(new_tenders)
+        tender_store.set_metadata(last_scraped_at=last_scraped_at)
         os.makedirs(os.path.dirname(OUTPUT_FILE), exist_ok=True)
-        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-            json.dump(existing_data, f, indent=2, ensure_ascii=False)
-        print(f"✅ Appended {len(new_tenders)} new tenders.")
+        tender_log = TenderLog(find_tender_file(OUTPUT_FILE))
+        tender_log.append(new_tenders)
+        tender_log.compact(metadata={'last_updated': datetime.now().isoformat(), 'last_scraped_at': last_scraped_at})
+        print(f"✅ Stored {len(new_tenders)} new tenders.")
     else:
-        print("✅ No new tenders to append.")
+        print("✅ No new tenders to store.")
 
 if __name__ == "__main__":
-    print(f"🚀 Scraping only newest tenders not in JSON yet...")
-    ids, last_scraped, data = load_existing_data()
+    print(f"🚀 Scraping only newest tenders not in the tender store yet...")
+    ids, last_scraped = load_existing_data()
+    if not len(cpv_store):
+        cpv_store.seed(tender_store.iter_tenders())
     new_tenders = scrape_newest_tenders(ids, last_scraped)
-    append_to_json(new_tenders, data)
+    save_new_tenders(new_tenders)
+    cpv_store.save()
+    print(f"🚦 Rate limiter: {limiter.summary()}")
+    print(f"🔌 HTTP client: {http_client.summary()}")
+    print(f"🗄️ Notice cache: {notice_cache.summary()}")
+    print(f"🏷️ CPV store: {cpv_store.summary()}")
@@ -1,25 +1,26 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import json
-import os
 from datetime import datetime
+from dashboard_cache import search_index, tender_table
+from dashboard_data import tender_data_version
+from paginated_table import paginated_table
 
-# Load JSON file
-json_file = "output/tender_opportunities.json"
-if not os.path.exists(json_file):
-    st.error(f"JSON file not found: {json_file}")
-    st.stop()
+# Set page config
+st.set_page_config(page_title="Tender Opportunities Viewer", layout="wide")
 
-# Load and normalize JSON data
-with open(json_file, 'r', encoding='utf-8') as f:
-    data = json.load(f)
+# Tenders from the JSON file and its log (pass tender_store.STORE_SOURCE to read the store instead),
+# flattened and CPV-indexed once per data version for every page
+json_file = "output/tender_opportunities.json"
+# Columns shown until others are picked; every json-normalised column stays available
+TABLE_COLUMNS = ["title", "organisation", "publication_date_parsed", "submission_deadline", "cpv_codes", "link"]
+data_version = tender_data_version(json_file)
+df, cpv_index = tender_table(json_file, data_version)
 
-tenders = data.get("tenders", [])
-df = pd.json_normalize(tenders)
-df['publication_date_parsed'] = pd.to_datetime(df['publication_date_parsed'], errors='coerce')
+if df.empty:
+    st.error(f"No tenders found in {json_file}")
+    st.stop()
 
-# Set page config
-st.set_page_config(page_title="Tender Opportunities Viewer", layout="wide")
 st.title("📋 Tender Opportunities Viewer")
 
 # --- Sidebar ---
@@ -29,11 +30,11 @@ st.sidebar.header("🔍 Filters")
 if st.sidebar.button("🔄 Reset Filters"):
     st.experimental_rerun()
 
-# Search input (title, description, organisation)
+# Search input (title, description, organisation): every word must match the start of a word
 search_term = st.sidebar.text_input("Search by keyword (title/org/desc)").strip().lower()
 
 # CPV Code Filter
-all_cpv_codes = sorted(df['cpv_codes'].explode().dropna().unique().tolist())
+all_cpv_codes = cpv_index.code_texts()
 selected_cpvs = st.sidebar.multiselect("Filter by CPV Code", all_cpv_codes)
 
 # Date range filter
@@ -42,36 +43,35 @@ max_date = df['publication_date_parsed'].max().date()
 date_range = st.sidebar.date_input("Filter by Publication Date Range", [min_date, max_date])
 
 # --- Filtering Logic ---
-filtered_df = df.copy()
+# One boolean mask over the shared frame, which is never modified
+mask = np.ones(len(df), dtype=bool)
 
-# Filter by search term
+# Filter by search term, keeping the index's ranking for the results
+ranked_rows = None
 if search_term:
-    filtered_df = filtered_df[
-        df['title'].str.lower().str.contains(search_term, na=False) |
-        df['description'].str.lower().str.contains(search_term, na=False) |
-        df['organisation'].str.lower().str.contains(search_term, na=False)
-    ]
+    text_index = search_index(json_file, data_version)
+    ranked_rows, _ = text_index.search(search_term)
+    mask &= text_index.mask(ranked_rows)
 
-# Filter by CPV
+# Filter by CPV: tenders with any of the selected codes, a union of their index rows
 if selected_cpvs:
-    filtered_df = filtered_df[filtered_df['cpv_codes'].apply(
-        lambda codes: any(code in codes for code in selected_cpvs) if isinstance(codes, list) else False
-    )]
+    mask &= cpv_index.mask(cpv_index.any_of(selected_cpvs))
 
 # Filter by date range
 if len(date_range) == 2:
     start_date, end_date = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
-    filtered_df = filtered_df[
-        filtered_df['publication_date_parsed'].between(start_date, end_date)
-    ]
+    mask &= df['publication_date_parsed'].between(start_date, end_date).to_numpy()
+
+# Best keyword matches first while searching, otherwise the stored order
+filtered_df = df.iloc[ranked_rows[mask[ranked_rows]] if ranked_rows is not None else np.flatnonzero(mask)]
+cpv_counts = pd.Series(cpv_index.counts(mask), index=all_cpv_codes)
 
 # --- Summary Section ---
 st.subheader("📊 Summary")
 col1, col2, col3, col4 = st.columns(4)
 col1.metric("Total Tenders", len(filtered_df))
 col2.metric("Unique Organisations", filtered_df['organisation'].nunique())
-cpv_total = filtered_df['cpv_codes'].apply(lambda x: len(x) if isinstance(x, list) else 0).sum()
-col3.metric("CPV Codes Present", cpv_total)
+col3.metric("CPV Codes Present", int(cpv_counts.sum()))
 if not filtered_df.empty:
     date_min = filtered_df['publication_date_parsed'].min().date()
     date_max = filtered_df['publication_date_parsed'].max().date()
@@ -81,7 +81,7 @@ else:
 
 # --- Table ---
 st.markdown(f"### 🔎 Showing {len(filtered_df)} filtered tenders")
-st.dataframe(filtered_df)
+paginated_table(filtered_df, key="tenders", default_columns=TABLE_COLUMNS, use_container_width=True)
 
 # --- CSV Export ---
 st.download_button(
@@ -94,5 +94,5 @@ st.download_button(
 # --- Chart ---
 if not filtered_df.empty:
     st.subheader("📈 Tenders per CPV Code")
-    cpv_chart = filtered_df.explode("cpv_codes").groupby("cpv_codes")["title"].count().sort_values(ascending=False)
+    cpv_chart = cpv_counts[cpv_counts > 0].sort_values(ascending=False)
     st.bar_chart(cpv_chart)
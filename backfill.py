@@ -0,0 +1,186 @@
+"""Date-sharded parallel backfill of Find a Tender notices.
+
+A regular crawl walks the newest-first listing from page 1 until it reaches
+the threshold date, so a 6-month backfill costs one listing page after
+another. The backfill instead splits the window into date shards using the
+search form's publication-date filters and crawls each shard in its own
+worker process, with its own session, rate limiter and detail pool. The shard
+results are merged, deduplicated by tender_id and saved as one output file.
+Before crawling, each worker checks that its shard's first listing page only
+lists notices inside the shard window. If the site ignored the date filter,
+the backfill aborts instead of crawling the whole listing once per shard.
+
+Usage:  python backfill.py [--days 182] [--workers 4] [--shard-days 14]
+
+Every worker gets the full per-worker request budget, so the site sees up to
+workers x BACKFILL_RPS_PER_WORKER requests per second.
+"""
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, timedelta
+
+import complete_tender_scraper as scraper
+import http_client
+import tender_io
+from cpv_store import CPV_STORE_PATH, CpvStore
+from notice_cache import CACHE_PATH, NoticeCache
+from rate_limiter import MAX_CONCURRENCY, REQUESTS_PER_SECOND, limiter
+from tender_store import TENDER_DB_PATH, TenderStore
+
+BACKFILL_WORKERS = 4
+SHARD_DAYS = 14
+BACKFILL_RPS_PER_WORKER = REQUESTS_PER_SECOND
+BACKFILL_OUTPUT = "output/tender_opportunities_last6months_with_cpv.json"
+
+
+def date_shards(date_from, date_to, shard_days=SHARD_DAYS):
+    """Split date_from..date_to (inclusive) into non-overlapping (start, end) shards, newest first"""
+    shards = []
+    end = date_to
+    while end >= date_from:
+        start = max(date_from, end - timedelta(days=shard_days - 1))
+        shards.append((start, end))
+        end = start - timedelta(days=1)
+    return shards
+
+
+def shard_output(json_filename, start, end):
+    """Output path for rerunning one shard beside json_filename, keeping its .json / .json.zst extension"""
+    directory, name = os.path.split(json_filename)
+    stem, dot, extension = name.partition(".")
+    return os.path.join(directory, f"{stem}_{start}_{end}{dot}{extension}")
+
+
+def _init_worker(rate, cpv_store_path, cache_path, tender_db_path):
+    """Give each worker process its own request budget, CPV store, cache and tender store connections.
+
+    Workers are spawned, so each one also creates its own pooled session on first request.
+    """
+    limiter.set_budget(rate=rate, max_concurrency=MAX_CONCURRENCY)
+    scraper.cpv_store = CpvStore(cpv_store_path)
+    scraper.notice_cache = NoticeCache(cache_path)
+    # Read-only in workers: its listing hashes pick out amended notices to refetch
+    scraper.tender_store = TenderStore(tender_db_path)
+
+
+class ShardFilterError(RuntimeError):
+    """The site listed notices outside a shard's publication-date window"""
+
+
+def check_shard_filter(shard_from, shard_to, base_url):
+    """Fetch a shard's first listing page and raise ShardFilterError if it lists a notice published outside
+    shard_from..shard_to, which means the site did not apply the date filter"""
+    url = scraper.listing_url(f"{base_url}/Search/Results", 1, scraper.publication_date_filter(shard_from, shard_to))
+    response = http_client.get(url, headers={'User-Agent': 'Mozilla/5.0'})
+    response.raise_for_status()
+    tenders, _, _ = scraper.parse_listing_page(response.content)
+    outside = sorted(t.publication_date for t in tenders
+                     if t.publication_date and not shard_from <= t.publication_date <= shard_to)
+    if outside:
+        raise ShardFilterError(f"page 1 of shard {shard_from} → {shard_to} lists {len(outside)} notices published "
+                               f"{outside[0]} → {outside[-1]}; the publication-date filter was not applied")
+
+
+def crawl_shard(shard_from, shard_to, base_url):
+    """Check the shard's date filter, then crawl it in a worker process and return its tenders"""
+    check_shard_filter(shard_from, shard_to, base_url)
+    return scraper.scrape_find_tender_last_6_months(
+        threshold_date=shard_from,
+        base_url=base_url,
+        json_filename=None,
+        search_params=scraper.publication_date_filter(shard_from, shard_to),
+    )
+
+
+def merge_shard_results(shard_results):
+    """Concatenate shard results newest shard first, keeping the first copy of each tender_id"""
+    merged = []
+    seen = set()
+    duplicates = 0
+    for tenders in shard_results:
+        for tender in tenders:
+            tender_id = tender.get('tender_id')
+            if tender_id in seen:
+                duplicates += 1
+                continue
+            if tender_id:
+                seen.add(tender_id)
+            merged.append(tender)
+    return merged, duplicates
+
+
+def backfill(days=182, workers=BACKFILL_WORKERS, shard_days=SHARD_DAYS, date_to=None,
+             base_url="https://www.find-tender.service.gov.uk", json_filename=BACKFILL_OUTPUT,
+             rate_per_worker=BACKFILL_RPS_PER_WORKER, cpv_store_path=CPV_STORE_PATH, cache_path=CACHE_PATH,
+             tender_db_path=TENDER_DB_PATH):
+    """Crawl the last `days` days in date shards across worker processes and save one merged output"""
+    date_to = date_to or date.today()
+    date_from = date_to - timedelta(days=days)
+    shards = date_shards(date_from, date_to, shard_days)
+    print(f"🧩 Backfilling {date_from} → {date_to} in {len(shards)} shards of {shard_days} days "
+          f"with {workers} workers at {rate_per_worker:g} req/s each")
+    print("=" * 80)
+
+    results = {}
+    failed = []
+    # spawn so every worker starts from a clean interpreter instead of a copy of our threads and sockets
+    with ProcessPoolExecutor(max_workers=max(1, workers), mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker,
+                             initargs=(rate_per_worker, cpv_store_path, cache_path, tender_db_path)) as pool:
+        futures = {pool.submit(crawl_shard, start, end, base_url): (start, end) for start, end in shards}
+        for future in as_completed(futures):
+            start, end = futures[future]
+            try:
+                results[(start, end)] = future.result()
+                print(f"✅ Shard {start} → {end}: {len(results[(start, end)])} tenders")
+            except ShardFilterError as e:
+                # Every shard would crawl the unfiltered listing: stop before saving anything
+                pool.shutdown(wait=False, cancel_futures=True)
+                print(f"🛑 {e}. Aborting the backfill.")
+                raise
+            except Exception as e:
+                failed.append((start, end))
+                print(f"❌ Shard {start} → {end} failed: {e}")
+
+    merged, duplicates = merge_shard_results(results[shard] for shard in shards if shard in results)
+    scraper.save_tenders_to_json(merged, json_filename)
+    TenderStore(tender_db_path).upsert_tenders(merged)
+
+    # Workers save the store concurrently; re-seeding from the merged output restores anything a race dropped
+    store = CpvStore(cpv_store_path)
+    store.seed(merged)
+    store.save()
+
+    print("=" * 80)
+    print("📊 BACKFILL COMPLETE")
+    print(f"✅ {len(merged)} tenders from {len(results)}/{len(shards)} shards ({duplicates} duplicates dropped)")
+    print(f"📁 Data saved in: {json_filename}")
+    # A rerun must not write over json_filename: crawl each shard to its own file, then merge them all in
+    shard_files = []
+    for start, end in sorted(failed, reverse=True):
+        shard_file = shard_output(json_filename, start, end)
+        shard_files.append(shard_file)
+        print(f"⚠️ Missing shard {start} → {end} - rerun it with:\n"
+              f"   python backfill.py --to {end} --days {(end - start).days} --output {shard_file}")
+    if shard_files:
+        merged_file = shard_output(json_filename, "with", "reruns")
+        print(f"   then merge the reruns in with:\n"
+              f"   python merge_outputs.py {merged_file} {json_filename} {' '.join(shard_files)}")
+    return merged
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Date-sharded parallel backfill of Find a Tender notices")
+    parser.add_argument("--days", type=int, default=182, help="length of the window ending at --to (default 182)")
+    parser.add_argument("--to", type=date.fromisoformat, default=None, help="last publication date, YYYY-MM-DD (default today)")
+    parser.add_argument("--workers", type=int, default=BACKFILL_WORKERS, help="worker processes")
+    parser.add_argument("--shard-days", type=int, default=SHARD_DAYS, help="days per shard")
+    parser.add_argument("--rps", type=float, default=BACKFILL_RPS_PER_WORKER, help="requests per second per worker")
+    parser.add_argument("--output", default=BACKFILL_OUTPUT, help="merged JSON output file (.json.zst to compress it)")
+    parser.add_argument("--pretty", action="store_true", help="write the output indented for reading (default compact)")
+    args = parser.parse_args()
+    tender_io.PRETTY_JSON = args.pretty
+    backfill(days=args.days, workers=args.workers, shard_days=args.shard_days, date_to=args.to,
+             json_filename=args.output, rate_per_worker=args.rps)
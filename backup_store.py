@@ -0,0 +1,367 @@
+"""Content-addressed, compressed backups of tender snapshots.
+
+Every tender is hashed on its canonical JSON form. A backup writes only the
+tenders the store has never seen, as one compressed chunk (zstd when the
+zstandard package is installed, gzip otherwise), plus a small manifest with
+the snapshot's metadata and its tenders in order, as runs of consecutive
+lines in the chunks. Snapshots that
+share tenders share chunks, so disk use and backup time grow with what
+changed rather than with the size of the file. A retention policy prunes old
+manifests and any chunks no manifest still needs.
+
+The index from tender hashes to chunk lines is a SQLite table that backups
+only append to, so a backup looks up just its own tenders' hashes instead of
+loading and rewriting the whole index.
+
+Usage:
+    python backup_store.py backup <file.json> [...]   (legacy <name>.backup_<unix time> files keep their time)
+    python backup_store.py list
+    python backup_store.py restore <manifest id> <output.json>
+    python backup_store.py prune
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from tender_io import read_tender_file, write_tender_file
+from tender_record import as_dict
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+BACKUP_STORE_DIR = "output/backups/store"
+KEEP_LAST = 10          # newest manifests kept per source file
+KEEP_DAILY_DAYS = 30    # plus the newest manifest of each day for this many days
+ZSTD_LEVEL = 10
+
+LEGACY_BACKUP_PATTERN = re.compile(r"^(?P<name>.+)\.backup_(?P<time>\d+)$")
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tender_lines (
+    digest TEXT PRIMARY KEY,
+    chunk TEXT NOT NULL,
+    line INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tender_lines_chunk ON tender_lines (chunk);
+DROP TABLE IF EXISTS known_tenders;
+"""
+
+
+def tender_hash(tender):
+    """sha256 of the tender's canonical JSON, and that JSON"""
+    canonical = json.dumps(tender, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest(), canonical
+
+
+def compress(data):
+    if ZSTD_AVAILABLE:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data), ".zst"
+    return gzip.compress(data, compresslevel=9), ".gz"
+
+
+def decompress(data, extension):
+    if extension == ".zst":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("this chunk is zstd-compressed - install the zstandard package to restore it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def _lock_file(lock_file):
+    """Block until this process holds the exclusive lock on lock_file (flock, or msvcrt on Windows)"""
+    if fcntl:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        return
+    lock_file.seek(0)
+    while True:
+        try:
+            # LK_LOCK itself retries for about 10 seconds before giving up
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+
+def _unlock_file(lock_file):
+    if fcntl:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+    else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _write_atomic(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class BackupStore:
+    """Chunk store plus snapshot manifests under one directory"""
+
+    def __init__(self, root=BACKUP_STORE_DIR, keep_last=KEEP_LAST, keep_daily_days=KEEP_DAILY_DAYS):
+        self.root = root
+        self.chunk_dir = os.path.join(root, "chunks")
+        self.manifest_dir = os.path.join(root, "manifests")
+        self.index_path = os.path.join(root, "index.sqlite")
+        self.lock_path = os.path.join(root, "store.lock")
+        self.keep_last = keep_last
+        self.keep_daily_days = keep_daily_days
+        self._conn = None
+
+    @contextmanager
+    def _locked(self):
+        """Hold the store's exclusive file lock, so concurrent backups and prunes (in any process) take turns:
+        a prune can otherwise delete the chunk a backup has just written before its manifest exists"""
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            _lock_file(lock_file)
+            try:
+                yield
+            finally:
+                _unlock_file(lock_file)
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(self.root, exist_ok=True)
+            self._conn = sqlite3.connect(self.index_path, timeout=30)
+            self._conn.executescript(INDEX_SCHEMA)
+            legacy_index = os.path.join(self.root, "index.json")
+            if os.path.exists(legacy_index):
+                self._import_legacy_index(self._conn, legacy_index)
+        return self._conn
+
+    @staticmethod
+    def _import_legacy_index(conn, legacy_index):
+        """Move a store created with the whole-file index.json into the SQLite index once"""
+        with open(legacy_index, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        with conn:
+            conn.executemany("INSERT OR IGNORE INTO tender_lines (digest, chunk, line) VALUES (?, ?, ?)",
+                             [(digest, chunk_name, line_number) for digest, (chunk_name, line_number) in index.items()])
+        os.remove(legacy_index)
+
+    @staticmethod
+    def _stored_lines(conn, digests):
+        """{digest: (chunk, line)} for the digests already in the store"""
+        stored = {}
+        for start in range(0, len(digests), 500):
+            batch = digests[start:start + 500]
+            rows = conn.execute(f"SELECT digest, chunk, line FROM tender_lines "
+                                f"WHERE digest IN ({','.join('?' * len(batch))})", batch)
+            stored.update((digest, (chunk_name, line_number)) for digest, chunk_name, line_number in rows)
+        return stored
+
+    def backup_tenders(self, tenders, metadata=None, source="tenders.json", created_at=None):
+        """Store a snapshot given as tender dicts; returns (manifest id, stats)"""
+        start = time.perf_counter()
+        with self._locked():
+            os.makedirs(self.chunk_dir, exist_ok=True)
+            os.makedirs(self.manifest_dir, exist_ok=True)
+            conn = self._connection()
+            # Every tender is hashed on its full content, so a change to any field is a new line
+            hashes, canonical_by_hash = [], {}
+            for tender in tenders:
+                digest, canonical = tender_hash(as_dict(tender))
+                hashes.append(digest)
+                canonical_by_hash.setdefault(digest, canonical)
+            stored = self._stored_lines(conn, list(canonical_by_hash))
+            new_hashes = [digest for digest in canonical_by_hash if digest not in stored]
+
+            chunk_bytes = 0
+            if new_hashes:
+                raw = ("\n".join(canonical_by_hash[digest] for digest in new_hashes) + "\n").encode('utf-8')
+                data, extension = compress(raw)
+                chunk_name = hashlib.sha256(raw).hexdigest()[:32] + extension
+                _write_atomic(os.path.join(self.chunk_dir, chunk_name), data)
+                chunk_bytes = len(data)
+                new_lines = [(digest, chunk_name, line_number) for line_number, digest in enumerate(new_hashes)]
+                with conn:
+                    conn.executemany("INSERT OR IGNORE INTO tender_lines (digest, chunk, line) VALUES (?, ?, ?)",
+                                     new_lines)
+                stored.update((digest, (chunk_name, line_number)) for digest, chunk_name, line_number in new_lines)
+
+            created_at = created_at or time.time()
+            manifest_id = f"{os.path.basename(source)}.{int(created_at)}"
+            suffix = 1
+            while os.path.exists(os.path.join(self.manifest_dir, f"{manifest_id}.json")):
+                suffix += 1
+                manifest_id = f"{os.path.basename(source)}.{int(created_at)}-{suffix}"
+            # Snapshots mostly extend earlier ones, so their tenders are long runs of consecutive chunk lines
+            runs = []
+            for digest in hashes:
+                chunk_name, line_number = stored[digest]
+                if runs and runs[-1][0] == chunk_name and runs[-1][1] + runs[-1][2] == line_number:
+                    runs[-1][2] += 1
+                else:
+                    runs.append([chunk_name, line_number, 1])
+            manifest = {
+                'id': manifest_id,
+                'source': os.path.basename(source),
+                'created_at': created_at,
+                'metadata': metadata or {},
+                'tender_count': len(hashes),
+                'chunks': sorted({run[0] for run in runs}),
+                'runs': runs
+            }
+            _write_atomic(os.path.join(self.manifest_dir, f"{manifest_id}.json"),
+                          json.dumps(manifest, separators=(',', ':')).encode('utf-8'))
+        stats = {'tenders': len(hashes), 'new': len(new_hashes), 'chunk_bytes': chunk_bytes,
+                 'seconds': time.perf_counter() - start}
+        return manifest_id, stats
+
+    def backup_file(self, json_file, created_at=None):
+        """Store a snapshot file ({"metadata", "tenders"} or a bare list); returns (manifest id, stats)"""
+        source = os.path.basename(json_file)
+        legacy = LEGACY_BACKUP_PATTERN.match(source)
+        if legacy:
+            source = legacy.group('name')
+            created_at = created_at or int(legacy.group('time'))
+        # Tenders are hashed in their unpacked form, so files with and without a CPV table share chunks
+        metadata, tenders = read_tender_file(json_file)
+        return self.backup_tenders(tenders, metadata, source, created_at or os.path.getmtime(json_file))
+
+    def manifests(self):
+        """All manifests (without their runs), oldest first"""
+        found = []
+        if not os.path.isdir(self.manifest_dir):
+            return found
+        for name in os.listdir(self.manifest_dir):
+            if name.endswith(".json"):
+                with open(os.path.join(self.manifest_dir, name), 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+                del manifest['runs']
+                found.append(manifest)
+        return sorted(found, key=lambda m: m['created_at'])
+
+    def restore(self, manifest_id, output_path):
+        """Rebuild the snapshot a manifest describes at output_path; returns the number of tenders"""
+        # Under the lock, so a concurrent prune can't remove the manifest's chunks halfway through
+        with self._locked():
+            with open(os.path.join(self.manifest_dir, f"{manifest_id}.json"), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            chunks = {}
+            for chunk_name in manifest['chunks']:
+                with open(os.path.join(self.chunk_dir, chunk_name), 'rb') as f:
+                    raw = decompress(f.read(), os.path.splitext(chunk_name)[1])
+                chunks[chunk_name] = raw.decode('utf-8').split("\n")
+        tenders = [json.loads(line) for chunk_name, start, count in manifest['runs']
+                   for line in chunks[chunk_name][start:start + count]]
+
+        os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+        write_tender_file(output_path, manifest['metadata'], tenders)
+        return len(tenders)
+
+    def prune(self, now=None):
+        """Apply the retention policy, then delete chunks no remaining manifest uses; returns (manifests, chunks) removed"""
+        now = now or time.time()
+        with self._locked():
+            by_source = {}
+            for manifest in self.manifests():
+                by_source.setdefault(manifest['source'], []).append(manifest)
+
+            keep = set()
+            for manifests in by_source.values():
+                newest_first = manifests[::-1]
+                keep.update(m['id'] for m in newest_first[:self.keep_last])
+                days_seen = set()
+                for manifest in newest_first:
+                    if now - manifest['created_at'] > self.keep_daily_days * 86400:
+                        break
+                    day = datetime.fromtimestamp(manifest['created_at']).date()
+                    if day not in days_seen:
+                        days_seen.add(day)
+                        keep.add(manifest['id'])
+
+            removed_manifests = 0
+            used_chunks = set()
+            for manifests in by_source.values():
+                for manifest in manifests:
+                    if manifest['id'] in keep:
+                        used_chunks.update(manifest['chunks'])
+                    else:
+                        os.remove(os.path.join(self.manifest_dir, f"{manifest['id']}.json"))
+                        removed_manifests += 1
+
+            removed_chunks = 0
+            if os.path.isdir(self.chunk_dir):
+                for chunk_name in os.listdir(self.chunk_dir):
+                    if chunk_name not in used_chunks:
+                        os.remove(os.path.join(self.chunk_dir, chunk_name))
+                        removed_chunks += 1
+            if removed_chunks:
+                conn = self._connection()
+                removed = [(chunk_name,) for (chunk_name,) in conn.execute("SELECT DISTINCT chunk FROM tender_lines")
+                           if chunk_name not in used_chunks]
+                with conn:
+                    conn.executemany("DELETE FROM tender_lines WHERE chunk = ?", removed)
+        return removed_manifests, removed_chunks
+
+    def disk_usage(self):
+        total = 0
+        for directory, _, names in os.walk(self.root):
+            total += sum(os.path.getsize(os.path.join(directory, name)) for name in names)
+        return total
+
+
+# Shared store for scraper output snapshots
+backup_store = BackupStore()
+
+
+def backup_snapshot(json_file=None, tenders=None, metadata=None):
+    """Back up a snapshot (a file, or tenders about to be written to json_file) into the shared store and
+    apply the retention policy, printing a one-line summary; never raises"""
+    try:
+        if tenders is None:
+            manifest_id, stats = backup_store.backup_file(json_file)
+        else:
+            manifest_id, stats = backup_store.backup_tenders(tenders, metadata, json_file)
+        backup_store.prune()
+        print(f"📁 Backup {manifest_id}: {stats['new']}/{stats['tenders']} tenders new, "
+              f"{stats['chunk_bytes'] / 1024:.0f} KB written")
+        return manifest_id
+    except Exception as e:
+        print(f"⚠️ Could not back up {json_file}: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    command, args = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ("", [])
+    if command == "backup" and args:
+        # Oldest first, so legacy backups are stored in the order they were taken
+        for json_file in sorted(args, key=lambda p: int(LEGACY_BACKUP_PATTERN.match(os.path.basename(p)).group('time'))
+                                if LEGACY_BACKUP_PATTERN.match(os.path.basename(p)) else os.path.getmtime(p)):
+            manifest_id, stats = backup_store.backup_file(json_file)
+            print(f"📁 {manifest_id}: {stats['new']}/{stats['tenders']} tenders new, "
+                  f"{stats['chunk_bytes'] / 1024:.0f} KB written in {stats['seconds']:.2f}s")
+        print(f"💾 Backup store {backup_store.root} uses {backup_store.disk_usage() / 1e6:.1f} MB")
+    elif command == "list":
+        for manifest in backup_store.manifests():
+            created = datetime.fromtimestamp(manifest['created_at']).strftime('%Y-%m-%d %H:%M:%S')
+            print(f"{manifest['id']}  {created}  {manifest['tender_count']} tenders")
+    elif command == "restore" and len(args) == 2:
+        print(f"♻️ Restored {backup_store.restore(args[0], args[1])} tenders to {args[1]}")
+    elif command == "prune":
+        manifests, chunks = backup_store.prune()
+        print(f"🧹 Removed {manifests} manifests and {chunks} chunks; "
+              f"store now uses {backup_store.disk_usage() / 1e6:.1f} MB")
+    else:
+        print(__doc__)
+        sys.exit(1)
@@ -0,0 +1,58 @@
+"""Wall time of a single newest-first crawl vs the date-sharded process-pool backfill.
+
+Both crawls cover the same BENCH_DAYS of the saved corpus on the local fake
+site. Every worker process gets BENCH_RPS requests per second of its own, as
+in a real backfill.
+
+Run from the repository root:  python benchmarks/bench_backfill.py
+"""
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backfill
+import complete_tender_scraper as scraper
+from fake_site import FakeFindTender, isolated_stores, load_corpus
+from rate_limiter import limiter
+
+DAYS = int(os.environ.get("BENCH_DAYS", "4"))
+LATENCY = float(os.environ.get("BENCH_LATENCY", "0.1"))
+RPS = float(os.environ.get("BENCH_RPS", "40"))
+
+limiter.set_budget(rate=RPS, max_concurrency=scraper.DETAIL_FETCH_WORKERS)
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()
+    newest = date.fromisoformat(corpus[0]["publication_date_parsed"])
+    oldest = newest - timedelta(days=DAYS - 1)
+    expected = [t for t in corpus if t["publication_date_parsed"] >= oldest.isoformat()]
+
+    with FakeFindTender(tenders=corpus, latency=LATENCY) as site:
+        print(f"🌐 Fake site at {site.base_url} ({LATENCY * 1000:.0f} ms latency, {DAYS} days, "
+              f"{len(expected)} tenders, {RPS:g} req/s per process)")
+        timings = {}
+
+        with isolated_stores(scraper) as tmp:
+            start = time.perf_counter()
+            single = scraper.scrape_find_tender_last_6_months(threshold_date=oldest, base_url=site.base_url,
+                                                              json_filename=None)
+            timings["single crawl"] = time.perf_counter() - start
+        assert len(single) == len(expected)
+
+        for workers in (1, 2, 4):
+            with isolated_stores(scraper) as tmp:
+                start = time.perf_counter()
+                merged = backfill.backfill(days=DAYS - 1, workers=workers, shard_days=1, date_to=newest,
+                                           base_url=site.base_url, json_filename=os.path.join(tmp, "out.json"),
+                                           rate_per_worker=RPS, cpv_store_path=os.path.join(tmp, "cpv_store.json"),
+                                           cache_path=os.path.join(tmp, "notice_cache.sqlite"),
+                                           tender_db_path=os.path.join(tmp, "tenders.sqlite"))
+                timings[f"backfill x{workers}"] = time.perf_counter() - start
+            assert sorted(t["tender_id"] for t in merged) == sorted(t["tender_id"] for t in expected)
+
+    for label, elapsed in timings.items():
+        print(f"   {label:>13}: {elapsed:6.2f}s  →  {len(expected) / elapsed:6.1f} tenders/s")
@@ -0,0 +1,47 @@
+"""Disk use and time of the content-addressed backup store on the legacy backups.
+
+Feeds every output/backups/<name>.backup_<time> file for one snapshot name
+into a temporary store, oldest first, then restores a sample of them and
+checks they match the originals.
+
+Run from the repository root:  python benchmarks/bench_backup_store.py
+"""
+import glob
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backup_store import LEGACY_BACKUP_PATTERN, ZSTD_AVAILABLE, BackupStore
+from tender_io import read_tender_file
+
+SNAPSHOT = os.environ.get("BENCH_SNAPSHOT", "tender_opportunities_last6months_with_cpv.json")
+
+
+if __name__ == "__main__":
+    files = sorted(glob.glob(f"output/backups/{SNAPSHOT}.backup_*"),
+                   key=lambda p: int(LEGACY_BACKUP_PATTERN.match(os.path.basename(p)).group("time")))
+    raw_bytes = sum(os.path.getsize(p) for p in files)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BackupStore(os.path.join(tmp, "store"))
+        start = time.perf_counter()
+        manifest_ids = []
+        slowest = 0.0
+        for path in files:
+            manifest_id, stats = store.backup_file(path)
+            manifest_ids.append(manifest_id)
+            slowest = max(slowest, stats["seconds"])
+        elapsed = time.perf_counter() - start
+        stored_bytes = store.disk_usage()
+
+        for path, manifest_id in list(zip(files, manifest_ids))[::max(1, len(files) // 5)]:
+            out = os.path.join(tmp, "restored.json")
+            store.restore(manifest_id, out)
+            assert read_tender_file(path) == read_tender_file(out), path
+
+    print(f"📦 {len(files)} backups of {SNAPSHOT} ({'zstd' if ZSTD_AVAILABLE else 'gzip'} chunks)")
+    print(f"   full copies   : {raw_bytes / 1e6:8.1f} MB")
+    print(f"   backup store  : {stored_bytes / 1e6:8.1f} MB  ({raw_bytes / max(stored_bytes, 1):.0f}x smaller)")
+    print(f"   backup time   : {elapsed:6.2f}s total, {elapsed / len(files) * 1000:.0f} ms avg, {slowest * 1000:.0f} ms slowest")
@@ -0,0 +1,71 @@
+"""Detail requests needed to pick up amended notices on a recrawl.
+
+Crawls BENCH_PAGES listing pages of the fake site once from cold, then
+amends an increasing number of notices (new submission deadline in the
+listing row, new CPV codes on the notice page) and recrawls. Listing rows
+whose hash no longer matches the tender store are refetched; every other
+notice is answered by the CPV store, so detail requests follow the number of
+amendments rather than the corpus size. Before change detection a recrawl
+made no detail requests and kept every amended tender stale, and a full
+rescrape cost as many requests as the cold crawl.
+
+Run from the repository root:  python benchmarks/bench_change_detection.py
+"""
+import os
+import random
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import complete_tender_scraper as scraper
+from fake_site import FakeFindTender, isolated_stores, load_corpus
+from rate_limiter import limiter
+from tender_log import load_tenders
+
+PAGES = int(os.environ.get("BENCH_PAGES", "20"))
+LATENCY = float(os.environ.get("BENCH_LATENCY", "0.01"))
+AMENDMENTS = [int(n) for n in os.environ.get("BENCH_AMENDMENTS", "0,5,20,80").split(",")]
+
+limiter.set_budget(rate=float(os.environ.get("BENCH_RPS", "500")), max_concurrency=scraper.DETAIL_FETCH_WORKERS)
+
+
+def amend(tender, replacement_cpv):
+    details = dict(tender.get("details") or {}, **{"Submission deadline": "31 December 2030, 12:00pm"})
+    codes, descriptions = replacement_cpv
+    return dict(tender, details=details, cpv_codes=codes, cpv_descriptions=descriptions)
+
+
+def crawl(site, output):
+    requests_before = site.notice_requests
+    start = time.perf_counter()
+    scraper.scrape_find_tender_last_6_months(threshold_date=date(2000, 1, 1), base_url=site.base_url,
+                                             json_filename=output)
+    return site.notice_requests - requests_before, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()[:PAGES * 20]
+    replacement_cpv = (["72000000"], ["IT services: consulting, software development, Internet and support"])
+    rng = random.Random(0)
+    rows = []
+    with isolated_stores(scraper) as tmp, FakeFindTender(tenders=list(corpus), latency=LATENCY) as site:
+        output = os.path.join(tmp, "tenders.json")
+        cold_requests, cold_seconds = crawl(site, output)
+        amended_ids = set()
+        for count in AMENDMENTS:
+            for index in rng.sample([i for i, t in enumerate(site.tenders) if t["tender_id"] not in amended_ids], count):
+                tender = amend(site.tenders[index], replacement_cpv)
+                site.tenders[index] = site.by_id[tender["tender_id"]] = tender
+                amended_ids.add(tender["tender_id"])
+            requests, seconds = crawl(site, output)
+            saved = {t["tender_id"]: t for t in load_tenders(output)["tenders"]}
+            stale = sum(1 for tender_id in amended_ids if saved[tender_id]["cpv_codes"] != replacement_cpv[0])
+            versions = sum(len(scraper.tender_store.history(tender_id)) for tender_id in amended_ids)
+            rows.append((count, requests, seconds, stale, versions))
+
+    print(f"🌐 {len(corpus)} notices on {PAGES} pages; cold crawl: {cold_requests} detail requests, {cold_seconds:.2f}s")
+    for count, requests, seconds, stale, versions in rows:
+        print(f"   {count:3d} newly amended: {requests:4d} detail requests, {seconds:5.2f}s, "
+              f"{stale} stale tenders, {versions} earlier versions kept")
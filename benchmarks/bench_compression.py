@@ -0,0 +1,84 @@
+"""Cost of zstd-compressed tender files: decode time against the I/O they save.
+
+Writes the saved corpus BENCH_COPIES times over (with distinct tender ids) to
+tenders.json and tenders.json.zst with write_tender_file(), then times a
+whole-file read and a streamed iter_tenders() pass over each, and the
+decompression on its own. The break-even figure is the disk read speed below
+which reading the smaller file plus decoding it beats reading the plain file;
+that comparison ignores the page cache, which holds both files warm here.
+Peak traced memory of the streamed pass shows decompression stays in constant
+memory. Each timing is the best of BENCH_REPEAT runs.
+
+Run from the repository root:  python benchmarks/bench_compression.py
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_site import load_corpus
+from tender_io import iter_tenders, open_tender_file, read_tender_file, write_tender_file
+
+COPIES = int(os.environ.get("BENCH_COPIES", "5"))
+REPEAT = int(os.environ.get("BENCH_REPEAT", "3"))
+
+
+def best_of(func):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def read_all(path):
+    with open_tender_file(path) as f:
+        while f.read(1 << 20):
+            pass
+
+
+def stream_count(path):
+    return sum(1 for _ in iter_tenders(path))
+
+
+def stream_peak(path):
+    tracemalloc.start()
+    stream_count(path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()
+    tenders = [dict(t, tender_id=f"{t['tender_id']}-{copy}") for copy in range(COPIES) for t in corpus]
+    rows = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, name in (("plain", "tenders.json"), ("zstd", "tenders.json.zst")):
+            path = os.path.join(tmp, name)
+            write_seconds = best_of(lambda: write_tender_file(path, {}, tenders))
+            assert read_tender_file(path)[1] == tenders
+            rows[label] = {
+                'size': os.path.getsize(path),
+                'write': write_seconds,
+                'read': best_of(lambda: read_all(path)),
+                'load': best_of(lambda: read_tender_file(path)),
+                'stream': best_of(lambda: stream_count(path)),
+                'peak': stream_peak(path),
+            }
+
+    plain, zstd = rows["plain"], rows["zstd"]
+    print(f"📄 {len(tenders)} tenders, best of {REPEAT}")
+    for label, row in rows.items():
+        print(f"   {label:>5}: {row['size'] / 1e6:6.2f} MB, write {row['write']:5.2f}s, "
+              f"read bytes {row['read']:5.3f}s, full load {row['load']:5.2f}s, "
+              f"streamed {row['stream']:5.2f}s (peak {row['peak'] / 1e6:4.1f} MB)")
+    saved = plain['size'] - zstd['size']
+    decode = zstd['read'] - plain['read']
+    print(f"🗜️ {plain['size'] / zstd['size']:.1f}x smaller: {saved / 1e6:.1f} MB less to read for "
+          f"{decode * 1000:.0f} ms of decompression")
+    print(f"   Compressed files read faster on disks slower than {saved / max(decode, 1e-9) / 1e6:.0f} MB/s")
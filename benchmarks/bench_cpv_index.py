@@ -0,0 +1,101 @@
+"""CPV filtering and counting: per-row .apply and explode/groupby vs the shared CpvIndex.
+
+Streamlit.py used to filter its multi-select with an .apply over every row
+and count tenders per CPV code by exploding the filtered frame. The CPV
+Breakdown page looped over every tender to count its codes. With the
+CpvIndex built once per data version, a multi-select is a union or
+intersection of sorted row arrays, and per-code counts, overall or within a
+filter mask, come from one reduceat over the postings. Runs over the tender
+table of the saved corpus BENCH_COPIES times over, best of BENCH_REPEAT.
+
+Run from the repository root:  python benchmarks/bench_cpv_index.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from dashboard_data import build_tender_table, cpv_count_frame
+from fake_site import load_corpus
+
+COPIES = int(os.environ.get("BENCH_COPIES", "5"))
+REPEAT = int(os.environ.get("BENCH_REPEAT", "5"))
+
+
+def best_of(func, *args):
+    best, result = float("inf"), None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def apply_any(df, selected):
+    """Streamlit.py's CPV filter before the index"""
+    return df['cpv_codes'].apply(
+        lambda codes: any(code in codes for code in selected) if isinstance(codes, list) else False).to_numpy()
+
+
+def apply_all(df, selected):
+    return df['cpv_codes'].apply(
+        lambda codes: all(code in codes for code in selected) if isinstance(codes, list) else False).to_numpy()
+
+
+def explode_counts(df, mask):
+    """Streamlit.py's per-CPV chart before the index"""
+    return df[mask].explode("cpv_codes").groupby("cpv_codes")["title"].count()
+
+
+def loop_counts(tenders):
+    """The CPV Breakdown page's per-tender count loop"""
+    cpv_counts = {}
+    for tender in tenders:
+        for code, desc in zip(tender.get("cpv_codes", []), tender.get("cpv_descriptions", [])):
+            cpv_counts[(code, desc)] = cpv_counts.get((code, desc), 0) + 1
+    return cpv_counts
+
+
+def index_counts(cpv_index, mask):
+    return pd.Series(cpv_index.counts(mask), index=cpv_index.code_texts())
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()
+    tenders = [dict(t, tender_id=f"{t['tender_id']}-{copy}") for copy in range(COPIES) for t in corpus]
+    (df, cpv_index), build_seconds = best_of(build_tender_table, tenders)
+    _, index_seconds = best_of(lambda: type(cpv_index).from_lists(df["cpv_codes"], df["cpv_descriptions"]))
+    by_size = np.argsort(cpv_index.counts())[::-1]
+    codes = cpv_index.code_texts()
+    popular = [codes[i] for i in by_size[:3]]
+    print(f"📄 {len(df)} tenders, {len(cpv_index)} CPV codes, {len(cpv_index.postings)} postings; "
+          f"table {build_seconds:.2f}s, of which index {index_seconds * 1000:.0f} ms, once per data version")
+
+    # Tenders listing a code twice are counted once by the index
+    distinct = df[["cpv_codes"]].explode("cpv_codes").dropna().reset_index().drop_duplicates()
+    for label, old, new in (
+            ("any of 3 CPVs", lambda: apply_any(df, popular), lambda: cpv_index.mask(cpv_index.any_of(popular))),
+            ("all of 2 CPVs", lambda: apply_all(df, popular[:2]), lambda: cpv_index.mask(cpv_index.all_of(popular[:2])))):
+        old_mask, old_seconds = best_of(old)
+        new_mask, new_seconds = best_of(new)
+        assert np.array_equal(old_mask, new_mask)
+        print(f"   {label:>20}: {int(new_mask.sum()):5d} rows, .apply {old_seconds * 1000:7.1f} ms, "
+              f"index {new_seconds * 1000:6.2f} ms ({old_seconds / new_seconds:5.0f}x)")
+
+    mask = cpv_index.mask(cpv_index.any_of(popular))
+    expected = distinct[mask[distinct["index"].to_numpy()]].groupby("cpv_codes").size()
+    old_chart, old_seconds = best_of(explode_counts, df, mask)
+    new_chart, new_seconds = best_of(index_counts, cpv_index, mask)
+    assert new_chart[new_chart > 0].equals(expected.rename(None).rename_axis(None))
+    print(f"   {'filtered CPV counts':>20}: {len(expected):5d} codes, explode {old_seconds * 1000:7.1f} ms, "
+          f"index {new_seconds * 1000:6.2f} ms ({old_seconds / new_seconds:5.0f}x)")
+
+    old_summary, old_seconds = best_of(loop_counts, tenders)
+    new_summary, new_seconds = best_of(cpv_count_frame, cpv_index)
+    assert new_summary["tender_count"].sum() == len(distinct)
+    print(f"   {'CPV summary':>20}: {len(new_summary):5d} codes, loop {old_seconds * 1000:10.1f} ms, "
+          f"index {new_seconds * 1000:6.2f} ms ({old_seconds / new_seconds:5.0f}x)")
@@ -0,0 +1,73 @@
+"""Tender file size, load time and CPV filtering: per-tender CPV lists vs the global CPV table.
+
+Writes the saved corpus BENCH_COPIES times over (with distinct tender ids)
+once in the old layout, with parallel cpv_codes / cpv_descriptions lists, and
+once with write_tender_file(), which packs codes against one CPV table. It
+then times a full load of each and a streamed filter for every tender under
+the CPV division BENCH_CPV_PREFIX: string prefix matching on the old file,
+integer range checks on the packed codes of the new one.
+
+Run from the repository root:  python benchmarks/bench_cpv_table.py
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cpv_table import PACKED_CPV_KEY, prefix_range
+from fake_site import load_corpus
+from tender_io import iter_tenders, read_tender_file, write_tender_file
+
+COPIES = int(os.environ.get("BENCH_COPIES", "5"))
+PREFIX = os.environ.get("BENCH_CPV_PREFIX", "72")
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def filter_legacy(json_file):
+    return [t['tender_id'] for t in iter_tenders(json_file)
+            if any(code.startswith(PREFIX) for code in t.get('cpv_codes', []))]
+
+
+def filter_packed(json_file):
+    low, high = prefix_range(PREFIX)
+    matches = []
+    for t in iter_tenders(json_file, packed=True):
+        if PACKED_CPV_KEY in t:
+            if any(low <= code < high for code in t[PACKED_CPV_KEY]):
+                matches.append(t['tender_id'])
+        elif any(code.startswith(PREFIX) for code in t.get('cpv_codes', [])):
+            # Tenders whose CPV fields couldn't be packed losslessly keep the old lists
+            matches.append(t['tender_id'])
+    return matches
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()
+    tenders = [dict(t, tender_id=f"{t['tender_id']}-{copy}") for copy in range(COPIES) for t in corpus]
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_file, packed_file = os.path.join(tmp, "legacy.json"), os.path.join(tmp, "packed.json")
+        with open(legacy_file, 'w', encoding='utf-8') as f:
+            json.dump({'metadata': {}, 'tenders': tenders}, f, indent=2, ensure_ascii=False)
+        write_tender_file(packed_file, {}, tenders)
+
+        results = {}
+        for label, json_file, filter_func in (("per-tender", legacy_file, filter_legacy),
+                                              ("cpv table", packed_file, filter_packed)):
+            loaded, load_seconds = timed(read_tender_file, json_file)
+            matches, filter_seconds = timed(filter_func, json_file)
+            assert loaded[1] == tenders
+            results[label] = (os.path.getsize(json_file), load_seconds, filter_seconds, matches)
+        assert results["per-tender"][3] == results["cpv table"][3]
+
+    print(f"📄 {len(tenders)} tenders, {len(results['cpv table'][3])} under CPV {PREFIX}")
+    for label, (size, load_seconds, filter_seconds, _) in results.items():
+        print(f"   {label:>10}: {size / 1e6:6.1f} MB, full load {load_seconds:5.2f}s, "
+              f"streamed CPV filter {filter_seconds:5.2f}s")
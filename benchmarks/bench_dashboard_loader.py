@@ -0,0 +1,98 @@
+"""Dashboard data loading: per-tender loop vs the column-wise build_deadline_frame().
+
+The per-tender loop is tender_dashboard.py's loader before caching: one
+pd.to_datetime(..., dayfirst=True) call, CPV string build and event dict per
+tender, on every Streamlit rerun. build_deadline_frame() parses deadlines a
+chunk at a time with the explicit listing format. With st.cache_data a rerun
+only pays for unpickling the cached result, which the last row times.
+Both loaders run over the saved corpus BENCH_COPIES times over, counting
+deadlines from BENCH_TODAY so most are upcoming.
+
+Run from the repository root:  python benchmarks/bench_dashboard_loader.py
+"""
+import os
+import pickle
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from dashboard_data import UK_LOCATION_COORDINATES, build_deadline_frame
+from fake_site import load_corpus
+
+COPIES = int(os.environ.get("BENCH_COPIES", "5"))
+TODAY = date.fromisoformat(os.environ.get("BENCH_TODAY", "2025-06-01"))
+
+
+def per_tender_loader(tenders, today):
+    """The dashboard's loader before caching, with today as a parameter"""
+    today = datetime.combine(today, datetime.min.time())
+    deadline_list, events, all_cpv_details = [], [], set()
+    for tender in tenders:
+        details = tender.get("details", {})
+        deadline_raw = details.get("Submission deadline")
+        contract_location = details.get("Contract location", "Unknown")
+        try:
+            deadline_dt = pd.to_datetime(deadline_raw, dayfirst=True, errors="coerce")
+        except Exception:
+            deadline_dt = None
+        if deadline_dt and deadline_dt >= pd.Timestamp(today):
+            location_coords = UK_LOCATION_COORDINATES.get(contract_location)
+            cpv_codes = tender.get("cpv_codes", [])
+            cpv_descriptions = tender.get("cpv_descriptions", [])
+            combined_cpv = ", ".join([f"{code} - {desc}" for code, desc in zip(cpv_codes, cpv_descriptions)])
+            cpv_pairs = [f"{code} - {desc}" for code, desc in zip(cpv_codes, cpv_descriptions)]
+            all_cpv_details.update(cpv_pairs)
+            deadline_list.append({
+                "title": tender.get("title", "Untitled"), "deadline": deadline_dt,
+                "organisation": tender.get("organisation", "Unknown"), "cpv": combined_cpv,
+                "individual_cpvs": cpv_codes, "cpv_pairs": cpv_pairs, "link": tender.get("link", "#"),
+                "Contract location": contract_location,
+                "latitude": location_coords[0] if location_coords else None,
+                "longitude": location_coords[1] if location_coords else None,
+            })
+            urgent = deadline_dt <= pd.Timestamp(today + timedelta(days=7))
+            events.append({
+                "title": str(tender.get("title", "Untitled")),
+                "start": deadline_dt.strftime('%Y-%m-%d'), "end": deadline_dt.strftime('%Y-%m-%d'),
+                "url": str(tender.get("link", "#")),
+                "backgroundColor": "#e74c3c" if urgent else "#3498db",
+                "borderColor": "#c0392b" if urgent else "#2980b9",
+                "extendedProps": {
+                    "organisation": str(tender.get("organisation", "Unknown")),
+                    "contract_location": str(contract_location),
+                    "cpv_pairs": [str(pair) for pair in cpv_pairs],
+                    "deadline_str": deadline_dt.strftime('%d %b %Y'),
+                },
+            })
+    return pd.DataFrame(deadline_list), events, sorted(all_cpv_details)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()
+    tenders = [dict(t, tender_id=f"{t['tender_id']}-{copy}") for copy in range(COPIES) for t in corpus]
+
+    (old_df, old_events, old_options), old_seconds = timed(per_tender_loader, tenders, TODAY)
+    (new_df, new_events, cpv_index), new_seconds = timed(build_deadline_frame, tenders, TODAY)
+    cached = pickle.dumps((new_df, new_events, cpv_index))
+    _, hit_seconds = timed(pickle.loads, cached)
+
+    assert new_events == old_events
+    assert cpv_index.code_texts() == sorted({option.split(" - ", 1)[0] for option in old_options})
+    assert list(new_df["deadline"]) == list(old_df["deadline"])
+    assert list(new_df["cpv"]) == list(old_df["cpv"]) and list(new_df["title"]) == list(old_df["title"])
+    assert new_df["latitude"].equals(old_df["latitude"].astype(float))
+
+    print(f"📄 {len(tenders)} tenders, {len(new_df)} with deadlines from {TODAY}")
+    print(f"   per-tender loop : {old_seconds:6.3f}s on every rerun")
+    print(f"   column-wise     : {new_seconds:6.3f}s ({old_seconds / new_seconds:4.1f}x) when the data changes")
+    print(f"   cached rerun    : {hit_seconds * 1000:6.1f} ms ({len(cached) / 1e6:.1f} MB cached)")
@@ -0,0 +1,43 @@
+"""Pages-per-minute of the listing crawl with serial vs concurrent CPV fetching.
+
+Run from the repository root:  python benchmarks/bench_detail_fetch.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+import complete_tender_scraper as scraper
+import http_client
+from fake_site import FakeFindTender, isolated_stores
+from rate_limiter import limiter
+
+PAGES = int(os.environ.get("BENCH_PAGES", "5"))
+LATENCY = float(os.environ.get("BENCH_LATENCY", "0.1"))
+
+# The local fake site can take far more than the live budget
+limiter.set_budget(rate=float(os.environ.get("BENCH_RPS", "200")), max_concurrency=16)
+
+
+def crawl_pages(base_url, pages, max_workers):
+    """Crawl listing pages 1..pages and return elapsed seconds"""
+    start = time.perf_counter()
+    for page in range(1, pages + 1):
+        response = http_client.get(f"{base_url}/Search/Results?page={page}")
+        soup = BeautifulSoup(response.content, 'html.parser')
+        tenders, _ = scraper.extract_tender_titles_and_links(soup, None, base_url, max_workers)
+        assert tenders and all(t['cpv_codes'] for t in tenders if t['tender_id'])
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    with FakeFindTender(latency=LATENCY) as site:
+        print(f"🌐 Fake site at {site.base_url} ({LATENCY * 1000:.0f} ms latency, {PAGES} pages)")
+        for workers in (1, 4, scraper.DETAIL_FETCH_WORKERS, 16):
+            with isolated_stores(scraper):
+                elapsed = crawl_pages(site.base_url, PAGES, workers)
+            label = "serial" if workers == 1 else f"{workers} workers"
+            print(f"   {label:>12}: {elapsed:6.2f}s  →  {PAGES / elapsed * 60:6.1f} pages/min")
@@ -0,0 +1,54 @@
+"""Parse time per listing page for each LISTING_PARSER backend, with an output equivalence check.
+
+Every backend must give exactly the same tenders and pagination as the original
+full html.parser soup, on the saved fixtures in benchmarks/fixtures/ and on
+listing pages rendered from the saved corpus.
+
+Run from the repository root:  python benchmarks/bench_listing_parser.py
+"""
+import glob
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import complete_tender_scraper as scraper
+from fake_site import load_corpus, render_listing_page
+
+BACKENDS = ["html.parser", "lxml-strainer", "lxml"]
+PAGES = int(os.environ.get("BENCH_PAGES", "50"))
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def comparable(result):
+    """Drop the run-dependent scraped_at timestamp"""
+    tenders, should_continue, pagination = result
+    return [{k: v for k, v in t.items() if k != 'scraped_at'} for t in tenders], should_continue, pagination
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()
+    pages = [render_listing_page(corpus, p, "https://www.find-tender.service.gov.uk").encode("utf-8")
+             for p in range(1, PAGES + 1)]
+    fixtures = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "listing_*.html"))):
+        with open(path, "rb") as f:
+            fixtures[os.path.basename(path)] = f.read()
+
+    # Equivalence: with and without a threshold so the early-stop path is covered too
+    for threshold in (None, date(2025, 6, 28)):
+        for name, content in list(fixtures.items()) + [(f"rendered page {i + 1}", c) for i, c in enumerate(pages)]:
+            expected = comparable(scraper.parse_listing_page(content, threshold, backend="html.parser"))
+            for backend in BACKENDS[1:]:
+                actual = comparable(scraper.parse_listing_page(content, threshold, backend=backend))
+                assert actual == expected, f"{backend} differs from html.parser on {name} (threshold {threshold})"
+    print(f"✅ All backends agree on {len(fixtures)} fixtures and {len(pages)} rendered pages")
+
+    for backend in BACKENDS:
+        start = time.perf_counter()
+        for content in pages:
+            scraper.parse_listing_page(content, None, backend=backend)
+        per_page = (time.perf_counter() - start) / len(pages) * 1000
+        print(f"   {backend:>14}: {per_page:7.2f} ms/page")
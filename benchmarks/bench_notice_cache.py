@@ -0,0 +1,41 @@
+"""Requests and bytes downloaded for repeated CPV extraction with the notice cache.
+
+Run 1 starts from an empty cache, run 2 is served entirely from fresh entries,
+run 3 forces revalidation (TTL 0) so every notice costs a 304 and no body.
+
+Run from the repository root:  python benchmarks/bench_notice_cache.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import complete_tender_scraper as scraper
+from fake_site import FakeFindTender, isolated_stores, load_corpus
+from rate_limiter import limiter
+
+NOTICES = int(os.environ.get("BENCH_NOTICES", "200"))
+LATENCY = float(os.environ.get("BENCH_LATENCY", "0.05"))
+
+limiter.set_budget(rate=float(os.environ.get("BENCH_RPS", "200")), max_concurrency=scraper.DETAIL_FETCH_WORKERS)
+
+if __name__ == "__main__":
+    corpus = load_corpus()[:NOTICES]
+    with isolated_stores(scraper), FakeFindTender(tenders=corpus, latency=LATENCY) as site:
+        # Only the HTTP cache is under test here
+        scraper.cpv_store.get = lambda tender_id: None
+        links = [f"{site.base_url}/Notice/{t['tender_id']}?origin=SearchResults&p=1" for t in corpus]
+        print(f"🌐 Fake site at {site.base_url}: {len(links)} notices, {LATENCY * 1000:.0f} ms latency")
+
+        for label, ttl in (("cold cache", None), ("warm cache", None), ("revalidate", 0)):
+            if ttl is not None:
+                scraper.notice_cache.ttl = ttl
+            requests_before, bytes_before = site.request_count, site.bytes_sent
+            start = time.perf_counter()
+            results = scraper.fetch_cpv_details(links, site.base_url)
+            elapsed = time.perf_counter() - start
+            assert [codes for codes, _ in results] == [t['cpv_codes'] for t in corpus]
+            print(f"   {label:>11}: {elapsed:6.2f}s, {site.request_count - requests_before:4d} requests, "
+                  f"{(site.bytes_sent - bytes_before) / 1024:8.1f} KB downloaded")
+        print(f"🗄️ {scraper.notice_cache.summary()}")
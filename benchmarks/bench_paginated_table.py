@@ -0,0 +1,80 @@
+"""Table payloads: the whole filtered frame vs one sorted page from table_page().
+
+st.dataframe serialises every row and column it is given on each rerun. This
+compares serialising the viewer's full json-normalised tender table with
+sorting it server-side and serialising one page of the default columns.
+The table is the saved corpus BENCH_COPIES times over, and pages are
+BENCH_PAGE_SIZE rows. Payloads are Arrow IPC bytes, as Streamlit sends them,
+when pyarrow is installed, or JSON text otherwise. Best of BENCH_REPEAT.
+
+Run from the repository root:  python benchmarks/bench_paginated_table.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dashboard_data import build_tender_table, table_page
+from fake_site import load_corpus
+
+COPIES = int(os.environ.get("BENCH_COPIES", "5"))
+PAGE_SIZE = int(os.environ.get("BENCH_PAGE_SIZE", "50"))
+REPEAT = int(os.environ.get("BENCH_REPEAT", "3"))
+TABLE_COLUMNS = ["title", "organisation", "publication_date_parsed", "submission_deadline", "cpv_codes", "link"]
+
+try:
+    import pyarrow as pa
+
+    PAYLOAD = "Arrow"
+
+    def payload(df):
+        # Streamlit falls back to strings for object columns Arrow can't type
+        try:
+            table = pa.Table.from_pandas(df)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            table = pa.Table.from_pandas(df.astype({c: str for c in df.columns if df[c].dtype == object}))
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().size
+except ImportError:
+    PAYLOAD = "JSON"
+
+    def payload(df):
+        return len(df.to_json(orient="split", date_format="iso"))
+
+
+def best_of(func, *args):
+    best, result = float("inf"), None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()
+    tenders = [dict(t, tender_id=f"{t['tender_id']}-{copy}") for copy in range(COPIES) for t in corpus]
+    df, _ = build_tender_table(tenders)
+
+    full_bytes, full_seconds = best_of(payload, df)
+    last_page = -(-len(df) // PAGE_SIZE)
+    rows = [("full table", len(df), len(df.columns), full_bytes, full_seconds)]
+    for label, page, sort_by in (("page 1", 1, None),
+                                 ("page 1 by deadline", 1, "submission_deadline"),
+                                 ("last page by title", last_page, "title")):
+        def render():
+            frame = table_page(df, page, PAGE_SIZE, sort_by, True, TABLE_COLUMNS)
+            return frame, payload(frame)
+        (frame, page_bytes), seconds = best_of(render)
+        rows.append((label, len(frame), len(frame.columns), page_bytes, seconds))
+
+    expected = df.sort_values("title", kind="stable")[TABLE_COLUMNS].iloc[(last_page - 1) * PAGE_SIZE:]
+    assert table_page(df, last_page, PAGE_SIZE, "title", True, TABLE_COLUMNS).equals(expected)
+
+    print(f"📄 {len(df)} tenders, {len(df.columns)} columns, {PAYLOAD} payload, best of {REPEAT}")
+    for label, row_count, column_count, size, seconds in rows:
+        print(f"   {label:>19}: {row_count:6d} rows x {column_count:2d} columns, {size / 1e6:7.3f} MB, "
+              f"{seconds * 1000:7.1f} ms to slice and serialise")
@@ -0,0 +1,63 @@
+"""Wall time of the blocking page-by-page crawl vs the pipelined crawl.
+
+The blocking crawl sleeps between listing pages as the old loop did; the
+pipeline overlaps listing fetches with detail fetches for earlier pages and
+is paced only by the shared rate limiter.
+
+Run from the repository root:  python benchmarks/bench_pipeline.py
+"""
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+import complete_tender_scraper as scraper
+import http_client
+from fake_site import FakeFindTender, isolated_stores, load_corpus
+from rate_limiter import limiter
+
+PAGES = int(os.environ.get("BENCH_PAGES", "8"))
+LATENCY = float(os.environ.get("BENCH_LATENCY", "0.1"))
+LISTING_DELAY = float(os.environ.get("BENCH_DELAY", "0.5"))
+
+# The local fake site can take far more than the live budget
+limiter.set_budget(rate=float(os.environ.get("BENCH_RPS", "200")), max_concurrency=scraper.DETAIL_FETCH_WORKERS)
+
+
+def blocking_crawl(base_url, pages):
+    """The pre-pipeline loop: listing page, then all its detail pages, then a fixed sleep"""
+    tenders = []
+    for page in range(1, pages + 1):
+        response = http_client.get(f"{base_url}/Search/Results?page={page}")
+        soup = BeautifulSoup(response.content, 'html.parser')
+        page_tenders, _ = scraper.extract_tender_titles_and_links(soup, None, base_url)
+        tenders.extend(page_tenders)
+        if page < pages:
+            time.sleep(LISTING_DELAY)
+    return tenders
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()[:PAGES * 20]
+    with FakeFindTender(tenders=corpus, latency=LATENCY) as site:
+        print(f"🌐 Fake site at {site.base_url} ({LATENCY * 1000:.0f} ms latency, {PAGES} pages, "
+              f"{LISTING_DELAY}s blocking delay, {scraper.DETAIL_FETCH_WORKERS} detail workers)")
+
+        with isolated_stores(scraper):
+            start = time.perf_counter()
+            blocking = blocking_crawl(site.base_url, PAGES)
+            blocking_time = time.perf_counter() - start
+
+        with isolated_stores(scraper) as tmp:
+            start = time.perf_counter()
+            pipelined = scraper.scrape_find_tender_last_6_months(threshold_date=date(2000, 1, 1), base_url=site.base_url,
+                                                                 json_filename=os.path.join(tmp, "out.json"))
+            pipelined_time = time.perf_counter() - start
+
+    assert [t['tender_id'] for t in blocking] == [t['tender_id'] for t in pipelined]
+    print(f"   blocking : {blocking_time:6.2f}s  →  {PAGES / blocking_time * 60:6.1f} pages/min")
+    print(f"   pipelined: {pipelined_time:6.2f}s  →  {PAGES / pipelined_time * 60:6.1f} pages/min")
@@ -0,0 +1,55 @@
+"""Throughput and 429 count against a throttling fake site, fixed sleeps vs the shared limiter.
+
+The fake site answers 429 (Retry-After: 1) above MAX_RPS requests per second.
+
+Run from the repository root:  python benchmarks/bench_rate_limiter.py
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from fake_site import FakeFindTender, load_corpus
+from rate_limiter import RateLimiter
+
+REQUESTS = int(os.environ.get("BENCH_REQUESTS", "200"))
+MAX_RPS = int(os.environ.get("BENCH_MAX_RPS", "20"))
+LATENCY = float(os.environ.get("BENCH_LATENCY", "0.05"))
+
+
+def unthrottled(session, urls, workers=8):
+    """Concurrent fetches with no pacing - what the detail pool would do on its own"""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda url: session.get(url, timeout=10).status_code, urls))
+
+
+def limited(session, urls, limiter, workers=8):
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda url: limiter.get(session, url, timeout=10).status_code, urls))
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()[:REQUESTS]
+    with FakeFindTender(tenders=corpus, latency=LATENCY, max_rps=MAX_RPS) as site:
+        urls = [f"{site.base_url}/Notice/{t['tender_id']}" for t in corpus]
+        session = requests.Session()
+        print(f"🌐 Fake site at {site.base_url}: {len(urls)} notices, 429 above {MAX_RPS} req/s")
+
+        runs = [
+            ("no pacing", lambda: unthrottled(session, urls)),
+            ("limiter @ budget", lambda: limited(session, urls, RateLimiter(rate=MAX_RPS * 0.9, max_concurrency=8))),
+            ("limiter @ 2x budget", lambda: limited(session, urls, RateLimiter(rate=MAX_RPS * 2, max_concurrency=8))),
+        ]
+        for label, run in runs:
+            before = site.throttled_count
+            start = time.perf_counter()
+            statuses = run()
+            elapsed = time.perf_counter() - start
+            ok = sum(1 for s in statuses if s == 200)
+            print(f"   {label:>20}: {elapsed:6.2f}s, {ok}/{len(urls)} OK, "
+                  f"{site.throttled_count - before} × 429, {ok / elapsed:5.1f} OK/s")
+            time.sleep(1.1)
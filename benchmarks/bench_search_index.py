@@ -0,0 +1,81 @@
+"""Keyword search: .str.lower().str.contains() over three columns vs the SearchIndex.
+
+Streamlit.py used to lowercase and scan the title, description and
+organisation of every tender on each keystroke. The SearchIndex is built
+once per data version, and a query gathers only the postings of the terms
+its tokens prefix, then ranks them. The corpus is repeated BENCH_COPIES times
+(a comma-separated list) so the scan grows with the table while the index
+grows only with the matches. Every index result is checked against a
+word-prefix regex over the same columns. Best of BENCH_REPEAT.
+
+Run from the repository root:  python benchmarks/bench_search_index.py
+"""
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from fake_site import load_corpus
+from search_index import SearchIndex, tokenize
+
+COPIES = [int(n) for n in os.environ.get("BENCH_COPIES", "1,5,25").split(",")]
+REPEAT = int(os.environ.get("BENCH_REPEAT", "5"))
+QUERIES = ["software", "cyber security", "health serv", "framework for the supply"]
+COLUMNS = ["title", "description", "organisation"]
+
+
+def best_of(func, *args):
+    best, result = float("inf"), None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def str_contains(df, search_term):
+    """Streamlit.py's keyword filter before the index"""
+    return (
+        df['title'].str.lower().str.contains(search_term, na=False) |
+        df['description'].str.lower().str.contains(search_term, na=False) |
+        df['organisation'].str.lower().str.contains(search_term, na=False)
+    ).to_numpy()
+
+
+def word_prefix_reference(df, query):
+    """Rows where every query token starts a word in one of the columns"""
+    mask = np.ones(len(df), dtype=bool)
+    for token in tokenize(query):
+        pattern = r"\b" + re.escape(token)
+        mask &= np.logical_or.reduce([df[column].str.lower().str.contains(pattern, na=False).to_numpy()
+                                      for column in COLUMNS])
+    return mask
+
+
+if __name__ == "__main__":
+    corpus = pd.DataFrame(load_corpus())[COLUMNS]
+    print(f"🔎 queries: {', '.join(repr(query) for query in QUERIES)}; best of {REPEAT}")
+    for copies in COPIES:
+        df = pd.concat([corpus] * copies, ignore_index=True)
+        start = time.perf_counter()
+        index = SearchIndex.from_frame(df)
+        build_seconds = time.perf_counter() - start
+        scan_total = index_total = 0.0
+        matches = []
+        for query in QUERIES:
+            _, scan_seconds = best_of(str_contains, df, query)
+            (rows, scores), index_seconds = best_of(index.search, query)
+            assert np.array_equal(index.mask(rows), word_prefix_reference(df, query))
+            assert np.all(np.diff(scores) <= 0)
+            scan_total += scan_seconds
+            index_total += index_seconds
+            matches.append(len(rows))
+        print(f"   {len(df):7d} tenders: index built in {build_seconds:5.2f}s ({len(index)} terms); "
+              f"per query .str.contains {scan_total / len(QUERIES) * 1000:7.1f} ms, "
+              f"index {index_total / len(QUERIES) * 1000:5.2f} ms ({scan_total / index_total:4.0f}x), "
+              f"matches {matches}")
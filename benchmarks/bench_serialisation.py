@@ -0,0 +1,56 @@
+"""Dump time, load time and file size of a tender snapshot for each serialisation backend.
+
+Writes the saved 6-month corpus (109k lines as saved with indent=2) through
+write_tender_file() and reads it back with read_tender_file(), once per
+available backend, compact and indented. The stdlib json, indented row is
+what the scrapers wrote before this layer. Each timing is the best of
+BENCH_REPEAT runs.
+
+Run from the repository root:  python benchmarks/bench_serialisation.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tender_io
+from fake_site import DEFAULT_CORPUS, load_corpus
+from tender_io import read_tender_file, write_tender_file
+
+REPEAT = int(os.environ.get("BENCH_REPEAT", "5"))
+
+
+def best_of(func):
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()
+    with open(DEFAULT_CORPUS, encoding="utf-8") as f:
+        lines = sum(1 for _ in f)
+    backends = ["json"] + [name for name, module in (("msgspec", tender_io.msgspec), ("orjson", tender_io.orjson)) if module]
+    print(f"📄 {len(corpus)} tenders ({lines} lines in {os.path.basename(DEFAULT_CORPUS)}), best of {REPEAT}")
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "tenders.json")
+        for backend in backends:
+            tender_io.JSON_BACKEND = backend
+            for pretty in (True, False):
+                dump_seconds = best_of(lambda: write_tender_file(path, {}, corpus, pretty=pretty))
+                load_seconds = best_of(lambda: read_tender_file(path))
+                assert read_tender_file(path)[1] == corpus
+                rows.append((f"{backend}, {'indented' if pretty else 'compact'}", dump_seconds, load_seconds,
+                             os.path.getsize(path)))
+
+    baseline = rows[0]
+    for label, dump_seconds, load_seconds, size in rows:
+        print(f"   {label:>18}: dump {dump_seconds * 1000:6.0f} ms ({baseline[1] / dump_seconds:4.1f}x), "
+              f"load {load_seconds * 1000:5.0f} ms ({baseline[2] / load_seconds:4.1f}x), {size / 1e6:5.2f} MB")
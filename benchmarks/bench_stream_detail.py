@@ -0,0 +1,42 @@
+"""Bytes read and CPU per notice with streamed early-terminating downloads vs full downloads.
+
+Run from the repository root:  python benchmarks/bench_stream_detail.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import complete_tender_scraper as scraper
+from fake_site import FakeFindTender, isolated_stores, load_corpus
+from rate_limiter import limiter
+
+NOTICES = int(os.environ.get("BENCH_NOTICES", "200"))
+LATENCY = float(os.environ.get("BENCH_LATENCY", "0.02"))
+
+limiter.set_budget(rate=float(os.environ.get("BENCH_RPS", "500")), max_concurrency=scraper.DETAIL_FETCH_WORKERS)
+
+if __name__ == "__main__":
+    corpus = load_corpus()[:NOTICES]
+    with FakeFindTender(tenders=corpus, latency=LATENCY) as site:
+        links = [f"{site.base_url}/Notice/{t['tender_id']}?origin=SearchResults&p=1" for t in corpus]
+        print(f"🌐 Fake site at {site.base_url}: {len(links)} notices")
+
+        for streaming in (False, True):
+            scraper.STREAM_DETAIL_PAGES = streaming
+            for key in scraper.stream_stats:
+                scraper.stream_stats[key] = 0
+            with isolated_stores(scraper):
+                wall, cpu = time.perf_counter(), time.process_time()
+                results = scraper.fetch_cpv_details(links, site.base_url)
+                wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+                # Whatever was cached is exactly what was read off the wire
+                conn = scraper.notice_cache._connection()
+                stored = sum(len(scraper.notice_cache.lookup(url)['body']) for (url,) in conn.execute("SELECT url FROM responses"))
+            assert [codes for codes, _ in results] == [t['cpv_codes'] for t in corpus]
+            label = "streamed" if streaming else "full"
+            print(f"   {label:>9}: {wall:5.2f}s wall, {cpu / len(links) * 1000:5.2f} ms CPU/notice, "
+                  f"{stored / len(links) / 1024:5.1f} KB body/notice")
+            if streaming:
+                print(f"   📉 {scraper.stream_summary()}")
@@ -0,0 +1,79 @@
+"""Peak memory and wall time of validating a tender file: json.load vs the streaming reader.
+
+Writes the saved corpus BENCH_COPIES times over (with distinct tender ids) to
+a temp file in the scrapers' layout, then runs the validator's counts once on
+a json.load of the whole file, as the validator used to, and once through
+validate_scraped_data, which streams it with tender_io. Peak memory is
+measured with tracemalloc (Python objects only) on a separate run from the
+timing.
+
+Run from the repository root:  python benchmarks/bench_stream_reader.py
+"""
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tender_io
+from fake_site import load_corpus
+from output_validation.tender_validator import validate_scraped_data
+
+COPIES = int(os.environ.get("BENCH_COPIES", "5"))
+
+
+def load_and_count(json_file):
+    """The validator's old approach: materialise the file, then count over the list"""
+    with open(json_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    tenders = data.get('tenders', [])
+    ids = [t.get('tender_id') for t in tenders if t.get('tender_id')]
+    return {
+        'total_tenders': len(tenders),
+        'duplicates': len(ids) - len(set(ids)),
+        'organisations': len({t.get('organisation') for t in tenders if t.get('organisation') not in (None, '', 'N/A')})
+    }
+
+
+def stream_and_validate(json_file):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return validate_scraped_data(json_file)
+
+
+def measure(func, json_file):
+    """Time an untraced run, then take peak memory from a second run, since tracemalloc slows allocation"""
+    start = time.perf_counter()
+    result = func(json_file)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func(json_file)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = os.path.join(tmp, "tenders.json")
+        with open(json_file, 'w', encoding='utf-8') as f:
+            tenders = [dict(t, tender_id=f"{t['tender_id']}-{copy}") for copy in range(COPIES) for t in corpus]
+            json.dump({'metadata': {'total_tenders': len(tenders)}, 'tenders': tenders}, f, indent=2, ensure_ascii=False)
+            del tenders
+        size = os.path.getsize(json_file)
+        print(f"📄 {len(corpus) * COPIES} tenders, {size / 1e6:.0f} MB "
+              f"(ijson {'available' if tender_io.IJSON_AVAILABLE else 'missing - streaming falls back to json.load'})")
+
+        loaded, load_seconds, load_peak = measure(load_and_count, json_file)
+        streamed, stream_seconds, stream_peak = measure(stream_and_validate, json_file)
+        assert loaded['total_tenders'] == streamed['total_tenders']
+        assert loaded['duplicates'] == streamed['duplicates']
+
+    print(f"   {'json.load':>10}: {load_seconds:6.2f}s, peak {load_peak / 1e6:7.1f} MB")
+    print(f"   {'streaming':>10}: {stream_seconds:6.2f}s, peak {stream_peak / 1e6:7.1f} MB  "
+          f"({load_peak / stream_peak:.0f}x less memory)")
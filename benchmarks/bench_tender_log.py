@@ -0,0 +1,89 @@
+"""Disk I/O of saving a crawl page by page: full snapshot rewrites vs the JSONL log.
+
+Replays the saved corpus as 20-tender pages into a temp dir, once with the old
+per-page save (backup rename + full indent=2 rewrite) and once with TenderLog
+appends compacted every COMPACT_EVERY_PAGES pages.
+Backups are named by the second, so replaying at full speed overwrites most
+of them and the disk figure for full rewrites understates a real crawl.
+
+Run from the repository root:  python benchmarks/bench_tender_log.py
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import backup_store
+import complete_tender_scraper as scraper
+from fake_site import RESULTS_PER_PAGE, load_corpus
+from tender_log import TenderLog, load_tenders
+
+
+def dir_bytes(path):
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def written_bytes():
+    with open(f"/proc/{os.getpid()}/io") as f:
+        return int(next(line for line in f if line.startswith("wchar")).split()[1])
+
+
+def replay(corpus, save_page):
+    pages = [corpus[i:i + RESULTS_PER_PAGE] for i in range(0, len(corpus), RESULTS_PER_PAGE)]
+    written = written_bytes()
+    start = time.perf_counter()
+    for number, page in enumerate(pages, 1):
+        save_page(number, page)
+    return time.perf_counter() - start, written_bytes() - written, len(pages)
+
+
+if __name__ == "__main__":
+    corpus = load_corpus()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.makedirs("output/backups")
+        snapshot = "output/tenders.json"
+
+        collected = []
+
+        def rewrite(number, page):
+            # The pre-log save: move the previous file into backups/, then write everything again
+            collected.extend(page)
+            if os.path.exists(snapshot):
+                os.rename(snapshot, f"output/backups/{os.path.basename(snapshot)}.backup_{int(time.time())}")
+            with open(snapshot, "w", encoding="utf-8") as f:
+                json.dump({"metadata": scraper.snapshot_metadata(len(collected)), "tenders": collected}, f,
+                          indent=2, ensure_ascii=False)
+
+        sys.stdout = open(os.devnull, "w")
+        rewrite_time, rewrite_written, pages = replay(corpus, rewrite)
+        sys.stdout = sys.__stdout__
+        rewrite_disk = dir_bytes("output")
+
+        for name in os.listdir("output/backups"):
+            os.remove(os.path.join("output/backups", name))
+        os.remove(snapshot)
+        backup_store.backup_store = backup_store.BackupStore("output/backups/store")
+
+        log = TenderLog(snapshot)
+        log.start(replace=True)
+
+        def append(number, page):
+            log.append(page)
+            if number % scraper.COMPACT_EVERY_PAGES == 0:
+                log.compact(scraper.snapshot_metadata(number * RESULTS_PER_PAGE))
+
+        sys.stdout = open(os.devnull, "w")
+        log_time, log_written, _ = replay(corpus, append)
+        log.compact(scraper.snapshot_metadata(len(corpus)))
+        sys.stdout = sys.__stdout__
+        log_disk = dir_bytes("output")
+        assert [t["tender_id"] for t in load_tenders(snapshot)["tenders"]] == [t["tender_id"] for t in corpus]
+
+    print(f"📦 {len(corpus)} tenders in {pages} pages of {RESULTS_PER_PAGE}")
+    print(f"   full rewrites: {rewrite_time:6.2f}s, {rewrite_written / 1e6:8.1f} MB written, {rewrite_disk / 1e6:8.1f} MB left on disk")
+    print(f"   JSONL log    : {log_time:6.2f}s, {log_written / 1e6:8.1f} MB written, {log_disk / 1e6:8.1f} MB left on disk "
+          f"(compacted every {scraper.COMPACT_EVERY_PAGES} pages)")
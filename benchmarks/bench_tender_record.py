@@ -0,0 +1,56 @@
+"""Memory held by BENCH_TENDERS tenders as dicts vs compact Tender records.
+
+Cycles the saved corpus up to BENCH_TENDERS tenders with distinct ids. Each
+tender is decoded from its own JSON line, as the log, checkpoint and backfill
+paths read them, so no strings are shared between tenders up front. The dicts
+and the records built from them are measured separately with tracemalloc;
+build times are taken on untraced runs.
+
+Run from the repository root:  python benchmarks/bench_tender_record.py
+"""
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_site import load_corpus
+from tender_record import Tender
+
+COUNT = int(os.environ.get("BENCH_TENDERS", "100000"))
+
+
+def tender_lines(corpus, count):
+    for n in range(count):
+        tender = corpus[n % len(corpus)]
+        yield json.dumps(dict(tender, tender_id=f"{tender['tender_id']}-{n // len(corpus)}"), ensure_ascii=False)
+
+
+def measure(build, lines):
+    """Time an untraced build, then measure the memory a second, traced build holds"""
+    start = time.perf_counter()
+    held = [build(line) for line in lines]
+    elapsed = time.perf_counter() - start
+    del held
+    gc.collect()
+    tracemalloc.start()
+    held = [build(line) for line in lines]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return held, size, elapsed
+
+
+if __name__ == "__main__":
+    lines = list(tender_lines(load_corpus(), COUNT))
+    dicts, dict_bytes, dict_seconds = measure(json.loads, lines)
+    del dicts
+    records, record_bytes, record_seconds = measure(lambda line: Tender.from_dict(json.loads(line)), lines)
+    assert all(record.to_dict() == json.loads(line) for record, line in zip(records, lines))
+
+    print(f"📦 {COUNT} tenders")
+    print(f"   {'dicts':>7}: {dict_bytes / 1e6:7.1f} MB  ({dict_bytes / COUNT:5.0f} B/tender, built in {dict_seconds:.2f}s)")
+    print(f"   {'records':>7}: {record_bytes / 1e6:7.1f} MB  ({record_bytes / COUNT:5.0f} B/tender, built in {record_seconds:.2f}s)"
+          f"  →  {dict_bytes / record_bytes:.1f}x smaller")
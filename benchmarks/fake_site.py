@@ -0,0 +1,247 @@
+"""Local stand-in for find-tender.service.gov.uk used by the benchmarks.
+
+Listing and notice pages are rendered from a saved tender corpus using the
+same markup the scrapers select on, and every response is delayed by a fixed
+latency so that network-bound code paths can be compared offline.
+"""
+import html
+import os
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from tender_io import read_tender_file
+
+DEFAULT_CORPUS = "output/backups/tender_opportunities_last6months_with_cpv.json.backup_1751159677"
+RESULTS_PER_PAGE = 20
+# Publication-date filters, as sent by complete_tender_scraper.publication_date_filter()
+PUBLISHED_FROM_PARAM = "published_from"
+PUBLISHED_TO_PARAM = "published_to"
+
+# Filler so notice pages are roughly the size of the real ones (~60 KB)
+FILLER_SECTION = (
+    '<div class="govuk-summary-list__row"><dt class="govuk-summary-list__key">Section</dt>'
+    '<dd class="govuk-summary-list__value">' + ("Lorem ipsum dolor sit amet. " * 40) + "</dd></div>\n"
+)
+
+
+def load_corpus(json_file=DEFAULT_CORPUS):
+    """Load the tenders used to render the fake site"""
+    return read_tender_file(json_file)[1]
+
+
+def render_listing_page(tenders, page, base_url, per_page=RESULTS_PER_PAGE):
+    """Render one search results page in the site's listing markup"""
+    max_page = max(1, (len(tenders) + per_page - 1) // per_page)
+    rows = []
+    for i, tender in enumerate(tenders[(page - 1) * per_page:page * per_page]):
+        href = f"{base_url}/Notice/{tender['tender_id']}?origin=SearchResults&p={page}"
+        entries = "".join(
+            f'<div class="search-result-entry"><dt>{html.escape(k)}</dt><dd>{html.escape(str(v))}</dd></div>'
+            for k, v in (tender.get("details") or {}).items()
+        )
+        rows.append(
+            '<div class="search-result">\n'
+            f'  <div class="search-result-header"><h2><a href="{html.escape(href)}">{html.escape(tender.get("title", ""))}</a></h2></div>\n'
+            f'  <div class="search-result-sub-header">{html.escape(tender.get("organisation", ""))}</div>\n'
+            f'  <div class="wrap-text" id="description-{i}">{html.escape(tender.get("description", ""))}</div>\n'
+            f'  <dl>{entries}</dl>\n'
+            '</div>'
+        )
+
+    paginate = []
+    for p in range(max(1, page - 3), min(max_page, page + 3) + 1):
+        if p == page:
+            paginate.append(f'<li class="standard-paginate-selected">{p}</li>')
+        else:
+            paginate.append(f'<li class="standard-paginate"><a href="/Search/Results?page={p}">{p}</a></li>')
+    if page < max_page:
+        paginate.append(f'<li><a class="standard-paginate-next" href="/Search/Results?page={page + 1}">Next</a></li>')
+
+    return (
+        "<!DOCTYPE html><html><head><title>Search results</title>"
+        + "<script>var padding = 1;</script>" * 50
+        + '</head><body><header class="govuk-header">Find a Tender</header><main id="dashboard_notices">'
+        + f'<span class="search-result-count">{len(tenders):,}</span>'
+        + "\n".join(rows)
+        + f'<ul class="gadget-footer-paginate">{"".join(paginate)}</ul>'
+        + "</main><footer>" + "Footer link " * 200 + "</footer></body></html>"
+    )
+
+
+def filter_by_publication_date(tenders, query):
+    """Apply the search form's publication-date filters to the corpus"""
+    bounds = []
+    for param in (PUBLISHED_FROM_PARAM, PUBLISHED_TO_PARAM):
+        fields = [query.get(f"{param}[{field}]", [None])[0] for field in ("year", "month", "day")]
+        bounds.append(date(*map(int, fields)).isoformat() if all(fields) else None)
+    date_from, date_to = bounds
+    if not date_from and not date_to:
+        return tenders
+    return [
+        t for t in tenders
+        if t.get("publication_date_parsed")
+        and (not date_from or t["publication_date_parsed"] >= date_from)
+        and (not date_to or t["publication_date_parsed"] <= date_to)
+    ]
+
+
+def render_notice_page(tender):
+    """Render a notice detail page with the CPV bullet list part-way down"""
+    cpv_items = "".join(
+        f"<li>{html.escape(code)} - {html.escape(desc)}</li>"
+        for code, desc in zip(tender.get("cpv_codes", []), tender.get("cpv_descriptions", []))
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>" + html.escape(tender.get("title", "")) + "</title></head><body>"
+        + '<ul class="govuk-list govuk-list--bullet"><li>Related notices</li></ul>'
+        + FILLER_SECTION * 15
+        + '<h3>Common procurement vocabulary (CPV)</h3>'
+        + f'<ul class="govuk-list govuk-list--bullet">{cpv_items}</ul>'
+        + FILLER_SECTION * 35
+        + "</body></html>"
+    )
+
+
+@contextmanager
+def isolated_stores(scraper):
+    """Point the scraper's CPV store, notice cache, tender store and backups at a temp dir so runs start
+    cold and output/ is untouched"""
+    import backup_store
+    from cpv_store import CpvStore
+    from notice_cache import NoticeCache
+    from tender_store import TenderStore
+
+    saved = scraper.cpv_store, scraper.notice_cache, scraper.tender_store, backup_store.backup_store
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper.cpv_store = CpvStore(os.path.join(tmp, "cpv_store.json"))
+        scraper.notice_cache = NoticeCache(os.path.join(tmp, "notice_cache.sqlite"))
+        scraper.tender_store = TenderStore(os.path.join(tmp, "tenders.sqlite"))
+        backup_store.backup_store = backup_store.BackupStore(os.path.join(tmp, "backups"))
+        try:
+            yield tmp
+        finally:
+            scraper.cpv_store, scraper.notice_cache, scraper.tender_store, backup_store.backup_store = saved
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    """Clients that hang up mid-response (streamed downloads stopping early) are expected"""
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+class FakeFindTender:
+    """Threaded HTTP server serving listing and notice pages with added latency"""
+
+    def __init__(self, tenders=None, latency=0.05, per_page=RESULTS_PER_PAGE, max_rps=None, date_filters=True):
+        self.tenders = tenders if tenders is not None else load_corpus()
+        self.by_id = {t["tender_id"]: t for t in self.tenders if t.get("tender_id")}
+        self.latency = latency
+        self.per_page = per_page
+        self.max_rps = max_rps
+        # False mimics a site that ignores the publication-date parameters
+        self.date_filters = date_filters
+        self.request_count = 0
+        self.notice_requests = 0
+        self.throttled_count = 0
+        self.bytes_sent = 0
+        self._recent = []
+        self._lock = threading.Lock()
+        self._server = QuietHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = None
+
+    def _handler_class(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                with site._lock:
+                    site.request_count += 1
+                    now = time.monotonic()
+                    site._recent = [t for t in site._recent if now - t < 1.0]
+                    throttle = site.max_rps is not None and len(site._recent) >= site.max_rps
+                    if throttle:
+                        site.throttled_count += 1
+                    else:
+                        site._recent.append(now)
+                if throttle:
+                    # Mimic the site's rate limiting: 429 with a Retry-After in seconds
+                    self.send_response(429)
+                    self.send_header("Retry-After", "1")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                time.sleep(site.latency)
+                parsed = urlparse(self.path)
+                extra_headers = {}
+                if parsed.path == "/Search/Results":
+                    query = parse_qs(parsed.query)
+                    page = int(query.get("page", ["1"])[0])
+                    tenders = filter_by_publication_date(site.tenders, query) if site.date_filters else site.tenders
+                    body = render_listing_page(tenders, page, site.base_url, site.per_page)
+                elif parsed.path.startswith("/Notice/"):
+                    tender = site.by_id.get(parsed.path.rsplit("/", 1)[-1])
+                    if tender is None:
+                        self.send_error(404)
+                        return
+                    with site._lock:
+                        site.notice_requests += 1
+                    # The ETag changes when a benchmark amends the notice's CPV codes
+                    etag = f'"{tender["tender_id"]}-{zlib.crc32(repr(tender.get("cpv_codes")).encode()):08x}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.send_header("ETag", etag)
+                        self.send_header("Content-Length", "0")
+                        self.end_headers()
+                        return
+                    body = render_notice_page(tender)
+                    extra_headers = {"ETag": etag, "Last-Modified": "Sat, 28 Jun 2025 17:29:00 GMT"}
+                else:
+                    self.send_error(404)
+                    return
+                payload = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in extra_headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+                with site._lock:
+                    site.bytes_sent += len(payload)
+
+        return Handler
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == "__main__":
+    with FakeFindTender(latency=float(os.environ.get("FAKE_LATENCY", "0.05"))) as site:
+        print(f"🌐 Serving {len(site.tenders)} tenders at {site.base_url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
@@ -1,24 +1,73 @@
+import argparse
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from bs4 import BeautifulSoup
-import time
+from bs4 import BeautifulSoup, SoupStrainer, UnicodeDammit
 import json
 import os
 import re
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta
-
-# Setup session with retry logic
-session = requests.Session()
-retries = Retry(
-    total=3,
-    backoff_factor=2,
-    status_forcelist=[500, 502, 503, 504],
-    allowed_methods=["GET"]
-)
-adapter = HTTPAdapter(max_retries=retries)
-session.mount('https://', adapter)
-session.mount('http://', adapter)
+from urllib.parse import urlencode
+import http_client
+import tender_io
+from rate_limiter import limiter
+from notice_cache import notice_cache
+from cpv_store import cpv_store, tender_id_from_link
+from tender_log import TenderLog, load_tenders
+from backup_store import backup_snapshot
+from tender_store import tender_store
+from tender_record import Tender, as_dict, listing_description, listing_hash
+from tender_io import write_tender_file
+
+try:
+    import lxml.html
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# Number of detail pages fetched in parallel for each listing page
+DETAIL_FETCH_WORKERS = 8
+# Listing pages fetched and parsed ahead of the detail stage
+PREFETCH_PAGES = 2
+# Listing page parser: "lxml" (native lxml tree), "lxml-strainer" (BeautifulSoup over lxml, result
+# rows and pagination only) or "html.parser" (full BeautifulSoup, the original behaviour)
+LISTING_PARSER = "lxml" if LXML_AVAILABLE else "html.parser"
+# Listing pages only need the result rows and the pagination footer
+LISTING_STRAINER = SoupStrainer(class_=["search-result", "gadget-footer-paginate"])
+# Stop downloading a notice page once its CPV lists have been read
+STREAM_DETAIL_PAGES = True
+STREAM_CHUNK_SIZE = 8192
+# Bytes read past the last CPV list before giving up on more (multi-lot notices repeat the list per lot)
+STREAM_LOOKAHEAD_BYTES = 16384
+CPV_ITEM_PATTERN = re.compile(rb"<li[^>]*>\s*\d{8}\s*-")
+
+# Finished pages are appended to a JSONL log; the JSON snapshot is rebuilt from it every this many pages
+COMPACT_EVERY_PAGES = 25
+# Crawl state is written next to the output file after every finished page so an interrupted crawl can resume
+CHECKPOINT_SUFFIX = ".checkpoint"
+# Publication-date filters of the search form, used to split backfills into date shards. They are
+# GOV.UK date inputs, submitted as separate day, month and year fields (published_from[day]=...).
+# The site ignores parameters it doesn't know, so backfill.check_shard_filter() verifies they took effect
+PUBLISHED_FROM_PARAM = "published_from"
+PUBLISHED_TO_PARAM = "published_to"
+DATE_INPUT_FIELDS = ("day", "month", "year")
+
+
+def publication_date_filter(date_from, date_to):
+    """Search parameters restricting results to notices published date_from..date_to (inclusive)"""
+    params = {}
+    for name, value in ((PUBLISHED_FROM_PARAM, date_from), (PUBLISHED_TO_PARAM, date_to)):
+        for field in DATE_INPUT_FIELDS:
+            params[f"{name}[{field}]"] = getattr(value, field)
+    return params
+
+
+def listing_url(start_url, page, search_params=None):
+    """Newest-first listing page URL, with any extra search filters"""
+    query = urlencode({'sort': 'unix_published_date:DESC', **(search_params or {}), 'page': page})
+    return f"{start_url}?{query}#dashboard_notices"
 
 def parse_publication_date(date_string):
     try:
@@ -31,7 +80,78 @@ def parse_publication_date(date_string):
         print(f"⚠️ Warning: Could not parse date '{date_string}': {e}")
         return None
 
-def extract_cpv_from_detail_page(link, base_url):
+# Bytes transferred for streamed notice pages in this run
+stream_stats = {'pages': 0, 'early_stops': 0, 'fallbacks': 0, 'bytes_read': 0, 'bytes_skipped': 0}
+stream_stats_lock = threading.Lock()
+
+def fetch_page(url, **kwargs):
+    return http_client.get(url, **kwargs)
+
+def read_until_cpv_section_closed(response):
+    """Read a streamed notice response only until the CPV lists have closed, then drop the rest"""
+    buffer = bytearray()
+    scan_from = 0
+    cpv_end = None
+    close_at = None
+    stopped_early = False
+
+    for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+        buffer += chunk
+        for match in CPV_ITEM_PATTERN.finditer(buffer, scan_from):
+            cpv_end = match.end()
+            close_at = None
+        # Rescan a little overlap next time so a tag split across chunks is still matched
+        scan_from = max(0, len(buffer) - 64)
+
+        if cpv_end is not None and close_at is None:
+            pos = buffer.find(b"</ul>", cpv_end)
+            if pos != -1:
+                close_at = pos + len(b"</ul>")
+        if close_at is not None and len(buffer) - close_at >= STREAM_LOOKAHEAD_BYTES:
+            stopped_early = True
+            break
+
+    bytes_read = response.raw.tell() if hasattr(response.raw, 'tell') else len(buffer)
+    content_length = response.headers.get('Content-Length')
+    if stopped_early:
+        response.close()
+    with stream_stats_lock:
+        stream_stats['pages'] += 1
+        stream_stats['bytes_read'] += bytes_read
+        if stopped_early:
+            stream_stats['early_stops'] += 1
+            if content_length and content_length.isdigit():
+                stream_stats['bytes_skipped'] += max(0, int(content_length) - bytes_read)
+    return bytes(buffer)
+
+def parse_cpv_from_html(content):
+    """Return (cpv_codes, cpv_descriptions) from the bullet lists of a notice page"""
+    soup = BeautifulSoup(content, 'html.parser')
+    cpv_codes = []
+    cpv_descriptions = []
+
+    bullet_lists = soup.find_all('ul', class_='govuk-list govuk-list--bullet')
+    for ul in bullet_lists:
+        for li in ul.find_all('li'):
+            text = li.get_text(strip=True)
+            match = re.match(r"^(\d{8})\s*-\s*(.+)", text)
+            if match:
+                cpv_codes.append(match.group(1))
+                cpv_descriptions.append(match.group(2))
+    return cpv_codes, cpv_descriptions
+
+def stream_summary():
+    return (f"{stream_stats['pages']} notice pages streamed, {stream_stats['early_stops']} stopped early, "
+            f"{stream_stats['fallbacks']} full-page fallbacks, {stream_stats['bytes_read'] / 1024:.0f} KB read, "
+            f"{stream_stats['bytes_skipped'] / 1024:.0f} KB not downloaded")
+
+def extract_cpv_from_detail_page(link, base_url, amended=False):
+    # A tender seen in any earlier run needs no request, unless its listing row shows it was amended
+    tender_id = tender_id_from_link(link)
+    known = None if amended else cpv_store.get(tender_id)
+    if known:
+        return known
+
     try:
         full_url = link if link.startswith("http") else base_url + link
 
@@ -39,35 +159,55 @@ def extract_cpv_from_detail_page(link, base_url):
             print(f"❌ Invalid URL detected: {full_url}")
             return [], []
 
-        res = session.get(full_url, timeout=15)
-        if res.status_code != 200:
+        # Notices rarely change after publication, so re-runs are mostly cache hits or 304s
+        if STREAM_DETAIL_PAGES:
+            status, content = notice_cache.get(full_url, fetch_page, read=read_until_cpv_section_closed,
+                                               revalidate=amended, stream=True)
+        else:
+            status, content = notice_cache.get(full_url, fetch_page, revalidate=amended)
+        if status != 200:
             print(f"❌ Failed to fetch detail page: {full_url}")
             return [], []
 
-        soup = BeautifulSoup(res.content, 'html.parser')
-        cpv_codes = []
-        cpv_descriptions = []
+        cpv_codes, cpv_descriptions = parse_cpv_from_html(content)
 
-        bullet_lists = soup.find_all('ul', class_='govuk-list govuk-list--bullet')
-        for ul in bullet_lists:
-            for li in ul.find_all('li'):
-                text = li.get_text(strip=True)
-                match = re.match(r"^(\d{8})\s*-\s*(.+)", text)
-                if match:
-                    cpv_codes.append(match.group(1))
-                    cpv_descriptions.append(match.group(2))
+        # The stream stopped on something that looked like a CPV item but didn't parse as one
+        if STREAM_DETAIL_PAGES and not cpv_codes and CPV_ITEM_PATTERN.search(content):
+            with stream_stats_lock:
+                stream_stats['fallbacks'] += 1
+            res = fetch_page(full_url)
+            if res.status_code == 200:
+                notice_cache.store(full_url, res.content, res.headers.get('ETag'), res.headers.get('Last-Modified'))
+                cpv_codes, cpv_descriptions = parse_cpv_from_html(res.content)
 
+        cpv_store.put(tender_id, cpv_codes, cpv_descriptions)
         return cpv_codes, cpv_descriptions
     except Exception as e:
         print(f"⚠️ Could not extract CPV codes from {link}: {e}")
         return [], []
 
-def extract_tender_titles_and_links(soup, threshold_date=None, base_url="https://www.find-tender.service.gov.uk"):
-    tenders = []
-    should_continue = True
-    search_results = soup.find_all('div', class_='search-result')
+def fetch_cpv_details(links, base_url, max_workers=DETAIL_FETCH_WORKERS):
+    """Fetch CPV codes for several detail pages concurrently, in the same order as links"""
+    if max_workers <= 1 or len(links) <= 1:
+        return [extract_cpv_from_detail_page(link, base_url) for link in links]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(links))) as executor:
+        return list(executor.map(lambda link: extract_cpv_from_detail_page(link, base_url), links))
+
+def _has_class(element, class_name):
+    return class_name in (element.get('class') or '').split()
+
+def _first(elements, class_name=None):
+    for element in elements:
+        if class_name is None or _has_class(element, class_name):
+            return element
+    return None
 
-    for result in search_results:
+def _text(element):
+    return element.text_content().strip()
+
+def iter_listing_rows_soup(soup):
+    """Yield (title, href, organisation, description, details) for each result in a BeautifulSoup listing"""
+    for result in soup.find_all('div', class_='search-result'):
         header = result.find('div', class_='search-result-header')
         if not header:
             continue
@@ -88,25 +228,71 @@ def extract_tender_titles_and_links(soup, threshold_date=None, base_url="https:/
         description = ""
         if description_div and description_div.get('id') and 'description' in description_div.get('id'):
             desc_text = description_div.get_text().strip()
-            description = desc_text[:200] + "..." if len(desc_text) > 200 else desc_text
+            description = listing_description(desc_text)
 
         details = {}
-        publication_date_text = None
-        publication_date_parsed = None
-
         dl_tag = result.find('dl')
         if dl_tag:
-            entries = dl_tag.find_all('div', class_='search-result-entry')
-            for entry in entries:
+            for entry in dl_tag.find_all('div', class_='search-result-entry'):
                 dt = entry.find('dt')
                 dd = entry.find('dd')
                 if dt and dd:
-                    key = dt.get_text().strip()
-                    value = dd.get_text().strip()
-                    details[key] = value
-                    if 'Publication date' in key:
-                        publication_date_text = value
-                        publication_date_parsed = parse_publication_date(value)
+                    details[dt.get_text().strip()] = dd.get_text().strip()
+
+        yield title, href, organisation, description, details
+
+def iter_listing_rows_lxml(root):
+    """Same rows as iter_listing_rows_soup, read straight from an lxml tree"""
+    for result in root.iter('div'):
+        if not _has_class(result, 'search-result'):
+            continue
+        header = _first(result.iterdescendants('div'), 'search-result-header')
+        if header is None:
+            continue
+        h2_tag = _first(header.iterdescendants('h2'))
+        if h2_tag is None:
+            continue
+        link_tag = _first(h2_tag.iterdescendants('a'))
+        if link_tag is None:
+            continue
+
+        title = _text(link_tag)
+        href = link_tag.get('href')
+
+        org_div = _first(result.iterdescendants('div'), 'search-result-sub-header')
+        organisation = _text(org_div) if org_div is not None else "N/A"
+
+        description_div = _first(result.iterdescendants('div'), 'wrap-text')
+        description = ""
+        if description_div is not None and description_div.get('id') and 'description' in description_div.get('id'):
+            desc_text = _text(description_div)
+            description = listing_description(desc_text)
+
+        details = {}
+        dl_tag = _first(result.iterdescendants('dl'))
+        if dl_tag is not None:
+            for entry in dl_tag.iterdescendants('div'):
+                if not _has_class(entry, 'search-result-entry'):
+                    continue
+                dt = _first(entry.iterdescendants('dt'))
+                dd = _first(entry.iterdescendants('dd'))
+                if dt is not None and dd is not None:
+                    details[_text(dt)] = _text(dd)
+
+        yield title, href, organisation, description, details
+
+def collect_tenders(rows, threshold_date=None):
+    """Turn listing rows into Tender records, stopping at the first one older than threshold_date"""
+    tenders = []
+    should_continue = True
+
+    for title, href, organisation, description, details in rows:
+        publication_date_text = None
+        publication_date_parsed = None
+        for key, value in details.items():
+            if 'Publication date' in key:
+                publication_date_text = value
+                publication_date_parsed = parse_publication_date(value)
 
         if threshold_date:
             if publication_date_parsed:
@@ -118,26 +304,36 @@ def extract_tender_titles_and_links(soup, threshold_date=None, base_url="https:/
                 print(f"⚠️ Skipping tender '{title}' - no valid publication date")
                 continue
 
-        cpv_codes, cpv_descriptions = extract_cpv_from_detail_page(href, base_url)
-
-        tender_data = {
-            'title': title,
-            'link': href,
-            'organisation': organisation,
-            'description': description,
-            'details': details,
-            'publication_date_text': publication_date_text,
-            'publication_date_parsed': publication_date_parsed.isoformat() if publication_date_parsed else None,
-            'scraped_at': datetime.now().isoformat(),
-            'tender_id': href.split('/')[-1].split('?')[0] if href else None,
-            'cpv_codes': cpv_codes,
-            'cpv_descriptions': cpv_descriptions
-        }
+        tender_data = Tender(
+            title=title,
+            link=href,
+            organisation=organisation,
+            description=description,
+            details=details,
+            publication_date_text=publication_date_text,
+            publication_date=publication_date_parsed,
+            scraped_at=datetime.now(),
+            tender_id=href.split('/')[-1].split('?')[0] if href else None
+        )
 
         tenders.append(tender_data)
 
     return tenders, should_continue
 
+def parse_tender_results(soup, threshold_date=None):
+    """Parse listing rows into Tender records; CPV fields are left empty for the detail stage"""
+    return collect_tenders(iter_listing_rows_soup(soup), threshold_date)
+
+def extract_tender_titles_and_links(soup, threshold_date=None, base_url="https://www.find-tender.service.gov.uk", max_workers=DETAIL_FETCH_WORKERS):
+    tenders, should_continue = parse_tender_results(soup, threshold_date)
+
+    # Detail pages are independent, so fetch them together rather than one by one
+    cpv_results = fetch_cpv_details([t['link'] for t in tenders], base_url, max_workers)
+    for tender_data, (cpv_codes, cpv_descriptions) in zip(tenders, cpv_results):
+        tender_data.set_cpv(cpv_codes, cpv_descriptions)
+
+    return tenders, should_continue
+
 def get_pagination_info(soup):
     pagination_info = {'current_page': 1, 'max_page': 1, 'next_page_url': None}
     pagination = soup.find('ul', class_='gadget-footer-paginate')
@@ -161,85 +357,339 @@ def get_pagination_info(soup):
             pagination_info['next_page_url'] = next_link.get('href')
     return pagination_info
 
-def save_tenders_to_json(all_tenders, filename):
-    data = {
-        "metadata": {
-            "total_tenders": len(all_tenders),
-            "last_updated": datetime.now().isoformat(),
-            "source_url": "https://www.find-tender.service.gov.uk/Search/Results",
-            "scraper_version": "2.0"
-        },
-        "tenders": all_tenders
+def get_pagination_info_lxml(root):
+    """Same as get_pagination_info, read straight from an lxml tree"""
+    pagination_info = {'current_page': 1, 'max_page': 1, 'next_page_url': None}
+    pagination = _first(root.iter('ul'), 'gadget-footer-paginate')
+    if pagination is not None:
+        current = _first(pagination.iterdescendants('li'), 'standard-paginate-selected')
+        if current is not None:
+            current_text = _text(current)
+            if current_text.isdigit():
+                pagination_info['current_page'] = int(current_text)
+        page_links = []
+        for li in pagination.iterdescendants('li'):
+            if not _has_class(li, 'standard-paginate'):
+                continue
+            link = _first(li.iterdescendants('a'))
+            if link is not None and link.get('href'):
+                page_num = _text(link)
+                if page_num.isdigit():
+                    page_links.append(int(page_num))
+        if page_links:
+            pagination_info['max_page'] = max(page_links)
+        next_link = _first(pagination.iterdescendants('a'), 'standard-paginate-next')
+        if next_link is not None and next_link.get('href'):
+            pagination_info['next_page_url'] = next_link.get('href')
+    return pagination_info
+
+def parse_listing_page(content, threshold_date=None, backend=LISTING_PARSER):
+    """Parse a listing page into (tenders, should_continue, pagination_info) with the chosen backend"""
+    if backend == "lxml":
+        if isinstance(content, bytes):
+            try:
+                content = content.decode('utf-8')
+            except UnicodeDecodeError:
+                content = UnicodeDammit(content).unicode_markup
+        root = lxml.html.fromstring(content)
+        tenders, should_continue = collect_tenders(iter_listing_rows_lxml(root), threshold_date)
+        return tenders, should_continue, get_pagination_info_lxml(root)
+
+    if backend == "lxml-strainer":
+        soup = BeautifulSoup(content, 'lxml', parse_only=LISTING_STRAINER)
+    else:
+        soup = BeautifulSoup(content, 'html.parser')
+    tenders, should_continue = parse_tender_results(soup, threshold_date)
+    return tenders, should_continue, get_pagination_info(soup)
+
+def snapshot_metadata(total_tenders):
+    return {
+        "total_tenders": total_tenders,
+        "last_updated": datetime.now().isoformat(),
+        "source_url": "https://www.find-tender.service.gov.uk/Search/Results",
+        "scraper_version": "2.0"
     }
+
+def amended_tender_ids(tenders):
+    """IDs of tenders already in the tender store whose listing row has changed since it was stored"""
+    stored = tender_store.listing_hashes([t['tender_id'] for t in tenders if t['tender_id']])
+    return {t['tender_id'] for t in tenders if t['tender_id'] in stored and stored[t['tender_id']] != listing_hash(t)}
+
+def save_tenders_to_json(all_tenders, filename):
     try:
         if os.path.exists(filename):
-            backup_filename = f"output/backups/{os.path.basename(filename)}.backup_{int(time.time())}"
-            os.rename(filename, backup_filename)
-            print(f"📁 Backup created: {backup_filename}")
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+            backup_snapshot(filename)
+        write_tender_file(filename, snapshot_metadata(len(all_tenders)), all_tenders)
         print(f"💾 Saved {len(all_tenders)} tenders to {filename}")
         return True
     except Exception as e:
         print(f"❌ Error saving JSON: {e}")
         return False
 
-def scrape_find_tender_last_6_months():
-    threshold_date = date.today() - timedelta(days=182)
-    print(f"🎯 Scraping tenders published from {threshold_date}")
-    base_url = "https://www.find-tender.service.gov.uk"
-    start_url = f"{base_url}/Search/Results"
-    json_filename = f"output/tender_opportunities_last6months_with_cpv.json"
-    headers = {'User-Agent': 'Mozilla/5.0'}
-
-    current_page = 1
-    all_tenders = []
-
-    should_continue = True
-    print("=" * 80)
+def load_checkpoint(filename):
+    """Return the saved crawl state, or None if there is no usable checkpoint"""
+    if not filename or not os.path.exists(filename):
+        return None
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Could not read checkpoint {filename}: {e}")
+        return None
 
-    while should_continue:
+def save_checkpoint(filename, state):
+    """Atomically write the crawl state so a crash mid-write never leaves a truncated checkpoint"""
+    os.makedirs(os.path.dirname(filename) or '.', exist_ok=True)
+    tmp_path = f"{filename}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, filename)
+
+def produce_listing_pages(start_url, headers, threshold_date, page_queue, stop_event, search_params=None, start_page=1):
+    """Producer: fetch and parse listing pages ahead of the detail stage until the threshold or last page"""
+    current_page = start_page
+    while not stop_event.is_set():
+        item = {'page': current_page, 'tenders': [], 'pagination': None, 'error': None, 'last': True}
         try:
-            url = f"{start_url}?sort=unix_published_date%3ADESC&page={current_page}#dashboard_notices"
+            url = listing_url(start_url, current_page, search_params)
             print(f"📄 Scraping page {current_page}: {url}")
-            response = session.get(url, headers=headers, timeout=20)
+            response = http_client.get(url, headers=headers)
 
             if response.status_code != 200:
-                print(f"❌ Page {current_page} failed: HTTP {response.status_code}")
-                break
-
-            soup = BeautifulSoup(response.content, 'html.parser')
-            page_tenders, should_continue = extract_tender_titles_and_links(soup, threshold_date, base_url)
+                item['error'] = f"HTTP {response.status_code}"
+            else:
+                item['tenders'], should_continue, item['pagination'] = parse_listing_page(
+                    response.content, threshold_date)
+                item['last'] = (not should_continue or not item['tenders']
+                                or current_page >= item['pagination']['max_page'])
+        except requests.exceptions.RequestException as e:
+            item['error'] = f"Network error: {e}"
+        except Exception as e:
+            item['error'] = f"Unexpected error: {e}"
 
-            if not page_tenders:
-                print(f"📭 No tenders on page {current_page}")
+        # Block while the consumer is PREFETCH_PAGES behind, but wake up if the crawl is cancelled
+        while not stop_event.is_set():
+            try:
+                page_queue.put(item, timeout=0.5)
                 break
+            except queue.Full:
+                continue
 
-            all_tenders.extend(page_tenders)
-            save_tenders_to_json(all_tenders, json_filename)
+        if item['last']:
+            break
+        current_page += 1
+
+    page_queue.put(None)
+
+def scrape_find_tender_last_6_months(max_workers=DETAIL_FETCH_WORKERS, prefetch_pages=PREFETCH_PAGES,
+                                     threshold_date=None, base_url="https://www.find-tender.service.gov.uk",
+                                     json_filename="output/tender_opportunities_last6months_with_cpv.json",
+                                     search_params=None, resume=False):
+    """Crawl listing pages newest first down to threshold_date, adding CPV codes from the detail pages.
+
+    search_params are extra search filters (e.g. publication_date_filter() for a backfill shard).
+    Each finished page is appended to the JSONL log next to json_filename, which is compacted into
+    json_filename every COMPACT_EVERY_PAGES pages and when the crawl stops. With json_filename=None
+    nothing is written and the caller saves the returned tenders.
+    After every finished page the crawl state is written to <json_filename>.checkpoint; it is
+    removed once the crawl completes, and resume=True continues an interrupted crawl from it.
+    """
+    checkpoint_filename = f"{json_filename}{CHECKPOINT_SUFFIX}" if json_filename else None
+    checkpoint = load_checkpoint(checkpoint_filename) if resume else None
+    if resume and checkpoint is None:
+        print("⚠️ No checkpoint to resume from - starting a fresh crawl")
+    if checkpoint:
+        threshold_date = date.fromisoformat(checkpoint['threshold_date'])
+        search_params = checkpoint.get('search_params') or search_params
+
+    threshold_date = threshold_date or date.today() - timedelta(days=182)
+    print(f"🎯 Scraping tenders published from {threshold_date}")
+    start_url = f"{base_url}/Search/Results"
+    headers = {'User-Agent': 'Mozilla/5.0'}
 
-            pagination_info = get_pagination_info(soup)
-            print(f"📄 Page {pagination_info['current_page']} of {pagination_info['max_page']}")
+    # First run with an empty CPV store: reuse the codes already in the previous output
+    if json_filename and not len(cpv_store):
+        seeded = cpv_store.seed(load_tenders(json_filename)['tenders'])
+        print(f"🌱 Seeded CPV store with {seeded} tenders from {json_filename}")
 
-            if not should_continue or current_page >= pagination_info['max_page']:
-                break
+    all_tenders = []
+    seen_ids = set()
+    pending_pages = []
+    next_page = 1
+    if checkpoint:
+        # Pages finished before the interruption are already in the snapshot and its log
+        kept = load_tenders(json_filename)['tenders'][:checkpoint['completed_tenders']]
+        all_tenders = [Tender.from_dict(t) for t in kept]
+        seen_ids = set(checkpoint['seen_ids'])
+        pending_pages = [dict(p, tenders=[Tender.from_dict(t) for t in p['tenders']]) for p in checkpoint['pending']]
+        next_page = checkpoint['next_page']
+        print(f"♻️ Resuming after page {checkpoint['last_completed_page']}: {len(all_tenders)} tenders kept, "
+              f"{sum(len(p['tenders']) for p in pending_pages)} detail fetches pending, continuing at page {next_page}")
+    print("=" * 80)
 
-            current_page += 1
-            print("⏳ Waiting 2 seconds before next page...")
-            time.sleep(2)
+    # Listing pages flow producer -> page_queue -> detail pool, so the next listing fetch and the
+    # detail fetches for earlier pages overlap; the shared limiter paces all of them
+    page_queue = queue.Queue(maxsize=max(1, prefetch_pages))
+    stop_event = threading.Event()
+    producer = threading.Thread(
+        target=produce_listing_pages,
+        args=(start_url, headers, threshold_date, page_queue, stop_event, search_params, next_page),
+        daemon=True
+    )
+    detail_pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    in_flight = deque()
+    last_completed_page = checkpoint['last_completed_page'] if checkpoint else 0
+    saved_count = len(all_tenders)
+    amended_count = 0
+    completed = False
+    tender_log = TenderLog(json_filename) if json_filename else None
+    if tender_log and not checkpoint:
+        # A fresh crawl replaces the previous output once the log is first compacted
+        tender_log.start(replace=True)
+
+    def save_new_tenders():
+        nonlocal saved_count
+        try:
+            saved_count += tender_log.append(all_tenders[saved_count:])
+        except OSError as e:
+            print(f"❌ Error appending to {tender_log.log_path}: {e}")
+
+    def write_checkpoint():
+        if not checkpoint_filename:
+            return
+        save_checkpoint(checkpoint_filename, {
+            'threshold_date': threshold_date.isoformat(),
+            'search_params': search_params,
+            'json_filename': json_filename,
+            'last_completed_page': last_completed_page,
+            'next_page': next_page,
+            'completed_tenders': saved_count,
+            'seen_ids': sorted(seen_ids),
+            # Listing pages already parsed whose detail pages are not all fetched yet
+            'pending': [{'page': item['page'], 'tenders': [as_dict(t) for t in item['tenders']]} for item, _ in in_flight],
+            'updated_at': datetime.now().isoformat()
+        })
+
+    def submit_page(item):
+        nonlocal amended_count
+        # Only amended notices are refetched; the rest come from the CPV store as before
+        amended = amended_tender_ids(item['tenders'])
+        if amended:
+            amended_count += len(amended)
+            print(f"✏️ {len(amended)} amended notices on page {item['page']} - refetching their detail pages")
+        futures = [detail_pool.submit(extract_cpv_from_detail_page, t['link'], base_url, t['tender_id'] in amended)
+                   for t in item['tenders']]
+        in_flight.append((item, futures))
+
+    def finish_oldest_page():
+        nonlocal last_completed_page, saved_count
+        # The page stays pending in the checkpoint until all its detail results are in
+        item, futures = in_flight[0]
+        results = [future.result() for future in futures]
+        in_flight.popleft()
+        for tender_data, (cpv_codes, cpv_descriptions) in zip(item['tenders'], results):
+            tender_data.set_cpv(cpv_codes, cpv_descriptions)
+        all_tenders.extend(item['tenders'])
+        last_completed_page = item['page']
+        if tender_log:
+            tender_store.upsert_tenders(item['tenders'])
+            save_new_tenders()
+            print(f"💾 Logged {len(item['tenders'])} tenders ({saved_count} this run) to {tender_log.log_path}")
+            if last_completed_page % COMPACT_EVERY_PAGES == 0:
+                tender_log.compact(snapshot_metadata(saved_count))
+        cpv_store.save()
+        write_checkpoint()
+        if item['pagination']:
+            print(f"📄 Page {item['pagination']['current_page']} of {item['pagination']['max_page']}")
+
+    for pending in pending_pages:
+        submit_page({'page': pending['page'], 'tenders': pending['tenders'], 'pagination': None})
+
+    producer.start()
+    try:
+        while True:
+            item = page_queue.get()
+            if item is None:
+                completed = True
+                break
+            if item['error']:
+                print(f"❌ Page {item['page']} failed: {item['error']}")
+                break
+            if not item['tenders']:
+                print(f"📭 No tenders on page {item['page']}")
+                completed = True
+                break
 
-        except requests.exceptions.RequestException as e:
-            print(f"🌐 Network error: {e}")
-            break
-        except Exception as e:
-            print(f"❌ Unexpected error: {e}")
-            break
+            # New notices push older ones onto later pages while we crawl, so a tender can show up twice
+            fresh = [t for t in item['tenders'] if not t['tender_id'] or t['tender_id'] not in seen_ids]
+            if len(fresh) < len(item['tenders']):
+                print(f"🔁 Skipping {len(item['tenders']) - len(fresh)} tenders already seen on page {item['page']}")
+            item['tenders'] = fresh
+            seen_ids.update(t['tender_id'] for t in fresh if t['tender_id'])
+            next_page = item['page'] + 1
+            submit_page(item)
+
+            # Keep detail work for a couple of pages queued so workers never idle between pages
+            while len(in_flight) > prefetch_pages:
+                finish_oldest_page()
+
+        while in_flight:
+            finish_oldest_page()
+    except KeyboardInterrupt:
+        completed = False
+        print("🛑 Interrupted - cancelling outstanding work")
+    except Exception as e:
+        completed = False
+        print(f"❌ Unexpected error: {e}")
+    finally:
+        # Stop the producer, drop queued detail fetches and unblock any pending put
+        stop_event.set()
+        detail_pool.shutdown(wait=True, cancel_futures=True)
+        while True:
+            try:
+                page_queue.get_nowait()
+            except queue.Empty:
+                break
+        producer.join(timeout=5)
+        cpv_store.save()
+        if tender_log:
+            # A page finished after the last successful append would otherwise be neither saved nor pending
+            if saved_count < len(all_tenders):
+                save_new_tenders()
+            try:
+                tender_log.compact(snapshot_metadata(saved_count))
+            except Exception as e:
+                print(f"❌ Error compacting {tender_log.log_path}: {e} - the log still holds every tender")
+        if checkpoint_filename:
+            if completed:
+                if os.path.exists(checkpoint_filename):
+                    os.remove(checkpoint_filename)
+            else:
+                write_checkpoint()
+                print(f"💾 Checkpoint saved to {checkpoint_filename} - continue with: "
+                      f"python complete_tender_scraper.py --resume --output {json_filename}")
 
     print("=" * 80)
-    print("📊 SCRAPING COMPLETE")
+    print("📊 SCRAPING COMPLETE" if completed else "📊 SCRAPING STOPPED")
     print(f"✅ Total tenders scraped: {len(all_tenders)}")
-    print(f"📁 Data saved in: {json_filename}")
+    print(f"✏️ Amended notices refetched: {amended_count} (earlier versions kept in {tender_store.path})")
+    print(f"🚦 Rate limiter: {limiter.summary()}")
+    print(f"🔌 HTTP client: {http_client.summary()}")
+    print(f"🗄️ Notice cache: {notice_cache.summary()}")
+    if STREAM_DETAIL_PAGES:
+        print(f"📉 Streaming: {stream_summary()}")
+    print(f"🏷️ CPV store: {cpv_store.summary()}")
+    if json_filename:
+        print(f"📁 Data saved in: {json_filename}")
     return all_tenders
 
 if __name__ == "__main__":
-    scrape_find_tender_last_6_months()
+    parser = argparse.ArgumentParser(description="Scrape the last 6 months of Find a Tender notices with CPV codes")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted crawl from the checkpoint next to the output file")
+    parser.add_argument("--pretty", action="store_true", help="write the output indented for reading (default compact)")
+    parser.add_argument("--output", default="output/tender_opportunities_last6months_with_cpv.json",
+                        help="JSON output file; end it in .json.zst to write it zstd-compressed")
+    args = parser.parse_args()
+    tender_io.PRETTY_JSON = args.pretty
+    scrape_find_tender_last_6_months(json_filename=args.output, resume=args.resume)
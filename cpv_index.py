@@ -0,0 +1,139 @@
+"""Inverted CPV index over the rows of a tender table.
+
+Each CPV code maps to the sorted row positions of the tenders that list it.
+The index is stored like a sparse matrix in compressed rows: `codes` holds
+the packed integer codes in order (see cpv_table.pack_code), and
+`postings[offsets[i]:offsets[i + 1]]` holds the rows of codes[i]. Because
+codes are sorted, every code under a CPV prefix ('72' or '7226') owns one
+contiguous slice of the postings.
+
+Filters become array operations. any_of() is a union, all_of() an
+intersection, and mask() turns rows into a boolean mask to combine with other
+filters. counts() gives tenders per code, overall or within a mask, in one
+vectorised pass. Codes that aren't 8-digit CPV codes are left out of the
+index.
+"""
+from functools import reduce
+
+import numpy as np
+
+from cpv_table import pack_code, prefix_range, unpack_code
+
+EMPTY_ROWS = np.empty(0, dtype=np.int32)
+
+
+class CpvIndex:
+    """CPV code -> sorted row positions, with descriptions for labelling"""
+
+    def __init__(self, codes, offsets, postings, descriptions, size):
+        self.codes = codes                  # sorted packed codes (int64)
+        self.offsets = offsets              # len(codes) + 1 slice bounds into postings
+        self.postings = postings            # row positions (int32), sorted within each code
+        self.descriptions = descriptions    # packed code -> description
+        self.size = size                    # rows in the indexed table
+        self._texts = None
+
+    @classmethod
+    def from_lists(cls, code_lists, description_lists=None):
+        """Index a table from its per-row cpv_codes lists (and the matching cpv_descriptions lists)"""
+        if description_lists is None:
+            description_lists = [()] * len(code_lists)
+        rows, codes, seen = [], [], {}
+        for row, (tender_codes, tender_descriptions) in enumerate(zip(code_lists, description_lists)):
+            # Rows without CPV fields come through pandas as NaN rather than []
+            if not isinstance(tender_codes, (list, tuple)):
+                continue
+            if not isinstance(tender_descriptions, (list, tuple)):
+                tender_descriptions = ()
+            for position, code in enumerate(tender_codes):
+                number = pack_code(code)
+                if number is None:
+                    continue
+                rows.append(row)
+                codes.append(number)
+                if position < len(tender_descriptions):
+                    counts = seen.setdefault(number, {})
+                    counts[tender_descriptions[position]] = counts.get(tender_descriptions[position], 0) + 1
+        # Listings occasionally glue a supplementary code onto a description, so label each code
+        # with the description most tenders give it
+        descriptions = {number: max(counts, key=counts.get) for number, counts in seen.items()}
+
+        rows = np.asarray(rows, dtype=np.int32)
+        codes = np.asarray(codes, dtype=np.int64)
+        order = np.lexsort((rows, codes))
+        rows, codes = rows[order], codes[order]
+        # A tender that lists a code twice is indexed once
+        keep = np.ones(len(rows), dtype=bool)
+        keep[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+        rows, codes = rows[keep], codes[keep]
+        unique, starts = np.unique(codes, return_index=True)
+        offsets = np.append(starts, len(codes)).astype(np.int64)
+        return cls(unique, offsets, rows, descriptions, len(code_lists))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _slot(self, code):
+        number = code if isinstance(code, (int, np.integer)) else pack_code(code)
+        if number is None:
+            return None
+        slot = int(np.searchsorted(self.codes, number))
+        return slot if slot < len(self.codes) and self.codes[slot] == number else None
+
+    def __contains__(self, code):
+        return self._slot(code) is not None
+
+    def code_texts(self):
+        """The indexed codes as 8-digit strings, in order (shared, don't modify)"""
+        if self._texts is None:
+            self._texts = [unpack_code(int(code)) for code in self.codes]
+        return self._texts
+
+    def description(self, code):
+        number = code if isinstance(code, (int, np.integer)) else pack_code(code)
+        return self.descriptions.get(number)
+
+    def label(self, code):
+        """'72000000 - IT services: ...' for option lists"""
+        text = code if isinstance(code, str) else unpack_code(int(code))
+        description = self.description(code)
+        return f"{text} - {description}" if description else text
+
+    def rows(self, code):
+        """Sorted row positions of the tenders listing code"""
+        slot = self._slot(code)
+        if slot is None:
+            return EMPTY_ROWS
+        return self.postings[self.offsets[slot]:self.offsets[slot + 1]]
+
+    def rows_under(self, prefix):
+        """Sorted row positions of the tenders listing any code under a CPV prefix ('72' -> all of division 72)"""
+        low, high = prefix_range(prefix)
+        first, last = np.searchsorted(self.codes, [low, high])
+        return np.unique(self.postings[self.offsets[first]:self.offsets[last]])
+
+    def any_of(self, codes):
+        """Rows listing at least one of codes (union)"""
+        arrays = [self.rows(code) for code in codes]
+        return np.unique(np.concatenate(arrays)) if arrays else EMPTY_ROWS
+
+    def all_of(self, codes):
+        """Rows listing every one of codes (intersection)"""
+        arrays = sorted((self.rows(code) for code in codes), key=len)
+        if not arrays:
+            return EMPTY_ROWS
+        return reduce(lambda left, right: np.intersect1d(left, right, assume_unique=True), arrays)
+
+    def mask(self, rows):
+        """Boolean mask over the table's rows, True at rows"""
+        mask = np.zeros(self.size, dtype=bool)
+        mask[rows] = True
+        return mask
+
+    def counts(self, mask=None):
+        """Tenders per code, aligned with self.codes; with a mask, only tenders in the masked rows"""
+        if mask is None:
+            return np.diff(self.offsets)
+        if not len(self.codes):
+            return np.zeros(0, dtype=np.int64)
+        return np.add.reduceat(mask[self.postings].astype(np.int64), self.offsets[:-1])
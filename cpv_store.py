@@ -0,0 +1,120 @@
+"""Persistent tender_id -> (cpv_codes, cpv_descriptions) store.
+
+CPV codes are fixed once a notice is published, so both scrapers look a tender
+up here before requesting its detail page and only fetch notices they have
+never seen. The store is a JSON file loaded into a dict for constant-time
+lookups and rewritten atomically (merged with any concurrent writer's entries)
+when saved.
+
+Seed it from existing outputs with:  python cpv_store.py output/*.json
+"""
+import json
+import os
+import sys
+import threading
+
+from tender_io import iter_tenders
+
+CPV_STORE_PATH = "output/cpv_store.json"
+
+
+def tender_id_from_link(link):
+    """Notice links end in /Notice/<tender_id>[?origin=...]"""
+    return link.rstrip('/').split('/')[-1].split('?')[0] if link else None
+
+
+class CpvStore:
+    """Dict-backed CPV lookup persisted as JSON, with per-run hit/miss counts"""
+
+    def __init__(self, path=CPV_STORE_PATH):
+        self.path = path
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _read_file(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not read CPV store {self.path}: {e}")
+            return {}
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = self._read_file()
+        return self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._load())
+
+    def get(self, tender_id):
+        """Return (cpv_codes, cpv_descriptions) for a known tender, else None"""
+        with self._lock:
+            entry = self._load().get(tender_id) if tender_id else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return list(entry[0]), list(entry[1])
+
+    def put(self, tender_id, cpv_codes, cpv_descriptions):
+        # Empty results are not stored: they may be a failed fetch rather than a notice without CPVs
+        if not tender_id or not cpv_codes:
+            return
+        with self._lock:
+            self._load()[tender_id] = [list(cpv_codes), list(cpv_descriptions)]
+            self._dirty = True
+
+    def seed(self, tenders):
+        """Add CPV codes already present on tender dicts; returns the number of new entries"""
+        added = 0
+        with self._lock:
+            entries = self._load()
+            for tender in tenders:
+                tender_id = tender.get('tender_id')
+                if tender_id and tender.get('cpv_codes') and tender_id not in entries:
+                    entries[tender_id] = [list(tender['cpv_codes']), list(tender.get('cpv_descriptions', []))]
+                    added += 1
+            if added:
+                self._dirty = True
+        return added
+
+    def save(self):
+        """Write the store if it changed, keeping entries another process saved in the meantime"""
+        with self._lock:
+            if not self._dirty:
+                return False
+            merged = self._read_file()
+            merged.update(self._entries)
+            self._entries = merged
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            # Per-process temp file so parallel backfill workers never rename each other's writes
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+            return True
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        rate = (self.hits / lookups * 100) if lookups else 0.0
+        return f"{self.hits} hits, {self.misses} misses ({rate:.1f}% of detail fetches skipped), {len(self)} tenders stored"
+
+
+# Shared store used by both scrapers
+cpv_store = CpvStore()
+
+
+if __name__ == "__main__":
+    for json_file in sys.argv[1:]:
+        added = cpv_store.seed(iter_tenders(json_file))
+        print(f"🌱 {json_file}: {added} new tenders")
+    cpv_store.save()
+    print(f"💾 CPV store {cpv_store.path} now holds {len(cpv_store)} tenders")
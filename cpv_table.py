@@ -0,0 +1,140 @@
+"""Global CPV table: CPV codes as integers, each description stored once.
+
+Tenders used to carry parallel cpv_codes / cpv_descriptions lists, repeating
+every description string in every tender that uses the code. Tender files now
+hold one "cpv_table" mapping each code to its description, and each tender
+lists its codes as integers under "cpv". CPV codes are 8 digits, so the
+integer form drops nothing but leading zeros, which unpacking restores.
+
+Packing is lossless: a tender whose lists don't line up, whose codes aren't
+8-digit, or whose description for a code differs from the table's keeps its
+original fields. Readers unpack tenders back to the old fields one at a time
+as they are read (see tender_io), and Tender records keep only the integers,
+looking descriptions up in the shared table when cpv_descriptions is read.
+"""
+import sys
+import threading
+
+CPV_TABLE_KEY = "cpv_table"
+PACKED_CPV_KEY = "cpv"
+CPV_CODE_DIGITS = 8
+
+
+def pack_code(code):
+    """'03000000' -> 3000000, or None if it isn't an 8-digit CPV code"""
+    if isinstance(code, str) and len(code) == CPV_CODE_DIGITS and code.isdigit():
+        return int(code)
+    return None
+
+
+def unpack_code(value):
+    """3000000 -> '03000000'"""
+    return f"{value:0{CPV_CODE_DIGITS}d}"
+
+
+def prefix_range(prefix):
+    """Integer range [low, high) of the codes under a CPV prefix: '72' -> (72000000, 73000000)"""
+    scale = 10 ** (CPV_CODE_DIGITS - len(prefix))
+    return int(prefix) * scale, (int(prefix) + 1) * scale
+
+
+def _pop_after(data, key):
+    """Remove and return the entries that follow key, so fields put in its place keep their position"""
+    if next(reversed(data)) == key:
+        return {}
+    keys = list(data)
+    return {k: data.pop(k) for k in keys[keys.index(key) + 1:]}
+
+
+class CpvTable:
+    """Code -> description table; the first description seen for a code is the table's"""
+
+    def __init__(self, descriptions=None):
+        self._descriptions = {}
+        # Both directions between code strings and integers, so packing and unpacking skip the conversion
+        self._numbers = {}
+        self._code_text = {}
+        self._lock = threading.Lock()
+        for code, description in (descriptions or {}).items():
+            self._descriptions[int(code)] = sys.intern(description)
+            self._numbers[code] = int(code)
+            self._code_text[int(code)] = code
+
+    @classmethod
+    def from_json(cls, table):
+        """Build from a file's "cpv_table" object ({"03000000": "Agricultural ..."})"""
+        return cls(table)
+
+    def to_json(self):
+        return {unpack_code(code): description for code, description in sorted(self._descriptions.items())}
+
+    def __len__(self):
+        return len(self._descriptions)
+
+    def description(self, code):
+        return self._descriptions.get(code)
+
+    def descriptions(self, codes):
+        return [self._descriptions[code] for code in codes]
+
+    def add(self, cpv_codes, cpv_descriptions):
+        """Register a tender's codes; returns them as a tuple of ints, or None if they can't be packed losslessly"""
+        cpv_codes, cpv_descriptions = cpv_codes or [], cpv_descriptions or []
+        if len(cpv_codes) != len(cpv_descriptions):
+            return None
+        packed = []
+        numbers, known = self._numbers, self._descriptions
+        with self._lock:
+            for code, description in zip(cpv_codes, cpv_descriptions):
+                number = numbers.get(code)
+                if number is None:
+                    number = pack_code(code)
+                    if number is None or not isinstance(description, str):
+                        return None
+                    known[number] = sys.intern(description)
+                    numbers[code] = number
+                    self._code_text[number] = code
+                elif known[number] != description:
+                    return None
+                packed.append(number)
+        return tuple(packed)
+
+    def pack(self, tender):
+        """Tender dict with cpv_codes/cpv_descriptions replaced by integer "cpv" (in their place), if lossless"""
+        if 'cpv_codes' not in tender or 'cpv_descriptions' not in tender:
+            return tender
+        packed = self.add(tender['cpv_codes'], tender['cpv_descriptions'])
+        if packed is None:
+            return tender
+        result = tender.copy()
+        trailing = _pop_after(result, 'cpv_codes')
+        del result['cpv_codes']
+        result.pop('cpv_descriptions', None)
+        trailing.pop('cpv_descriptions', None)
+        result[PACKED_CPV_KEY] = list(packed)
+        result.update(trailing)
+        return result
+
+    def unpack(self, tender):
+        """Inverse of pack(): restore cpv_codes/cpv_descriptions where "cpv" was, keeping key order.
+        The dict is updated in place, as readers unpack tenders they have just parsed."""
+        if PACKED_CPV_KEY not in tender:
+            return tender
+        trailing = _pop_after(tender, PACKED_CPV_KEY)
+        codes = tender.pop(PACKED_CPV_KEY)
+        code_text = self._code_text
+        tender['cpv_codes'] = [code_text.get(code) or unpack_code(code) for code in codes]
+        tender['cpv_descriptions'] = self.descriptions(codes)
+        tender.update(trailing)
+        return tender
+
+
+# Table shared by the Tender records of this process
+cpv_table = CpvTable()
+
+
+def pack_tenders(tenders):
+    """(cpv_table JSON, packed tender dicts) for writing a tender file"""
+    table = CpvTable()
+    packed = [table.pack(tender) for tender in tenders]
+    return table.to_json(), packed
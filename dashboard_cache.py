@@ -0,0 +1,41 @@
+"""Tender table shared by the Streamlit pages, built once per data version.
+
+tender_table() returns every tender as one DataFrame together with its
+CpvIndex (see dashboard_data.build_tender_table). Both are kept with
+st.cache_resource under tender_data_version(), so the first page that loads
+after a scrape builds them, and every page and session then reuses the same
+objects until the data changes again. Pages filter the shared frame with
+masks and must never modify it in place.
+
+search_index() adds a SearchIndex over the same frame's text columns. It is
+cached the same way, so only pages with a keyword box pay to build it.
+"""
+import streamlit as st
+
+from dashboard_data import build_tender_table, tender_data_version
+from search_index import SearchIndex
+from tender_store import iter_tender_data
+
+
+@st.cache_resource(max_entries=2, show_spinner="Indexing tenders...")
+def _tender_table(source, data_version):
+    # data_version is only a cache key: a new scrape changes it and rebuilds the table
+    _, tenders = iter_tender_data(source)
+    return build_tender_table(tenders)
+
+
+def tender_table(source, data_version=None):
+    """(DataFrame of every tender, CpvIndex over its rows) from source, a JSON tender file or STORE_SOURCE.
+    Pass the same data_version to tender_table() and search_index() to be sure their rows line up"""
+    return _tender_table(source, data_version or tender_data_version(source))
+
+
+@st.cache_resource(max_entries=2, show_spinner="Indexing tender text...")
+def _search_index(source, data_version):
+    df, _ = _tender_table(source, data_version)
+    return SearchIndex.from_frame(df)
+
+
+def search_index(source, data_version=None):
+    """SearchIndex over the rows of tender_table(source, data_version)"""
+    return _search_index(source, data_version or tender_data_version(source))
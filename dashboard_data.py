@@ -0,0 +1,240 @@
+"""Tender tables for the dashboards, built column-wise with pandas.
+
+build_deadline_frame() turns a tender iterator into the upcoming-deadline
+table, calendar events and CPV options that tender_dashboard.py shows. It
+reads tenders in chunks of DEADLINE_CHUNK_SIZE, parses each chunk's deadlines
+in one pd.to_datetime call with the listing format, and keeps only the
+upcoming rows, so memory stays bounded by the upcoming tenders rather than
+the whole file. Locations, CPV strings and event fields are then derived a
+column at a time, along with a CpvIndex over the frame's rows.
+
+build_tender_table() flattens every tender into one frame, as
+pd.json_normalize does, with typed publication and submission dates and a
+CpvIndex over its rows. dashboard_cache.py builds it once per data version
+for the Streamlit pages.
+
+filter_mask() evaluates the dashboard filters as one boolean mask over the
+frame's rows. Events are built in row order, so the same mask selects the
+table rows, the map points and the calendar events.
+
+table_page() sorts a frame's rows and cuts out one page of them, so tables
+can send the browser only the rows and columns in view.
+
+tender_data_version() changes whenever the data behind iter_tender_data()
+does, so dashboards can cache what they build from it with st.cache_data and
+only rebuild after a scrape.
+"""
+import os
+from datetime import timedelta
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from cpv_index import CpvIndex
+from tender_io import find_tender_file
+from tender_log import log_path_for
+from tender_record import LISTING_DATETIME_FORMAT, SUBMISSION_DEADLINE_KEY
+from tender_store import STORE_SOURCE, tender_store
+
+# Tenders parsed per vectorised pass
+DEADLINE_CHUNK_SIZE = 10000
+# Deadlines this close are shown as urgent in the calendar
+URGENT_DAYS = 7
+
+# Latitude and longitude for UK regions
+UK_LOCATION_COORDINATES = {
+    "UKH1 - East Anglia": (52.2000, 0.1313),
+    "UKG21 - Telford and Wrekin": (52.6784, -2.4469),
+    "UK - United Kingdom": (55.3781, -3.4360),
+    "UKC1 - Tees Valley and Durham": (54.5700, -1.3200),
+    "UKC2 - Northumberland and Tyne and Wear": (54.9700, -1.6100),
+    "UKD1 - Cumbria": (54.4600, -2.7400),
+    "UKD3 - Greater Manchester": (53.4808, -2.2426),
+    "UKD6 - Cheshire": (53.2000, -2.5200),
+    "UKE1 - East Yorkshire and Northern Lincolnshire": (53.7600, -0.3300),
+    "UKE4 - West Yorkshire": (53.8000, -1.5500),
+    "UKF1 - Derbyshire and Nottinghamshire": (53.1000, -1.5500),
+    "UKF2 - Leicestershire, Rutland and Northamptonshire": (52.6369, -1.1398),
+    "UKG1 - Herefordshire, Worcestershire and Warwickshire": (52.1900, -2.2200),
+    "UKH2 - Bedfordshire and Hertfordshire": (51.7500, -0.4100),
+    "UKH3 - Essex": (51.7340, 0.4700),
+    "UKI3 - Inner London": (51.5074, -0.1278),
+    "UKJ1 - Berkshire, Buckinghamshire and Oxfordshire": (51.7500, -1.2500),
+    "UKJ2 - Surrey, East and West Sussex": (51.0500, -0.3200),
+    "UKJ3 - Hampshire and Isle of Wight": (50.9000, -1.4000),
+    "UKK1 - Gloucestershire, Wiltshire and Bath/Bristol area": (51.4500, -2.5800),
+    "UKK4 - Devon": (50.7100, -3.5300),
+    "UKL1 - West Wales and The Valleys": (51.7700, -3.7800),
+    "UKL2 - East Wales": (52.3200, -3.8600),
+    "UKM6 - Highlands and Islands": (57.4800, -5.0700),
+    "UKN0 - Northern Ireland": (54.7877, -6.4923),
+}
+LOCATION_FRAME = pd.DataFrame.from_dict(UK_LOCATION_COORDINATES, orient="index", columns=["latitude", "longitude"])
+
+
+def _file_version(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def tender_data_version(source):
+    """Cache key for iter_tender_data(source): modification times and sizes of the tender store's files
+    for STORE_SOURCE, otherwise of the JSON snapshot and its log"""
+    if source == STORE_SOURCE:
+        return tuple(_file_version(path) for path in (tender_store.path, f"{tender_store.path}-wal"))
+    snapshot = find_tender_file(source)
+    return tuple(_file_version(path) for path in (snapshot, log_path_for(snapshot)))
+
+
+def parse_deadlines(texts):
+    """Series of listing dates ('16 September 2025,  3:00pm') -> datetime64 Series, NaT where unparseable"""
+    normalised = texts.str.replace(r"\s+", " ", regex=True).str.strip()
+    return pd.to_datetime(normalised, format=LISTING_DATETIME_FORMAT, errors="coerce")
+
+
+def _upcoming_chunk(tenders, today):
+    """The upcoming tenders of one chunk as a frame of raw columns plus the parsed deadline"""
+    columns = {"title": [], "organisation": [], "link": [], "Contract location": [],
+               "deadline_text": [], "cpv_codes": [], "cpv_descriptions": []}
+    for tender in tenders:
+        details = tender.get("details") or {}
+        columns["title"].append(tender.get("title", "Untitled"))
+        columns["organisation"].append(tender.get("organisation", "Unknown"))
+        columns["link"].append(tender.get("link", "#"))
+        columns["Contract location"].append(details.get("Contract location", "Unknown"))
+        columns["deadline_text"].append(details.get(SUBMISSION_DEADLINE_KEY))
+        columns["cpv_codes"].append(tender.get("cpv_codes", []))
+        columns["cpv_descriptions"].append(tender.get("cpv_descriptions", []))
+    chunk = pd.DataFrame(columns)
+    chunk["deadline"] = parse_deadlines(chunk.pop("deadline_text"))
+    return chunk[chunk["deadline"] >= pd.Timestamp(today)]
+
+
+def build_tender_table(tenders):
+    """(DataFrame of every tender flattened like pd.json_normalize, CpvIndex over its rows). The frame gains
+    a parsed submission_deadline column and publication_date_parsed becomes datetime64"""
+    df = pd.json_normalize(list(tenders))
+    if df.empty:
+        return df, CpvIndex.from_lists([])
+    if "publication_date_parsed" in df:
+        df["publication_date_parsed"] = pd.to_datetime(df["publication_date_parsed"], errors="coerce")
+    deadline_column = f"details.{SUBMISSION_DEADLINE_KEY}"
+    if deadline_column in df:
+        deadlines = df[deadline_column].astype(object)
+        df["submission_deadline"] = parse_deadlines(deadlines.where(deadlines.notna(), None))
+    else:
+        df["submission_deadline"] = pd.NaT
+    code_lists = df["cpv_codes"] if "cpv_codes" in df else [[]] * len(df)
+    description_lists = df["cpv_descriptions"] if "cpv_descriptions" in df else None
+    return df, CpvIndex.from_lists(code_lists, description_lists)
+
+
+def build_deadline_frame(tenders, today):
+    """(upcoming tenders DataFrame, calendar events in row order, CpvIndex over the frame's rows)"""
+    tenders = iter(tenders)
+    chunks = []
+    while True:
+        chunk = list(islice(tenders, DEADLINE_CHUNK_SIZE))
+        if not chunk:
+            break
+        chunks.append(_upcoming_chunk(chunk, today))
+    if not chunks:
+        return pd.DataFrame(), [], CpvIndex.from_lists([])
+    df = pd.concat(chunks, ignore_index=True)
+    if df.empty:
+        return pd.DataFrame(), [], CpvIndex.from_lists([])
+
+    df = df.join(LOCATION_FRAME, on="Contract location")
+    df["cpv_pairs"] = [[f"{code} - {description}" for code, description in zip(codes, descriptions)]
+                       for codes, descriptions in zip(df["cpv_codes"], df["cpv_descriptions"])]
+    df["cpv"] = df["cpv_pairs"].str.join(", ")
+    cpv_index = CpvIndex.from_lists(df["cpv_codes"], df["cpv_descriptions"])
+    df = df.rename(columns={"cpv_codes": "individual_cpvs"}).drop(columns="cpv_descriptions")
+    df = df[["title", "deadline", "organisation", "cpv", "individual_cpvs", "cpv_pairs", "link",
+             "Contract location", "latitude", "longitude"]]
+    return df, deadline_events(df, today), cpv_index
+
+
+def filter_mask(df, cpv_index, selected_cpv="All", selected_date=None):
+    """Boolean mask over the rows of a deadline frame: tenders with the selected CPV code (unless "All")
+    whose deadline is on or after selected_date"""
+    mask = np.ones(len(df), dtype=bool)
+    if selected_date is not None:
+        mask &= (df["deadline"] >= pd.Timestamp(selected_date)).to_numpy()
+    if selected_cpv != "All":
+        mask &= cpv_index.mask(cpv_index.rows(selected_cpv))
+    return mask
+
+
+def cpv_count_frame(cpv_index, mask=None):
+    """cpv_code, cpv_description, tender_count for every indexed code (only rows in mask, if given),
+    most tenders first"""
+    counts = cpv_index.counts(mask)
+    summary = pd.DataFrame({
+        "cpv_code": cpv_index.code_texts(),
+        "cpv_description": [cpv_index.descriptions.get(int(code), "") for code in cpv_index.codes],
+        "tender_count": counts,
+    })
+    summary = summary[summary["tender_count"] > 0]
+    return summary.sort_values(by=["tender_count", "cpv_code"], ascending=[False, True]).reset_index(drop=True)
+
+
+def deadline_events(df, today):
+    """Calendar events for the rows of a deadline frame, red within URGENT_DAYS of today"""
+    urgent = (df["deadline"] <= pd.Timestamp(today + timedelta(days=URGENT_DAYS))).to_numpy()
+    starts = df["deadline"].dt.strftime("%Y-%m-%d")
+    background = np.where(urgent, "#e74c3c", "#3498db")
+    border = np.where(urgent, "#c0392b", "#2980b9")
+    labels = df["deadline"].dt.strftime("%d %b %Y")
+    return [{
+        "title": str(title),
+        "start": start,
+        "end": start,
+        "url": str(link),
+        "backgroundColor": str(background_color),
+        "borderColor": str(border_color),
+        "extendedProps": {
+            "organisation": str(organisation),
+            "contract_location": str(location),
+            "cpv_pairs": pairs,
+            "deadline_str": label,
+        },
+    } for title, start, link, background_color, border_color, organisation, location, pairs, label in zip(
+        df["title"], starts, df["link"], background, border, df["organisation"], df["Contract location"],
+        df["cpv_pairs"], labels)]
+
+
+def page_count(rows, page_size):
+    """Pages needed to show rows rows, at least one"""
+    return max(1, -(-rows // page_size))
+
+
+def _sort_positions(column, ascending):
+    """Row positions of column in sorted order, missing values last and ties in frame order"""
+    column = column.reset_index(drop=True)
+    try:
+        ordered = column.sort_values(ascending=ascending, kind="stable", na_position="last")
+    except TypeError:
+        # Lists, dicts or mixed types don't compare; sort them by how they're displayed
+        ordered = column.astype(str).sort_values(ascending=ascending, kind="stable")
+    return ordered.index.to_numpy()
+
+
+def table_page(df, page, page_size, sort_by=None, ascending=True, columns=None):
+    """Rows of page (from 1, clamped to the pages there are) of df sorted by sort_by, only the given
+    columns. Sorting reads the sort column alone, and only the page's cells are copied"""
+    page = min(max(int(page), 1), page_count(len(df), page_size))
+    start = (page - 1) * page_size
+    if sort_by is None:
+        rows = np.arange(start, min(start + page_size, len(df)))
+    else:
+        rows = _sort_positions(df[sort_by], ascending)[start:start + page_size]
+    if columns is None:
+        column_positions = np.arange(len(df.columns))
+    else:
+        column_positions = df.columns.get_indexer([column for column in columns if column in df.columns])
+    return df.iloc[rows, column_positions]
@@ -0,0 +1,102 @@
+"""Shared pooled HTTP client for every Find a Tender fetch path.
+
+One requests.Session per process, with a keep-alive connection pool sized to
+the rate limiter's concurrency ceiling, so connection setup and the TLS
+handshake are paid once per host rather than once per request. The session
+also carries uniform timeouts, retries for transient 5xx responses,
+compressed transfer (brotli when a decoder is installed) and per-request
+timing hooks. Every request goes through the shared rate limiter.
+"""
+import threading
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from rate_limiter import limiter
+
+try:
+    import brotli  # noqa: F401  (urllib3 decodes br responses when a brotli package is importable)
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+USER_AGENT = "Mozilla/5.0"
+ACCEPT_ENCODING = "gzip, deflate, br" if BROTLI_AVAILABLE else "gzip, deflate"
+TIMEOUT = (10, 20)            # (connect, read) seconds for every request unless a caller overrides it
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 2
+RETRY_STATUSES = [500, 502, 503, 504]   # 429 is left to the rate limiter, which pauses every caller
+
+# Response time per host for this process
+timing_stats = defaultdict(lambda: {'requests': 0, 'seconds': 0.0})
+timing_lock = threading.Lock()
+timing_hooks = []
+
+
+def add_timing_hook(hook):
+    """Call hook(response, seconds) after every response; seconds is the time until headers arrived"""
+    timing_hooks.append(hook)
+
+
+def _record_timing(response, *args, **kwargs):
+    seconds = response.elapsed.total_seconds()
+    with timing_lock:
+        stats = timing_stats[urlsplit(response.url).netloc]
+        stats['requests'] += 1
+        stats['seconds'] += seconds
+    for hook in timing_hooks:
+        hook(response, seconds)
+    return response
+
+
+def make_session(pool_size=None):
+    """Session with retries, keep-alive pooling and compressed transfer"""
+    pool_size = pool_size or max(10, limiter.max_concurrency)
+    new_session = requests.Session()
+    retries = Retry(
+        total=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=["GET"]
+    )
+    adapter = HTTPAdapter(max_retries=retries, pool_connections=10, pool_maxsize=pool_size)
+    new_session.mount('https://', adapter)
+    new_session.mount('http://', adapter)
+    new_session.headers.update({'User-Agent': USER_AGENT, 'Accept-Encoding': ACCEPT_ENCODING})
+    new_session.hooks['response'].append(_record_timing)
+    return new_session
+
+
+# Shared session used by the scrapers, the uploader and the validator; created on first use so the
+# pool matches the concurrency budget set at startup (benchmarks, backfill workers)
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = make_session()
+        return _session
+
+
+def get(url, **kwargs):
+    """GET url on the shared session through the rate limiter, with the default timeout"""
+    kwargs.setdefault('timeout', TIMEOUT)
+    return limiter.get(get_session(), url, **kwargs)
+
+
+def summary():
+    with timing_lock:
+        requests_made = sum(s['requests'] for s in timing_stats.values())
+        hosts = ", ".join(f"{host} {s['seconds'] / s['requests'] * 1000:.0f} ms avg"
+                          for host, s in timing_stats.items() if s['requests'])
+    return f"{requests_made} responses" + (f" ({hosts})" if hosts else "")
@@ -0,0 +1,151 @@
+"""Merge scraper output files into one deduplicated tender corpus.
+
+The dated, topic and 6-month outputs overlap heavily and disagree on fields,
+for example whether a tender has CPV codes. The merge streams each input once
+(tender files with or without a CPV table, or bare lists, plus any tenders
+still in their logs) and hashes tenders by tender_id. When two copies of a
+tender disagree on a field, the copy with the latest scraped_at wins. A copy
+that lacks a field, or has it empty, never replaces a value from another
+copy. Tenders without a tender_id can't be matched and are kept as they are.
+The corpus is written newest publication first, and the run prints how much
+the inputs overlapped.
+
+Usage:  python merge_outputs.py output/tender_corpus.json output/*.json
+        (name the output .json.zst to write it zstd-compressed)
+"""
+import argparse
+import os
+from collections import Counter
+from datetime import datetime
+from itertools import combinations
+
+import tender_io
+from tender_io import is_compressed, write_tender_file
+from tender_log import stream_tenders
+from tender_record import parse_listing_datetime
+
+MERGED_OUTPUT = "output/tender_corpus.json"
+# Fields whose disagreement is bookkeeping rather than a conflict worth reporting
+UNREPORTED_FIELDS = frozenset({'scraped_at'})
+
+
+def _has_value(value):
+    return value not in (None, "", [], {})
+
+
+def merge_copies(current, incoming):
+    """Field-by-field merge of two copies of a tender; returns (merged, conflicting field names)"""
+    if (incoming.get('scraped_at') or '') >= (current.get('scraped_at') or ''):
+        newer, older = incoming, current
+    else:
+        newer, older = current, incoming
+    merged = dict(older)
+    conflicts = []
+    for key, value in newer.items():
+        if not _has_value(value):
+            merged.setdefault(key, value)
+            continue
+        if key in older and _has_value(older[key]) and older[key] != value and key not in UNREPORTED_FIELDS:
+            conflicts.append(key)
+        merged[key] = value
+    return merged, conflicts
+
+
+def _sort_key(tender):
+    published = parse_listing_datetime(tender.get('publication_date_text'))
+    return published or datetime.min, tender.get('publication_date_parsed') or '', tender.get('tender_id') or ''
+
+
+def merge_files(paths):
+    """Merge tender files in a single streaming pass over each; returns (tenders, stats)"""
+    by_id = {}
+    file_masks = {}     # tender_id -> bitmask of the inputs it appears in
+    unkeyed = []
+    field_conflicts = Counter()
+    per_file = []
+    for index, path in enumerate(paths):
+        counts = {'path': path, 'read': 0, 'new': 0, 'duplicates': 0, 'within_file': 0}
+        _, tenders = stream_tenders(path)
+        for tender in tenders:
+            counts['read'] += 1
+            tender_id = tender.get('tender_id')
+            if not tender_id:
+                unkeyed.append(tender)
+                counts['new'] += 1
+                continue
+            bit = 1 << index
+            if tender_id not in by_id:
+                by_id[tender_id] = tender
+                file_masks[tender_id] = bit
+                counts['new'] += 1
+                continue
+            counts['duplicates'] += 1
+            if file_masks[tender_id] & bit:
+                counts['within_file'] += 1
+            file_masks[tender_id] |= bit
+            by_id[tender_id], conflicts = merge_copies(by_id[tender_id], tender)
+            field_conflicts.update(conflicts)
+        per_file.append(counts)
+
+    pair_overlap = Counter()
+    for mask in file_masks.values():
+        present = [i for i in range(len(paths)) if mask >> i & 1]
+        pair_overlap.update(combinations(present, 2))
+
+    merged = sorted(by_id.values(), key=_sort_key, reverse=True) + unkeyed
+    stats = {
+        'files': per_file,
+        'read': sum(f['read'] for f in per_file),
+        'unique': len(merged),
+        'in_several_files': sum(1 for mask in file_masks.values() if mask & (mask - 1)),
+        'field_conflicts': dict(field_conflicts.most_common()),
+        'pair_overlap': {(paths[a], paths[b]): count for (a, b), count in pair_overlap.most_common()},
+        'unkeyed': len(unkeyed),
+    }
+    return merged, stats
+
+
+def print_stats(stats):
+    for counts in stats['files']:
+        print(f"📄 {counts['path']}: {counts['read']} tenders, {counts['new']} new, "
+              f"{counts['duplicates']} already seen ({counts['within_file']} repeated within the file)")
+    print(f"🧮 {stats['read']} tenders read → {stats['unique']} unique "
+          f"({stats['read'] - stats['unique']} duplicates dropped, {stats['in_several_files']} tenders in several files)")
+    if stats['unkeyed']:
+        print(f"⚠️ {stats['unkeyed']} tenders without a tender_id kept unmerged")
+    for (a, b), count in list(stats['pair_overlap'].items())[:10]:
+        print(f"   🔗 {count:6d} shared: {os.path.basename(a)} ↔ {os.path.basename(b)}")
+    if stats['field_conflicts']:
+        print("⚖️ Conflicting fields resolved by latest scraped_at: "
+              + ", ".join(f"{field} ({count})" for field, count in stats['field_conflicts'].items()))
+
+
+def merge_outputs(output, paths):
+    """Merge paths into output and print the overlap report; returns the stats"""
+    tenders, stats = merge_files(paths)
+    print_stats(stats)
+    scraped = [t.get('scraped_at') for t in tenders if t.get('scraped_at')]
+    metadata = {
+        'total_tenders': len(tenders),
+        'last_updated': datetime.now().isoformat(),
+        'last_scraped_at': max(scraped) if scraped else None,
+        'source_url': "https://www.find-tender.service.gov.uk/Search/Results",
+        'merged_from': [os.path.basename(path) for path in paths],
+    }
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    tmp_path = f"{output}.tmp"
+    write_tender_file(tmp_path, metadata, tenders, compressed=is_compressed(output))
+    os.replace(tmp_path, output)
+    print(f"📁 Merged corpus of {len(tenders)} tenders saved to {output}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge tender output files into one deduplicated corpus")
+    parser.add_argument("output", help=f"merged JSON output file (e.g. {MERGED_OUTPUT})")
+    parser.add_argument("inputs", nargs="+", help="tender JSON files to merge")
+    parser.add_argument("--pretty", action="store_true", help="write the corpus indented for reading (default compact)")
+    args = parser.parse_args()
+    tender_io.PRETTY_JSON = args.pretty
+    inputs = [path for path in args.inputs if os.path.abspath(path) != os.path.abspath(args.output)]
+    merge_outputs(args.output, inputs)
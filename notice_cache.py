@@ -0,0 +1,173 @@
+"""Persistent HTTP cache for /Notice/... detail pages.
+
+Entries are keyed by the canonical notice URL (query string and fragment
+removed, so ``?origin=SearchResults&p=N`` variants share one entry) and keep
+the body together with the ETag / Last-Modified validators. Entries younger
+than the TTL are served without any request; older ones are revalidated with
+If-None-Match / If-Modified-Since so an unchanged notice costs a 304. The
+cache lives in a single SQLite file and is trimmed least-recently-used first
+once it grows past its size limit.
+"""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit, urlunsplit
+
+CACHE_PATH = "output/cache/notice_cache.sqlite"
+CACHE_TTL = 7 * 24 * 3600               # seconds an entry is served without revalidation
+CACHE_MAX_BYTES = 500 * 1024 * 1024     # compressed bodies kept before LRU eviction
+EVICT_CHECK_EVERY = 100                 # stores between size checks
+
+
+def canonical_notice_url(url):
+    """Strip query string and fragment so every listing link to a notice maps to one key"""
+    parts = urlsplit(url)
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path.rstrip('/'), '', ''))
+
+
+class NoticeCache:
+    """SQLite-backed response cache with conditional revalidation, TTL and LRU size bound"""
+
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._conn = None
+        self._lock = threading.Lock()
+        self._stores_since_evict = 0
+        self.stats = {'fresh': 0, 'revalidated': 0, 'fetched': 0, 'failed': 0, 'evicted': 0}
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    validated_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        return self._conn
+
+    def lookup(self, url):
+        """Return the cached entry for url as a dict, or None"""
+        key = canonical_notice_url(url)
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT body, etag, last_modified, validated_at FROM responses WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), key))
+            conn.commit()
+        return {'body': zlib.decompress(row[0]), 'etag': row[1], 'last_modified': row[2], 'validated_at': row[3]}
+
+    def store(self, url, body, etag=None, last_modified=None):
+        key = canonical_notice_url(url)
+        compressed = zlib.compress(body, 6)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (url, body, size, etag, last_modified, validated_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, compressed, len(compressed), etag, last_modified, now, now)
+            )
+            conn.commit()
+            self._stores_since_evict += 1
+            if self._stores_since_evict >= EVICT_CHECK_EVERY:
+                self._stores_since_evict = 0
+                self._evict()
+
+    def mark_validated(self, url):
+        """Record that the server confirmed the cached copy is still current (304)"""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("UPDATE responses SET validated_at = ?, accessed_at = ? WHERE url = ?",
+                         (now, now, canonical_notice_url(url)))
+            conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes (lock held)"""
+        conn = self._connection()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Trim to 90% so eviction doesn't run again on the very next check
+        target = total - int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT url, size FROM responses ORDER BY accessed_at"):
+            if freed >= target:
+                break
+            victims.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM responses WHERE url = ?", victims)
+        conn.commit()
+        self.stats['evicted'] += len(victims)
+
+    def get(self, url, fetch, read=None, revalidate=False, **kwargs):
+        """Return (status_code, body) for url, using fetch(url, **kwargs) only when the cache can't answer.
+
+        A fresh entry returns (200, body) with no request; a stale one is revalidated and a 304
+        returns the cached body. Non-200 responses are not cached and return (status, None).
+        read(response) can replace response.content, e.g. to stop a streamed download early;
+        whatever it returns is what gets cached. revalidate=True asks the server even for a fresh
+        entry, for notices known to have been amended.
+        """
+        entry = self.lookup(url)
+        if entry and not revalidate and time.time() - entry['validated_at'] < self.ttl:
+            self._count('fresh')
+            return 200, entry['body']
+
+        if entry:
+            headers = dict(kwargs.pop('headers', None) or {})
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+            kwargs['headers'] = headers
+
+        response = fetch(url, **kwargs)
+        if response.status_code == 304 and entry:
+            response.close()
+            self.mark_validated(url)
+            self._count('revalidated')
+            return 200, entry['body']
+        if response.status_code != 200:
+            response.close()
+            self._count('failed')
+            return response.status_code, None
+
+        body = read(response) if read else response.content
+        self.store(url, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        self._count('fetched')
+        return 200, body
+
+    def _count(self, outcome):
+        # fetch() runs on the scraper's detail worker threads, so counts are updated under the lock
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def summary(self):
+        with self._lock:
+            stats = dict(self.stats)
+        served = stats['fresh'] + stats['revalidated']
+        total = served + stats['fetched'] + stats['failed']
+        return (f"{stats['fresh']} fresh hits, {stats['revalidated']} revalidated (304), "
+                f"{stats['fetched']} downloaded, {stats['failed']} failed, "
+                f"{stats['evicted']} evicted ({served}/{total} served from cache)")
+
+
+# Shared cache for notice detail pages used by both scrapers
+notice_cache = NoticeCache()
@@ -1,9 +1,12 @@
-import json
-import requests
 from bs4 import BeautifulSoup
-import random
 from datetime import datetime
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import http_client
+from tender_io import find_tender_file, read_metadata, sample_tenders
+from tender_log import stream_tenders
 
 def validate_scraped_data(json_file="output/tender_opportunities.json"):
     """Comprehensive validation of scraped data quality"""
@@ -12,17 +15,40 @@ def validate_scraped_data(json_file="output/tender_opportunities.json"):
         print(f"❌ JSON file '{json_file}' not found!")
         return None
     
+    # One streaming pass over the tenders collects every count below, so memory stays flat however big the file is
+    total = has_title = has_link = has_org = has_description = has_tender_id = has_details = 0
+    valid_links = 0
+    invalid_examples = []
+    id_counts = {}
+    org_counts = {}
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # stream_tenders also yields tenders still only in the file's JSONL log
+        metadata, tenders = stream_tenders(json_file)
+        for t in tenders:
+            total += 1
+            link = t.get('link') or ''
+            if t.get('title') and len(t.get('title', '').strip()) > 0:
+                has_title += 1
+            if link.strip():
+                has_link += 1
+            if t.get('organisation') and t.get('organisation') != "N/A":
+                has_org += 1
+                org_counts[t['organisation']] = org_counts.get(t['organisation'], 0) + 1
+            if t.get('description') and len(t.get('description', '').strip()) > 0:
+                has_description += 1
+            if t.get('tender_id'):
+                has_tender_id += 1
+                id_counts[t['tender_id']] = id_counts.get(t['tender_id'], 0) + 1
+            if t.get('details') and len(t.get('details', {})) > 0:
+                has_details += 1
+            if link.startswith('https://www.find-tender.service.gov.uk/Notice/'):
+                valid_links += 1
+            elif len(invalid_examples) < 3:
+                invalid_examples.append(link)
     except Exception as e:
         print(f"❌ Error reading JSON file: {e}")
         return None
     
-    tenders = data.get('tenders', [])
-    metadata = data.get('metadata', {})
-    total = len(tenders)
-    
     print("📊 DATA QUALITY VALIDATION REPORT")
     print("="*60)
     print(f"🕒 Report generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -42,13 +68,6 @@ def validate_scraped_data(json_file="output/tender_opportunities.json"):
     # Check data completeness
     print(f"\n✅ DATA COMPLETENESS:")
     
-    has_title = sum(1 for t in tenders if t.get('title') and len(t.get('title', '').strip()) > 0)
-    has_link = sum(1 for t in tenders if t.get('link') and len(t.get('link', '').strip()) > 0)
-    has_org = sum(1 for t in tenders if t.get('organisation') and t.get('organisation') != "N/A")
-    has_description = sum(1 for t in tenders if t.get('description') and len(t.get('description', '').strip()) > 0)
-    has_tender_id = sum(1 for t in tenders if t.get('tender_id'))
-    has_details = sum(1 for t in tenders if t.get('details') and len(t.get('details', {})) > 0)
-    
     print(f"   📝 Titles: {has_title}/{total} ({has_title/total*100:.1f}%)")
     print(f"   🔗 Links: {has_link}/{total} ({has_link/total*100:.1f}%)")
     print(f"   🏛️  Organisations: {has_org}/{total} ({has_org/total*100:.1f}%)")
@@ -58,44 +77,29 @@ def validate_scraped_data(json_file="output/tender_opportunities.json"):
     
     # Check for duplicates
     print(f"\n🔄 DUPLICATE CHECK:")
-    tender_ids = [t.get('tender_id') for t in tenders if t.get('tender_id')]
-    unique_ids = set(tender_ids)
-    duplicates = len(tender_ids) - len(unique_ids)
+    duplicates = has_tender_id - len(id_counts)
     print(f"   Duplicates found: {duplicates}")
     
     if duplicates > 0:
-        # Find which IDs are duplicated
-        id_counts = {}
-        for tid in tender_ids:
-            id_counts[tid] = id_counts.get(tid, 0) + 1
-        
         duplicate_ids = [tid for tid, count in id_counts.items() if count > 1]
         print(f"   Duplicate IDs: {duplicate_ids[:5]}{'...' if len(duplicate_ids) > 5 else ''}")
     
     # Validate link patterns
     print(f"\n🔗 LINK VALIDATION:")
-    valid_links = sum(1 for t in tenders if t.get('link', '').startswith('https://www.find-tender.service.gov.uk/Notice/'))
     invalid_links = total - valid_links
     print(f"   Valid link format: {valid_links}/{total} ({valid_links/total*100:.1f}%)")
     
     if invalid_links > 0:
         print(f"   ⚠️  Invalid links: {invalid_links}")
         # Show examples of invalid links
-        invalid_examples = [t.get('link', '') for t in tenders if not t.get('link', '').startswith('https://www.find-tender.service.gov.uk/Notice/')][:3]
         for example in invalid_examples:
             print(f"      Example: {example}")
     
     # Organisation analysis
     print(f"\n🏛️  ORGANISATION ANALYSIS:")
-    organisations = [t.get('organisation', '') for t in tenders if t.get('organisation') and t.get('organisation') != "N/A"]
-    unique_orgs = set(organisations)
-    print(f"   Unique organisations: {len(unique_orgs)}")
+    print(f"   Unique organisations: {len(org_counts)}")
     
     # Most common organisations
-    org_counts = {}
-    for org in organisations:
-        org_counts[org] = org_counts.get(org, 0) + 1
-    
     top_orgs = sorted(org_counts.items(), key=lambda x: x[1], reverse=True)[:5]
     print(f"   Top organisations:")
     for org, count in top_orgs:
@@ -144,20 +148,16 @@ def generate_validation_sample(json_file="output/tender_opportunities.json", sam
         return None
     
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        sample = sample_tenders(stream_tenders(json_file)[1], sample_size)
     except Exception as e:
         print(f"❌ Error reading JSON file: {e}")
         return None
     
-    tenders = data.get('tenders', [])
-    
-    if not tenders:
+    if not sample:
         print("❌ No tenders found in JSON file!")
         return None
     
-    actual_sample_size = min(sample_size, len(tenders))
-    sample = random.sample(tenders, actual_sample_size)
+    actual_sample_size = len(sample)
     
     print(f"\n🎯 MANUAL VALIDATION SAMPLE ({actual_sample_size} tenders)")
     print("="*60)
@@ -197,7 +197,7 @@ def quick_website_comparison(json_file="output/tender_opportunities.json"):
     try:
         # Get current website total
         headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) WebKit/537.36'}
-        response = requests.get("https://www.find-tender.service.gov.uk/Search/Results", headers=headers, timeout=15)
+        response = http_client.get("https://www.find-tender.service.gov.uk/Search/Results", headers=headers)
         
         if response.status_code == 200:
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -217,10 +217,9 @@ def quick_website_comparison(json_file="output/tender_opportunities.json"):
         
         # Get our scraped total
         if os.path.exists(json_file):
-            with open(json_file, 'r', encoding='utf-8') as f:
-                our_data = json.load(f)
-                our_total = our_data.get('metadata', {}).get('total_tenders', 0)
-                pages_scraped = our_data.get('metadata', {}).get('pages_scraped', 0)
+            our_metadata = read_metadata(json_file)
+            our_total = our_metadata.get('total_tenders', 0)
+            pages_scraped = our_metadata.get('pages_scraped', 0)
                 
             print(f"💾 We scraped: {our_total} notices ({pages_scraped} pages)")
             
@@ -253,21 +252,16 @@ def test_random_links(json_file="output/tender_opportunities.json", num_tests=3)
     print("-" * 30)
     
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        # Test random links
+        test_tenders = sample_tenders(stream_tenders(json_file)[1], num_tests)
     except Exception as e:
         print(f"❌ Error reading JSON file: {e}")
         return None
     
-    tenders = data.get('tenders', [])
-    
-    if not tenders:
+    if not test_tenders:
         print("❌ No tenders found in JSON file!")
         return None
     
-    # Test random links
-    test_tenders = random.sample(tenders, min(num_tests, len(tenders)))
-    
     headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) WebKit/537.36'}
     working_links = 0
     
@@ -278,7 +272,7 @@ def test_random_links(json_file="output/tender_opportunities.json", num_tests=3)
         print(f"🔗 Testing link {i}: {title[:50]}...")
         
         try:
-            response = requests.get(link, headers=headers, timeout=10)
+            response = http_client.get(link, headers=headers)
             if response.status_code == 200:
                 print(f"   ✅ Working (Status: {response.status_code})")
                 working_links += 1
@@ -312,7 +306,7 @@ def save_validation_report(json_file="output/tender_opportunities.json", report_
     # Generate default report filename if not provided
     if report_file is None:
         # Extract the JSON filename and create corresponding report filename
-        json_basename = os.path.basename(json_file).replace('.json', '')
+        json_basename = os.path.basename(json_file).replace('.zst', '').replace('.json', '')
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         report_file = f"output_validation/validation_reports/validation_report_{json_basename}_{timestamp}.txt"
     
@@ -402,14 +396,14 @@ def full_validation(json_file="output/tender_opportunities.json", sample_size=5)
         print("   🔧 Check extraction patterns and selectors")
     
     # Generate the report filename for reference
-    json_basename = os.path.basename(json_file).replace('.json', '')
+    json_basename = os.path.basename(json_file).replace('.zst', '').replace('.json', '')
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     report_file = f"output_validation/validation_reports/validation_report_{json_basename}_{timestamp}.txt"
     print(f"   📁 Check {report_file} for detailed results")
 
 if __name__ == "__main__":
     # Set target file - change this to validate different scraper outputs
-    target_file = "output/tender_opportunities.json"  # Date-specific file from updated scraper
+    target_file = find_tender_file("output/tender_opportunities.json")  # Date-specific file from updated scraper, or its .zst
     
     # Alternative files you might want to validate:
     # target_file = "output/tender_opportunities.json"  # Original scraper output
@@ -1,6 +1,7 @@
 import streamlit as st
-import json
 import os
+from tender_io import find_tender_file
+from tender_store import iter_tender_data
 from utils.validation import (
     validate_scraped_data,
     quick_website_comparison,
@@ -10,7 +11,7 @@ from utils.validation import (
 st.set_page_config(page_title="Tender Summary", layout="wide")
 st.title("📋 Tender Summary")
 
-json_file = "output/tender_opportunities.json"
+json_file = find_tender_file("output/tender_opportunities.json")
 
 
 if not os.path.exists(json_file):
@@ -36,9 +37,9 @@ st.metric("Overall Score", f"{validation.get('overall_score', 0):.1f}%")
 
 from datetime import datetime
 
-with open(json_file, 'r', encoding='utf-8') as f:
-    data = json.load(f)
-    scraped_raw = data.get("metadata", {}).get("last_scraped_at")
+# Only the metadata is needed; the tender iterator is never consumed
+metadata, _ = iter_tender_data(json_file)
+scraped_raw = metadata.get("last_scraped_at")
 
 try:
     dt = datetime.fromisoformat(scraped_raw.replace("Z", ""))
@@ -1,7 +1,9 @@
 import streamlit as st
 import pandas as pd
-import json
 from datetime import datetime
+from dashboard_cache import tender_table
+from dashboard_data import cpv_count_frame
+from tender_record import SUBMISSION_DEADLINE_KEY
 
 st.set_page_config(page_title="CPV Breakdown", layout="wide")
 st.title("📊 CPV Code Overview")
@@ -9,59 +11,32 @@ st.title("📊 CPV Code Overview")
 json_file = "output/tender_opportunities.json"
 
 try:
-    with open(json_file, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    df, cpv_index = tender_table(json_file)
 
-    tenders = data.get("tenders", [])
+    # Per-CPV counts come straight from the shared index
+    cpv_summary = cpv_count_frame(cpv_index)
 
-    cpv_records = []
-    for tender in tenders:
-        codes = tender.get("cpv_codes", [])
-        descriptions = tender.get("cpv_descriptions", [])
-        for code, desc in zip(codes, descriptions):
-            cpv_records.append({
-                "cpv_code": code,
-                "cpv_description": desc
-            })
-
-    cpv_df = pd.DataFrame(cpv_records)
-
-    cpv_summary = (
-        cpv_df
-        .groupby(["cpv_code", "cpv_description"])
-        .size()
-        .reset_index(name="tender_count")
-        .sort_values(by="tender_count", ascending=False)
-    )
+    today = pd.Timestamp(datetime.today())
+    if df.empty:
+        upcoming = df
+    else:
+        upcoming = df[df["submission_deadline"] >= today].sort_values("submission_deadline", kind="stable")
+    upcoming_tenders = [] if upcoming.empty else [{
+        "title": title if isinstance(title, str) else "Untitled",
+        "organisation": organisation if isinstance(organisation, str) else "Unknown",
+        "deadline": deadline_raw,
+        "link": link if isinstance(link, str) else "#",
+        "cpv_descriptions": ", ".join(descriptions) if isinstance(descriptions, list) else "",
+        "days_left": (deadline - today).days
+    } for title, organisation, deadline_raw, link, descriptions, deadline in zip(
+        upcoming["title"], upcoming["organisation"], upcoming[f"details.{SUBMISSION_DEADLINE_KEY}"],
+        upcoming["link"], upcoming["cpv_descriptions"], upcoming["submission_deadline"])]
 
     st.subheader("📌 CPV Summary")
     st.dataframe(cpv_summary, use_container_width=True)
 
     st.subheader("🗓️ Upcoming Tender Notices")
 
-    today = datetime.today()
-    upcoming_tenders = []
-
-    for tender in tenders:
-        details = tender.get("details", {})
-        deadline_raw = details.get("Submission deadline")
-        try:
-            deadline_dt = pd.to_datetime(deadline_raw, dayfirst=True, errors="coerce")
-        except:
-            deadline_dt = None
-
-        if deadline_dt and deadline_dt >= pd.Timestamp(today):
-            upcoming_tenders.append({
-                "title": tender.get("title", "Untitled"),
-                "organisation": tender.get("organisation", "Unknown"),
-                "deadline": deadline_raw,
-                "link": tender.get("link", "#"),
-                "cpv_descriptions": ", ".join(tender.get("cpv_descriptions", [])),
-                "days_left": (deadline_dt - pd.Timestamp(today)).days
-            })
-
-    upcoming_tenders = sorted(upcoming_tenders, key=lambda x: pd.to_datetime(x["deadline"], dayfirst=True))
-
     if not upcoming_tenders:
         st.info("✅ No upcoming tenders found.")
     else:
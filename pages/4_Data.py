@@ -1,12 +1,13 @@
 import streamlit as st
 import pandas as pd
 import json
+from paginated_table import paginated_table
+from tender_store import load_tender_data
 
 st.title("Data Overview")
 
-# Load JSON data with utf-8 encoding
-with open("output/tender_opportunities.json", "r", encoding="utf-8") as file:
-    data = json.load(file)
+# Load tenders from the JSON file and its log (tender_store.STORE_SOURCE reads the store instead)
+data = load_tender_data("output/tender_opportunities.json")
 
 # Remove the 'metadata' section if it exists
 if "metadata" in data:
@@ -26,7 +27,7 @@ except ValueError:
 
 # Display the DataFrame
 st.write("### JSON Data Loaded")
-st.dataframe(df)  # Display as an interactive table
+paginated_table(df, key="data")  # Display a page at a time
 
 # Allow users to filter or search the data
 st.write("### Filtered Data")
@@ -34,7 +35,7 @@ filter_column = st.selectbox("Select a column to filter by:", df.columns)
 filter_value = st.text_input(f"Enter a value to filter {filter_column}:")
 if filter_value:
     filtered_df = df[df[filter_column].astype(str).str.contains(filter_value, case=False)]
-    st.write(filtered_df)
+    paginated_table(filtered_df, key="data_filtered")
 else:
     st.write("Enter a value to filter the data.")
 
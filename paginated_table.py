@@ -0,0 +1,45 @@
+"""Paginated tables for the Streamlit pages.
+
+On every rerun, st.dataframe serialises each row and column it is given and
+sends the result to the browser. paginated_table() instead sorts rows on the
+server and cuts out the visible page with dashboard_data.table_page(). It
+sends only that page's rows and the chosen columns, so the payload stays the
+size of one page however large the table grows. Filter the frame before
+calling it, because the page is cut from the rows it is given.
+"""
+import streamlit as st
+
+from dashboard_data import page_count, table_page
+
+PAGE_SIZES = (25, 50, 100, 250)
+DEFAULT_PAGE_SIZE = 50
+# Sort option that keeps the rows in the order they were given (e.g. search ranking)
+KEEP_ORDER = "(as listed)"
+
+
+def paginated_table(df, key, default_columns=None, page_size=DEFAULT_PAGE_SIZE, **dataframe_kwargs):
+    """Show df one page at a time, with column, sort and page controls whose widget keys start with key.
+    dataframe_kwargs go to st.dataframe; returns the page shown"""
+    all_columns = list(df.columns)
+    default = [column for column in (default_columns or all_columns) if column in all_columns]
+    columns = st.multiselect("Columns", all_columns, default=default, key=f"{key}_columns") or default
+
+    sort_col, order_col, size_col, page_col = st.columns(4)
+    sort_by = sort_col.selectbox("Sort by", [KEEP_ORDER] + columns, key=f"{key}_sort")
+    descending = order_col.selectbox("Order", ["Ascending", "Descending"], key=f"{key}_order") == "Descending"
+    page_size = size_col.selectbox("Rows per page", PAGE_SIZES,
+                                   index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 0,
+                                   key=f"{key}_page_size")
+
+    # Fewer rows after a filter change can leave the remembered page past the end
+    pages = page_count(len(df), page_size)
+    page_key = f"{key}_page"
+    if st.session_state.get(page_key, 1) > pages:
+        st.session_state[page_key] = pages
+    page = page_col.number_input(f"Page (of {pages})", min_value=1, max_value=pages, step=1, key=page_key)
+
+    frame = table_page(df, page, page_size, None if sort_by == KEEP_ORDER else sort_by, not descending, columns)
+    st.dataframe(frame, **dataframe_kwargs)
+    first = (page - 1) * page_size
+    st.caption(f"Rows {first + 1 if len(frame) else 0}–{first + len(frame)} of {len(df)}")
+    return frame
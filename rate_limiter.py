@@ -0,0 +1,182 @@
+"""Shared request throttling for every Find a Tender fetch path.
+
+A token bucket enforces the requests-per-second budget, 429 responses (and
+503s that carry Retry-After) pause all callers until the server's Retry-After
+has elapsed, and both the request rate and the number of requests allowed in
+flight are tuned AIMD-style: raised a step after each healthy window of
+responses, halved when the server throttles us, errors pile up or latency
+drifts above target. The rate never exceeds the configured budget.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Defaults for find-tender.service.gov.uk
+REQUESTS_PER_SECOND = 5.0
+MAX_CONCURRENCY = 8
+TARGET_LATENCY = 3.0          # seconds; slower windows back off
+ERROR_RATE_THRESHOLD = 0.2    # fraction of failed responses per window that backs off
+DEFAULT_BACKOFF = 30.0        # seconds to pause after a 429 without Retry-After
+
+
+def parse_retry_after(value):
+    """Return the Retry-After header as seconds to wait, or None if absent/unparseable"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """Token-bucket rate limiter with Retry-After handling and AIMD rate/concurrency control"""
+
+    def __init__(self, rate=REQUESTS_PER_SECOND, burst=None, max_concurrency=MAX_CONCURRENCY,
+                 min_concurrency=1, target_latency=TARGET_LATENCY,
+                 error_rate_threshold=ERROR_RATE_THRESHOLD, window=10, default_backoff=DEFAULT_BACKOFF):
+        self.max_rate = float(rate)
+        self.rate = self.max_rate
+        self.min_rate = self.max_rate / 16
+        self.burst = float(burst or max(1.0, rate / 2))
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.concurrency = max(self.min_concurrency, (self.max_concurrency + 1) // 2)
+        self.target_latency = target_latency
+        self.error_rate_threshold = error_rate_threshold
+        self.default_backoff = default_backoff
+
+        self._tokens = self.burst
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._active = 0
+        self._samples = deque(maxlen=window)
+        self._cond = threading.Condition()
+        self.stats = {'requests': 0, 'throttled': 0, 'errors': 0, 'wait_seconds': 0.0}
+
+    def set_budget(self, rate=None, max_concurrency=None):
+        """Change the requests-per-second budget and/or the concurrency ceiling"""
+        with self._cond:
+            if rate is not None:
+                self.max_rate = self.rate = float(rate)
+                self.min_rate = self.max_rate / 16
+                self.burst = max(1.0, self.max_rate / 2)
+                self._tokens = min(self._tokens, self.burst)
+            if max_concurrency is not None:
+                self.max_concurrency = max(1, max_concurrency)
+                self.min_concurrency = min(self.min_concurrency, self.max_concurrency)
+                self.concurrency = self.max_concurrency
+            self._cond.notify_all()
+
+    def _take_token(self):
+        """Block until the bucket has a token and no Retry-After pause is active"""
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate)
+                    self._last_refill = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                self.stats['wait_seconds'] += wait
+            time.sleep(wait)
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the current concurrency slots and spend one token for a request"""
+        with self._cond:
+            while self._active >= self.concurrency:
+                self._cond.wait()
+            self._active += 1
+        try:
+            self._take_token()
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def _decrease(self):
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.concurrency = max(self.min_concurrency, self.concurrency // 2)
+        self._samples.clear()
+        self._cond.notify_all()
+
+    def _increase(self):
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+        self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+        self._samples.clear()
+        self._cond.notify_all()
+
+    def record(self, latency, status_code=None, retry_after=None, error=False):
+        """Feed one response (or failure) back into the throttle and concurrency controller"""
+        throttled = status_code == 429 or (status_code == 503 and retry_after is not None)
+        failed = error or throttled or (status_code is not None and status_code >= 500)
+        with self._cond:
+            self.stats['requests'] += 1
+            if failed:
+                self.stats['errors'] += 1
+            if throttled:
+                # Server asked us to slow down: pause everyone and back off at once, but only
+                # once per pause so a burst of 429s from requests already in flight counts as one
+                self.stats['throttled'] += 1
+                pause = retry_after if retry_after is not None else self.default_backoff
+                now = time.monotonic()
+                if self._paused_until <= now:
+                    self._decrease()
+                self._paused_until = max(self._paused_until, now + pause)
+                return
+
+            self._samples.append((latency, failed))
+            if len(self._samples) < self._samples.maxlen:
+                return
+            avg_latency = sum(s[0] for s in self._samples) / len(self._samples)
+            error_rate = sum(1 for s in self._samples if s[1]) / len(self._samples)
+            if error_rate > self.error_rate_threshold or avg_latency > self.target_latency:
+                self._decrease()
+            else:
+                self._increase()
+
+    def get(self, session, url, max_attempts=4, **kwargs):
+        """GET url through the limiter, retrying 429 responses once their Retry-After has passed"""
+        for attempt in range(1, max_attempts + 1):
+            with self.slot():
+                start = time.monotonic()
+                try:
+                    response = session.get(url, **kwargs)
+                except Exception:
+                    self.record(time.monotonic() - start, error=True)
+                    raise
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                self.record(time.monotonic() - start, response.status_code, retry_after)
+
+            if response.status_code != 429 or attempt == max_attempts:
+                return response
+            response.close()
+            wait = retry_after if retry_after is not None else self.default_backoff
+            print(f"⏳ Throttled (HTTP 429) on {url} - retrying in {wait:.0f}s "
+                  f"(now {self.rate:.1f} req/s, concurrency {self.concurrency})")
+        return response
+
+    def summary(self):
+        return (f"{self.stats['requests']} requests, {self.stats['throttled']} throttled, "
+                f"{self.stats['errors']} errors, {self.rate:.1f}/{self.max_rate:.1f} req/s, "
+                f"concurrency {self.concurrency}/{self.max_concurrency}, "
+                f"{self.stats['wait_seconds']:.1f}s spent waiting for budget")
+
+
+# Shared limiter for find-tender.service.gov.uk used by all scrapers and the validator
+limiter = RateLimiter()
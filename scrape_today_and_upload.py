@@ -1,8 +1,8 @@
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, date
 from office365.runtime.auth.authentication_context import AuthenticationContext
 from office365.sharepoint.client_context import ClientContext
+import http_client
 
 
 # SharePoint credentials (replace with yours)
@@ -17,7 +17,7 @@ def scrape_today_tenders():
     today = date.today()
     url = "https://www.find-tender.service.gov.uk/Search/Results?sort=unix_published_date%3ADESC"
     headers = {"User-Agent": "Mozilla/5.0"}
-    response = requests.get(url, headers=headers)
+    response = http_client.get(url, headers=headers)
     soup = BeautifulSoup(response.content, "html.parser")
 
     tenders = []
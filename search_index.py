@@ -0,0 +1,120 @@
+"""Full-text keyword index over the title, organisation and description of a tender table.
+
+Text is lowercased and split into word tokens. Each token maps to the rows
+that contain it, laid out like cpv_index.CpvIndex: `terms` is the sorted
+vocabulary, and `postings[offsets[i]:offsets[i + 1]]` holds the rows of
+terms[i] in order, with `impacts` holding each row's score for that term.
+Because terms are sorted, every term starting with a prefix owns one
+contiguous slice, so each query token is matched as a prefix ('soft' finds
+'software'). A multi-word query keeps the rows that match every token.
+
+Scores are BM25 without length normalisation. Each occurrence of a token
+counts its field's weight from SEARCH_FIELDS, the total saturates with
+BM25_K1, and the result is scaled by the term's inverse document frequency.
+Each impact is computed when the index is built, so a query only gathers and
+sums precomputed scores. Its cost follows the number of matching postings,
+not the number of tenders.
+"""
+import re
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+# Searched columns and how much a token in each counts towards a row's score
+SEARCH_FIELDS = (("title", 3.0), ("organisation", 2.0), ("description", 1.0))
+BM25_K1 = 1.2
+TOKEN_PATTERN = re.compile(r"\w+")
+# Sorts after every token that starts with a given prefix
+_PREFIX_END = chr(0x10FFFF)
+
+EMPTY_ROWS = np.empty(0, dtype=np.int32)
+EMPTY_SCORES = np.empty(0, dtype=np.float32)
+
+
+def tokenize(text):
+    """'Cyber-security Services' -> ['cyber', 'security', 'services']"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+    """Token -> rows and BM25 impacts, queried by token prefixes"""
+
+    def __init__(self, terms, offsets, postings, impacts, size):
+        self.terms = terms          # sorted vocabulary
+        self.offsets = offsets      # len(terms) + 1 slice bounds into postings
+        self.postings = postings    # row positions (int32), sorted within each term
+        self.impacts = impacts      # score (float32) of each posting
+        self.size = size            # rows in the indexed table
+
+    @classmethod
+    def from_frame(cls, df, fields=SEARCH_FIELDS):
+        """Index the text columns of df (missing columns and non-string cells are skipped)"""
+        columns = [(df[name].tolist(), weight) for name, weight in fields if name in df]
+        vocabulary = {}
+        term_ids, rows, weights = array("i"), array("i"), array("f")
+        for row, values in enumerate(zip(*(values for values, _ in columns))):
+            row_terms = {}
+            for text, (_, weight) in zip(values, columns):
+                if isinstance(text, str):
+                    for token in tokenize(text):
+                        row_terms[token] = row_terms.get(token, 0.0) + weight
+            for token, weight in row_terms.items():
+                term_ids.append(vocabulary.setdefault(token, len(vocabulary)))
+                rows.append(row)
+                weights.append(weight)
+
+        terms = sorted(vocabulary)
+        position = np.empty(len(terms), dtype=np.int64)
+        position[[vocabulary[term] for term in terms]] = np.arange(len(terms))
+        term_positions = position[np.frombuffer(term_ids, dtype=np.int32)] if term_ids else EMPTY_ROWS
+        # Rows were appended in order, so a stable sort keeps each term's rows sorted
+        order = np.argsort(term_positions, kind="stable")
+        postings = np.frombuffer(rows, dtype=np.int32)[order] if rows else EMPTY_ROWS
+        frequencies = np.frombuffer(weights, dtype=np.float32)[order] if weights else EMPTY_SCORES
+        document_counts = np.bincount(term_positions, minlength=len(terms))
+        offsets = np.concatenate(([0], np.cumsum(document_counts))).astype(np.int64)
+
+        size = len(df)
+        idf = np.log1p((size - document_counts + 0.5) / (document_counts + 0.5))
+        impacts = (frequencies * (BM25_K1 + 1) / (frequencies + BM25_K1)
+                   * np.repeat(idf, document_counts)).astype(np.float32)
+        return cls(terms, offsets, postings, impacts, size)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def _prefix_matches(self, token):
+        """(sorted rows, summed impacts) of every term starting with token"""
+        first = bisect_left(self.terms, token)
+        last = bisect_left(self.terms, token + _PREFIX_END, first)
+        start, end = self.offsets[first], self.offsets[last]
+        rows, scores = self.postings[start:end], self.impacts[start:end]
+        if last - first > 1:
+            order = np.argsort(rows, kind="stable")
+            rows, scores = rows[order], scores[order]
+            rows, starts = np.unique(rows, return_index=True)
+            scores = np.add.reduceat(scores, starts) if len(starts) else EMPTY_SCORES
+        return rows, scores
+
+    def search(self, query):
+        """(rows, scores) of the rows matching every token of query, best match first
+        (ties in row order); nothing for a query without tokens"""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return EMPTY_ROWS, EMPTY_SCORES
+        rows, scores = self._prefix_matches(tokens[0])
+        for token in tokens[1:]:
+            if not len(rows):
+                break
+            token_rows, token_scores = self._prefix_matches(token)
+            rows, left, right = np.intersect1d(rows, token_rows, assume_unique=True, return_indices=True)
+            scores = scores[left] + token_scores[right]
+        order = np.lexsort((rows, -scores))
+        return rows[order], scores[order]
+
+    def mask(self, rows):
+        """Boolean mask over the table's rows, True at rows"""
+        mask = np.zeros(self.size, dtype=bool)
+        mask[rows] = True
+        return mask
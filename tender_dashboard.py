@@ -3,9 +3,13 @@ import streamlit as st
 # MUST be the first Streamlit command
 st.set_page_config(page_title="Tender Dashboard", layout="wide")
 
+import numpy as np
 import pandas as pd
-import json
 from datetime import datetime, timedelta
+from cpv_index import CpvIndex
+from dashboard_data import build_deadline_frame, filter_mask, tender_data_version
+from paginated_table import paginated_table
+from tender_store import iter_tender_data
 
 # Debug imports with detailed error messages
 st.write("🔍 **Debugging Package Imports:**")
@@ -48,132 +52,24 @@ if 'selected_date' not in st.session_state:
 # Load JSON data
 json_file = "output/tender_opportunities.json"
 
-# Location mapping (latitude and longitude for UK regions)
-uk_location_mapping = {
-    "UKH1 - East Anglia": (52.2000, 0.1313),
-    "UKG21 - Telford and Wrekin": (52.6784, -2.4469),
-    "UK - United Kingdom": (55.3781, -3.4360),
-    "UKC1 - Tees Valley and Durham": (54.5700, -1.3200),
-    "UKC2 - Northumberland and Tyne and Wear": (54.9700, -1.6100),
-    "UKD1 - Cumbria": (54.4600, -2.7400),
-    "UKD3 - Greater Manchester": (53.4808, -2.2426),
-    "UKD6 - Cheshire": (53.2000, -2.5200),
-    "UKE1 - East Yorkshire and Northern Lincolnshire": (53.7600, -0.3300),
-    "UKE4 - West Yorkshire": (53.8000, -1.5500),
-    "UKF1 - Derbyshire and Nottinghamshire": (53.1000, -1.5500),
-    "UKF2 - Leicestershire, Rutland and Northamptonshire": (52.6369, -1.1398),
-    "UKG1 - Herefordshire, Worcestershire and Warwickshire": (52.1900, -2.2200),
-    "UKH2 - Bedfordshire and Hertfordshire": (51.7500, -0.4100),
-    "UKH3 - Essex": (51.7340, 0.4700),
-    "UKI3 - Inner London": (51.5074, -0.1278),
-    "UKJ1 - Berkshire, Buckinghamshire and Oxfordshire": (51.7500, -1.2500),
-    "UKJ2 - Surrey, East and West Sussex": (51.0500, -0.3200),
-    "UKJ3 - Hampshire and Isle of Wight": (50.9000, -1.4000),
-    "UKK1 - Gloucestershire, Wiltshire and Bath/Bristol area": (51.4500, -2.5800),
-    "UKK4 - Devon": (50.7100, -3.5300),
-    "UKL1 - West Wales and The Valleys": (51.7700, -3.7800),
-    "UKL2 - East Wales": (52.3200, -3.8600),
-    "UKM6 - Highlands and Islands": (57.4800, -5.0700),
-    "UKN0 - Northern Ireland": (54.7877, -6.4923),
-}
+@st.cache_data(show_spinner="Loading tenders...")
+def _load_deadlines(data_version, today):
+    # data_version is only a cache key: a new scrape changes it and rebuilds the tables
+    _, tenders = iter_tender_data(json_file)
+    return build_deadline_frame(tenders, today)
 
 def load_and_process_data():
-    """Load and process tender data"""
+    """Load and process tender data, cached until the tender data (or the date) changes"""
     try:
-        with open(json_file, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        
-        tenders = data.get("tenders", [])
-        today = datetime.today()
-        
-        # Prepare data
-        deadline_list = []
-        events = []
-        all_cpv_details = set()
-        
-        for tender in tenders:
-            details = tender.get("details", {})
-            deadline_raw = details.get("Submission deadline")
-            contract_location = details.get("Contract location", "Unknown")
-            
-            try:
-                deadline_dt = pd.to_datetime(deadline_raw, dayfirst=True, errors="coerce")
-            except:
-                deadline_dt = None
-            
-            if deadline_dt and deadline_dt >= pd.Timestamp(today):
-                location_coords = uk_location_mapping.get(contract_location)
-                cpv_codes = tender.get("cpv_codes", [])
-                cpv_descriptions = tender.get("cpv_descriptions", [])
-                
-                # Combine CPV codes and descriptions
-                combined_cpv = ", ".join([f"{code} - {desc}" for code, desc in zip(cpv_codes, cpv_descriptions)])
-                
-                # Add individual CPV code-description pairs to the set
-                cpv_pairs = [f"{code} - {desc}" for code, desc in zip(cpv_codes, cpv_descriptions)]
-                all_cpv_details.update(cpv_pairs)
-                
-                tender_data = {
-                    "title": tender.get("title", "Untitled"),
-                    "deadline": deadline_dt,
-                    "organisation": tender.get("organisation", "Unknown"),
-                    "cpv": combined_cpv,
-                    "individual_cpvs": cpv_codes,
-                    "cpv_pairs": cpv_pairs,
-                    "link": tender.get("link", "#"),
-                    "Contract location": contract_location,
-                    "latitude": location_coords[0] if location_coords else None,
-                    "longitude": location_coords[1] if location_coords else None
-                }
-                
-                deadline_list.append(tender_data)
-                
-                # Create events for calendar
-                events.append({
-                    "title": str(tender.get("title", "Untitled")),
-                    "start": deadline_dt.strftime('%Y-%m-%d'),
-                    "end": deadline_dt.strftime('%Y-%m-%d'),
-                    "url": str(tender.get("link", "#")),
-                    "backgroundColor": "#e74c3c" if deadline_dt <= pd.Timestamp(today + timedelta(days=7)) else "#3498db",
-                    "borderColor": "#c0392b" if deadline_dt <= pd.Timestamp(today + timedelta(days=7)) else "#2980b9",
-                    "extendedProps": {
-                        "organisation": str(tender.get("organisation", "Unknown")),
-                        "contract_location": str(contract_location),
-                        "cpv_pairs": [str(pair) for pair in cpv_pairs],
-                        "deadline_str": deadline_dt.strftime('%d %b %Y')
-                    }
-                })
-        
-        return pd.DataFrame(deadline_list), events, sorted(all_cpv_details)
-    
+        return _load_deadlines(tender_data_version(json_file), datetime.today().date())
     except Exception as e:
         st.error(f"❌ Error loading or processing file: {e}")
-        return pd.DataFrame(), [], []
+        return pd.DataFrame(), [], CpvIndex.from_lists([])
 
-def apply_filters(df, events, selected_cpv, selected_date):
-    """Apply filters to both dataframe and events"""
-    # Filter dataframe
-    filtered_df = df.copy()
-    
-    if selected_cpv != "All":
-        filtered_df = filtered_df[filtered_df["cpv_pairs"].apply(lambda x: selected_cpv in x)]
-    
-    filtered_df = filtered_df[filtered_df["deadline"] >= pd.Timestamp(selected_date)]
-    
-    # Filter events with consistent logic
-    filtered_events = []
-    for event in events:
-        # Check CPV filter
-        cpv_match = (selected_cpv == "All" or 
-                    selected_cpv in event.get('extendedProps', {}).get('cpv_pairs', []))
-        
-        # Check date filter
-        date_match = pd.to_datetime(event['start']) >= pd.Timestamp(selected_date)
-        
-        if cpv_match and date_match:
-            filtered_events.append(event)
-    
-    return filtered_df, filtered_events
+def apply_filters(df, events, cpv_index, selected_cpv, selected_date):
+    """Apply filters to both dataframe and events with one mask over their shared row order"""
+    rows = np.flatnonzero(filter_mask(df, cpv_index, selected_cpv, selected_date))
+    return df.iloc[rows], [events[i] for i in rows]
 
 def create_timeline_chart(df):
     """Create a timeline chart showing tender deadlines"""
@@ -260,51 +156,31 @@ def create_styled_table(df):
     if df.empty:
         return None
     
-    # Create a clean copy for display
-    display_df = df.copy()
-    
-    # Convert datetime to string and calculate days
-    display_df['deadline_str'] = display_df['deadline'].dt.strftime('%d %b %Y')
-    display_df['days_left'] = (display_df['deadline'] - pd.Timestamp.now()).dt.days
-    
-    # Add priority status
-    def get_priority_status(days):
-        if days <= 3:
-            return "🔴 Critical"
-        elif days <= 7:
-            return "🟠 Urgent"
-        elif days <= 14:
-            return "🟡 Soon"
-        elif days <= 30:
-            return "🟢 Normal"
-        else:
-            return "🔵 Future"
-    
-    display_df['Priority'] = display_df['days_left'].apply(get_priority_status)
+    # Display columns are built from the filtered rows directly rather than from a copy of the frame
+    days_left = (df['deadline'] - pd.Timestamp.now()).dt.days
+    priority = np.select(
+        [days_left <= 3, days_left <= 7, days_left <= 14, days_left <= 30],
+        ["🔴 Critical", "🟠 Urgent", "🟡 Soon", "🟢 Normal"],
+        default="🔵 Future"
+    )
     
     # Truncate long titles and CPV codes for better display
-    display_df['Title'] = display_df['title'].apply(lambda x: x[:60] + "..." if len(str(x)) > 60 else x)
-    display_df['CPV'] = display_df['cpv'].apply(lambda x: x[:80] + "..." if len(str(x)) > 80 else x)
-    
-    # Select and order columns for display
-    final_columns = {
-        'Priority': 'Priority',
-        'Title': 'Tender Title',
-        'deadline_str': 'Deadline',
-        'days_left': 'Days Left',
-        'organisation': 'Organisation',
-        'Contract location': 'Location',
-        'CPV': 'CPV Codes'
-    }
-    
-    # Filter available columns
-    available_cols = {k: v for k, v in final_columns.items() if k in display_df.columns}
-    final_df = display_df[list(available_cols.keys())].rename(columns=available_cols)
+    titles = df['title'].astype(str)
+    cpv = df['cpv'].astype(str)
     
-    return final_df
+    return pd.DataFrame({
+        'Priority': priority,
+        'Tender Title': titles.where(titles.str.len() <= 60, titles.str[:60] + "..."),
+        'Deadline': df['deadline'].dt.strftime('%d %b %Y'),
+        'Days Left': days_left,
+        'Organisation': df['organisation'],
+        'Location': df['Contract location'],
+        'CPV Codes': cpv.where(cpv.str.len() <= 80, cpv.str[:80] + "...")
+    }, index=df.index)
 
 # Load data
-df_deadlines, events, sorted_cpv_details = load_and_process_data()
+df_deadlines, events, cpv_index = load_and_process_data()
+sorted_cpv_details = cpv_index.code_texts()
 
 if df_deadlines.empty:
     st.warning("No tender data available.")
@@ -323,6 +199,7 @@ selected_cpv = st.sidebar.selectbox(
     "Select CPV Code", 
     options=cpv_options, 
     index=current_cpv_index,
+    format_func=lambda option: option if option == "All" else cpv_index.label(option),
     key="cpv_selectbox"
 )
 
@@ -377,12 +254,11 @@ st.session_state.selected_cpv = selected_cpv
 st.session_state.selected_date = selected_date
 
 # Apply filters
-filtered_df, filtered_events = apply_filters(df_deadlines, events, selected_cpv, selected_date)
+filtered_df, filtered_events = apply_filters(df_deadlines, events, cpv_index, selected_cpv, selected_date)
 
-# Aggregate tenders per location
+# Aggregate tenders per location, keeping the rows in step with filtered_events
 if not filtered_df.empty:
-    location_counts = filtered_df.groupby("Contract location").size().reset_index(name="Tender Count")
-    filtered_df = filtered_df.merge(location_counts, on="Contract location", how="left")
+    filtered_df = filtered_df.assign(**{"Tender Count": filtered_df.groupby("Contract location")["title"].transform("size")})
 
 # Layout: Callout Cards
 col1, col2, col3, col4 = st.columns(4)
@@ -458,14 +334,14 @@ with left:
                 # Show events list as fallback
                 st.subheader("Upcoming Deadlines")
                 for event in filtered_events[:10]:
-                    event_date = pd.to_datetime(event['start']).strftime('%d %b %Y')
-                    st.write(f"**{event_date}**: {event['title']}")
+                    st.write(f"**{event['extendedProps']['deadline_str']}**: {event['title']}")
         else:
             # Show events list as fallback
             st.subheader("Upcoming Deadlines")
-            for i, event in enumerate(filtered_events[:15]):
-                event_date = pd.to_datetime(event['start']).strftime('%d %b %Y')
-                days_until = (pd.to_datetime(event['start']) - pd.Timestamp.now()).days
+            # Events follow the rows of filtered_df, so their days left come from its deadline column
+            days_left = (filtered_df['deadline'].dt.normalize() - pd.Timestamp.now()).dt.days
+            for event, days_until in zip(filtered_events[:15], days_left.iloc[:15]):
+                event_date = event['extendedProps']['deadline_str']
                 
                 if days_until <= 3:
                     priority = "🔴"
@@ -527,9 +403,10 @@ if not filtered_df.empty:
     try:
         styled_table = create_styled_table(filtered_df)
         if styled_table is not None:
-            # Display with enhanced styling
-            st.dataframe(
+            # Display with enhanced styling, one page at a time
+            paginated_table(
                 styled_table,
+                key="deadlines",
                 use_container_width=True,
                 height=400,
                 column_config={
@@ -577,7 +454,7 @@ else:
 # Display filter summary
 st.sidebar.divider()
 st.sidebar.subheader("📊 Filter Summary")
-st.sidebar.write(f"**CPV Filter:** {selected_cpv}")
+st.sidebar.write(f"**CPV Filter:** {selected_cpv if selected_cpv == 'All' else cpv_index.label(selected_cpv)}")
 st.sidebar.write(f"**Date Filter:** From {selected_date}")
 st.sidebar.write(f"**Results:** {len(filtered_df)} tenders")
 
@@ -0,0 +1,230 @@
+"""Reading and writing tender JSON files.
+
+Tender files are {"metadata", "cpv_table", "tenders"} objects, with each
+tender's CPV codes packed against the file's CPV table (see cpv_table.py);
+files written before the table existed have no "cpv_table" and are read the
+same way. write_tender_file() writes that layout, with the metadata and table
+ahead of the tenders so readers can use them before the tender list starts.
+
+iter_tenders() yields one tender dict at a time, with the old cpv_codes and
+cpv_descriptions fields restored as it goes, and read_metadata() returns the
+metadata object without building the tender list, so validators and
+dashboards can work through multi-GB files in constant memory. Parsing is
+incremental with ijson when it is installed; otherwise the file is loaded
+whole and iterated, which gives the same results at the old memory
+cost.
+
+Whole-file reads and writes, and the JSONL log, go through dumps()/loads().
+They use orjson when it is installed, then msgspec, then the standard library
+json module. Output is compact by default; pass pretty=True (or set
+PRETTY_JSON) for the indented layout people read.
+
+Paths ending in .zst (tender_opportunities.json.zst, its .log.jsonl.zst log)
+are zstd-compressed. Every reader here decompresses them as a stream, so
+iter_tenders() stays in constant memory, and writers compress by the same
+rule, so any command given a .zst output path writes a compressed file.
+"""
+import io
+import json
+import os
+import random
+
+from cpv_table import CPV_TABLE_KEY, CpvTable, pack_tenders
+from tender_record import as_dict
+
+try:
+    import ijson
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Serialisation backend for tender files and logs: "orjson", "msgspec" or "json"
+JSON_BACKEND = "orjson" if orjson else "msgspec" if msgspec else "json"
+# Indent tender files for reading by eye; compact files are smaller and faster to write
+PRETTY_JSON = False
+# What loads() raises on malformed input, whichever backend is in use
+JSON_DECODE_ERRORS = (ValueError, msgspec.DecodeError) if msgspec else (ValueError,)
+ZSTD_SUFFIX = ".zst"
+# Fast level: snapshots are rewritten on every compaction, and higher levels gain little on tender JSON
+ZSTD_LEVEL = 3
+
+
+def is_compressed(path):
+    return os.fspath(path).endswith(ZSTD_SUFFIX)
+
+
+def find_tender_file(path):
+    """path, or its compressed path.zst when only that exists, so readers find either form of an output"""
+    if not os.path.exists(path) and os.path.exists(path + ZSTD_SUFFIX):
+        return path + ZSTD_SUFFIX
+    return path
+
+
+def _require_zstd(path):
+    if zstandard is None:
+        raise RuntimeError(f"{path} is zstd-compressed - install the zstandard package to use it")
+
+
+def open_tender_file(path):
+    """Binary reader for path, decompressing .zst files as they are read"""
+    if not is_compressed(path):
+        return open(path, 'rb')
+    _require_zstd(path)
+    # read_across_frames: appended logs are one zstd frame per append
+    reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True)
+    return io.BufferedReader(reader)
+
+
+def encode_for(path, data, compressed=None):
+    """Bytes as they should be written to path: one zstd frame for .zst paths (or compressed=True)"""
+    if not (is_compressed(path) if compressed is None else compressed):
+        return data
+    _require_zstd(path)
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+
+
+def dumps(obj, pretty=False, backend=None):
+    """Serialise to UTF-8 JSON bytes, indented by 2 with pretty=True"""
+    backend = backend or JSON_BACKEND
+    if backend == "orjson":
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if backend == "msgspec":
+        data = msgspec.json.encode(obj)
+        return msgspec.json.format(data, indent=2) if pretty else data
+    if pretty:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data, backend=None):
+    """Parse JSON from bytes or str"""
+    backend = backend or JSON_BACKEND
+    if backend == "orjson":
+        return orjson.loads(data)
+    if backend == "msgspec":
+        return msgspec.json.decode(data)
+    return json.loads(data)
+
+
+def _load_file(json_file):
+    with open_tender_file(json_file) as f:
+        return loads(f.read())
+
+
+# The peeks below reopen the file rather than seek back, as compressed streams only read forwards
+
+def _top_level_is_list(json_file):
+    """Peek at the first non-whitespace character: scraper outputs are objects, some exports bare lists"""
+    with open_tender_file(json_file) as f:
+        while True:
+            char = f.read(1)
+            if not char or not char.isspace():
+                return char == b'['
+
+
+def _has_cpv_table(json_file):
+    """Whether the object has a CPV table ahead of its tenders; only parses the keys before "tenders" """
+    with open_tender_file(json_file) as f:
+        for prefix, event, value in ijson.parse(f):
+            if prefix == '' and event == 'map_key' and value in (CPV_TABLE_KEY, 'tenders'):
+                return value == CPV_TABLE_KEY
+    return False
+
+
+def unpack_file_data(data):
+    """(metadata, tenders with the old CPV fields) from a parsed tender file or bare tender list"""
+    if isinstance(data, list):
+        return {}, data
+    table = CpvTable.from_json(data.get(CPV_TABLE_KEY))
+    return data.get('metadata', {}), [table.unpack(t) for t in data.get('tenders', [])]
+
+
+def read_tender_file(json_file):
+    """(metadata, tenders) of a whole tender file, like json.load with the CPV fields restored"""
+    return unpack_file_data(_load_file(json_file))
+
+
+def iter_tenders(json_file, packed=False):
+    """Yield the tenders of a tender file (or a bare list of tenders) one by one. With packed=True
+    tenders are yielded as stored, with integer "cpv" codes where the file packed them."""
+    if not IJSON_AVAILABLE:
+        data = _load_file(json_file)
+        if packed:
+            yield from data if isinstance(data, list) else data.get('tenders', [])
+        else:
+            yield from unpack_file_data(data)[1]
+        return
+    if _top_level_is_list(json_file):
+        with open_tender_file(json_file) as f:
+            yield from ijson.items(f, 'item', use_float=True)
+        return
+    table = None if packed else read_cpv_table(json_file)
+    with open_tender_file(json_file) as f:
+        # use_float keeps numbers as the float/int json.load would give instead of Decimal
+        for tender in ijson.items(f, 'tenders.item', use_float=True):
+            yield table.unpack(tender) if table else tender
+
+
+def read_cpv_table(json_file):
+    """The file's CpvTable (empty for files without one)"""
+    if not IJSON_AVAILABLE:
+        data = _load_file(json_file)
+        return CpvTable.from_json(None if isinstance(data, list) else data.get(CPV_TABLE_KEY))
+    if _top_level_is_list(json_file) or not _has_cpv_table(json_file):
+        return CpvTable()
+    with open_tender_file(json_file) as f:
+        # The table precedes the tenders, so this stops reading long before the end of the file
+        return CpvTable.from_json(next(ijson.items(f, CPV_TABLE_KEY)))
+
+
+def read_metadata(json_file):
+    """Return the file's metadata object ({} if it has none) without loading the tenders"""
+    if not IJSON_AVAILABLE:
+        data = _load_file(json_file)
+        return {} if isinstance(data, list) else data.get('metadata', {})
+    if _top_level_is_list(json_file):
+        return {}
+    with open_tender_file(json_file) as f:
+        # The scrapers write metadata first, so this normally stops after a few hundred bytes
+        for metadata in ijson.items(f, 'metadata', use_float=True):
+            return metadata
+    return {}
+
+
+def write_tender_file(json_file, metadata, tenders, pretty=None, compressed=None):
+    """Write tenders (dicts or Tender records) with their CPV codes packed against one CPV table.
+    The file is zstd-compressed if its name ends in .zst; pass compressed= when writing to a temporary name."""
+    table, packed = pack_tenders(as_dict(t) for t in tenders)
+    data = dumps({'metadata': metadata, CPV_TABLE_KEY: table, 'tenders': packed},
+                 pretty=PRETTY_JSON if pretty is None else pretty)
+    with open(json_file, 'wb') as f:
+        f.write(encode_for(json_file, data, compressed))
+
+
+def sample_tenders(tenders, k):
+    """Uniform random sample of up to k tenders from an iterator, keeping only k in memory (reservoir)"""
+    sample = []
+    for seen, tender in enumerate(tenders):
+        if seen < k:
+            sample.append(tender)
+        else:
+            slot = random.randint(0, seen)
+            if slot < k:
+                sample[slot] = tender
+    random.shuffle(sample)
+    return sample
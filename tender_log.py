@@ -0,0 +1,161 @@
+"""Append-only JSONL log of scraped tenders next to the JSON snapshot.
+
+A crawl appends each finished page's tenders to <snapshot>.log.jsonl instead
+of rewriting the whole snapshot, so per-page I/O grows with the page rather
+than with everything collected so far. Compaction folds the log into the
+canonical snapshot (same {"metadata", "tenders"} layout as before) and empties
+the log; it runs at the end of a crawl and every few pages in between.
+
+A log that starts with a reset record belongs to a crawl that replaces the
+snapshot, so the snapshot is ignored until the first compaction; otherwise
+log records are layered over the snapshot, later copies of a tender_id
+winning. load_tenders() returns that combined view for readers, and
+stream_tenders() yields it one tender at a time.
+
+A compressed snapshot (foo.json.zst) gets a compressed log (foo.log.jsonl.zst),
+written as one zstd frame per append.
+"""
+import os
+from datetime import datetime
+
+from backup_store import backup_snapshot
+from tender_io import (JSON_DECODE_ERRORS, ZSTD_SUFFIX, dumps, encode_for, find_tender_file, is_compressed,
+                       iter_tenders, loads, open_tender_file, read_metadata, read_tender_file, write_tender_file)
+from tender_record import as_dict
+
+LOG_SUFFIX = ".log.jsonl"
+
+
+def log_path_for(snapshot_path):
+    """output/foo.json -> output/foo.log.jsonl, output/foo.json.zst -> output/foo.log.jsonl.zst"""
+    if is_compressed(snapshot_path):
+        return log_path_for(snapshot_path[:-len(ZSTD_SUFFIX)]) + ZSTD_SUFFIX
+    root, ext = os.path.splitext(snapshot_path)
+    return f"{root if ext == '.json' else snapshot_path}{LOG_SUFFIX}"
+
+
+def merge_tenders(*tender_lists):
+    """Concatenate tender lists; a later copy of a tender_id replaces the earlier one in place"""
+    merged = []
+    index = {}
+    for tenders in tender_lists:
+        for tender in tenders:
+            tender_id = tender.get('tender_id')
+            if tender_id and tender_id in index:
+                merged[index[tender_id]] = tender
+                continue
+            if tender_id:
+                index[tender_id] = len(merged)
+            merged.append(tender)
+    return merged
+
+
+class TenderLog:
+    """JSONL append log plus compaction into the JSON snapshot it sits next to"""
+
+    def __init__(self, snapshot_path):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path_for(snapshot_path)
+
+    def start(self, replace=True):
+        """Begin a new log; with replace=True the crawl's tenders will replace the snapshot's on compaction"""
+        os.makedirs(os.path.dirname(self.log_path) or '.', exist_ok=True)
+        with open(self.log_path, 'wb') as f:
+            if replace:
+                f.write(encode_for(self.log_path,
+                                   dumps({'_reset': True, 'started_at': datetime.now().isoformat()}) + b"\n"))
+
+    def append(self, tenders):
+        """Append tenders (dicts or Tender records) as one JSON line each and flush them to disk"""
+        if not tenders:
+            return 0
+        with open(self.log_path, 'ab') as f:
+            f.write(encode_for(self.log_path, b"".join(dumps(as_dict(t)) + b"\n" for t in tenders)))
+            f.flush()
+            os.fsync(f.fileno())
+        return len(tenders)
+
+    def read_log(self):
+        """Return (reset, tenders) from the log; a torn last line from a crash is ignored"""
+        reset, tenders = False, []
+        if not os.path.exists(self.log_path):
+            return reset, tenders
+        with open_tender_file(self.log_path) as f:
+            for line_number, line in enumerate(f):
+                try:
+                    record = loads(line)
+                except JSON_DECODE_ERRORS:
+                    print(f"⚠️ Skipping unreadable line {line_number + 1} of {self.log_path}")
+                    continue
+                if record.get('_reset'):
+                    reset = line_number == 0
+                    continue
+                tenders.append(record)
+        return reset, tenders
+
+    def read_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return {}, []
+        return read_tender_file(self.snapshot_path)
+
+    def load(self):
+        """Return (metadata, tenders): the snapshot with the log applied on top"""
+        reset, logged = self.read_log()
+        metadata, snapshot_tenders = self.read_snapshot()
+        if reset:
+            metadata, snapshot_tenders = {}, []
+        return metadata, merge_tenders(snapshot_tenders, logged)
+
+    def stream(self):
+        """Return (metadata, tender iterator) like load(), streaming the snapshot instead of loading it.
+        Only the log, which compaction keeps to a few pages, is held in memory."""
+        reset, logged = self.read_log()
+        if reset or not os.path.exists(self.snapshot_path):
+            return {}, iter(merge_tenders(logged))
+        return read_metadata(self.snapshot_path), self._stream_merged(logged)
+
+    def _stream_merged(self, logged):
+        logged = merge_tenders(logged)
+        replacements = {t['tender_id']: t for t in logged if t.get('tender_id')}
+        replaced = set()
+        for tender in iter_tenders(self.snapshot_path):
+            tender_id = tender.get('tender_id')
+            if tender_id in replacements:
+                replaced.add(tender_id)
+                tender = replacements[tender_id]
+            yield tender
+        for tender in logged:
+            if tender.get('tender_id') not in replaced:
+                yield tender
+
+    def compact(self, metadata=None):
+        """Fold the log into the snapshot, write it atomically and empty the log; returns the tender count"""
+        reset, logged = self.read_log()
+        old_metadata, snapshot_tenders = ({}, []) if reset else self.read_snapshot()
+        tenders = merge_tenders(snapshot_tenders, logged)
+        metadata = {**old_metadata, **(metadata or {}), 'total_tenders': len(tenders)}
+
+        os.makedirs(os.path.dirname(self.snapshot_path) or '.', exist_ok=True)
+        tmp_path = f"{self.snapshot_path}.tmp"
+        write_tender_file(tmp_path, metadata, tenders, compressed=is_compressed(self.snapshot_path))
+        # The previous crawl's output is backed up once, when this crawl first replaces it; every compacted
+        # snapshot is backed up too, which only stores the tenders that changed since the last one
+        if reset and os.path.exists(self.snapshot_path):
+            backup_snapshot(self.snapshot_path)
+        os.replace(tmp_path, self.snapshot_path)
+        backup_snapshot(self.snapshot_path, tenders, metadata)
+        self.start(replace=False)
+        print(f"🗜️ Compacted {len(tenders)} tenders into {self.snapshot_path}")
+        return len(tenders)
+
+
+def load_tenders(snapshot_path):
+    """Load a tender file the way json.load would, including tenders still only in its log.
+    A compressed snapshot_path.zst is read when only that exists."""
+    metadata, tenders = TenderLog(find_tender_file(snapshot_path)).load()
+    return {'metadata': metadata, 'tenders': tenders}
+
+
+def stream_tenders(snapshot_path):
+    """(metadata, tender iterator) for a tender file, including its log, in constant memory"""
+    return TenderLog(find_tender_file(snapshot_path)).stream()
@@ -0,0 +1,192 @@
+"""Compact in-memory tender record.
+
+A crawl keeps every tender it has scraped in memory, and as plain dicts each
+one repeats its eleven keys, its detail labels and the organisation, location
+and CPV strings it shares with thousands of other tenders. Tender stores the
+same fields in __slots__, interns the strings that repeat across tenders,
+keeps the listing details as a flat tuple, holds dates as date/datetime
+objects and keeps CPV codes as integers against the shared CPV table, looking
+descriptions up only when they are read.
+
+Tender is a read-only Mapping over the JSON schema, so code that reads
+tender['title'] or tender.get('cpv_codes', []) works unchanged, and
+to_dict() / from_dict() convert to and from the dicts in the JSON files.
+Writers call as_dict() on anything that may be a record before serialising.
+"""
+import hashlib
+import json
+import re
+import sys
+from collections.abc import Mapping
+from datetime import date, datetime
+
+from cpv_table import cpv_table, unpack_code
+
+# Listing dates look like "16 September 2025,  3:00pm"; parsed once whitespace is normalised
+LISTING_DATETIME_FORMAT = "%d %B %Y, %I:%M%p"
+
+# Keys of the JSON schema, in the order the scrapers write them
+TENDER_FIELDS = ('title', 'link', 'organisation', 'description', 'details', 'publication_date_text',
+                 'publication_date_parsed', 'scraped_at', 'tender_id', 'cpv_codes', 'cpv_descriptions')
+# Listing details whose values repeat across many tenders
+INTERNED_DETAILS = frozenset({'Notice type', 'Contract location', 'Contract locations'})
+SUBMISSION_DEADLINE_KEY = 'Submission deadline'
+# Fields shown in a listing row; an amended notice changes at least one of them
+LISTING_FIELDS = ('title', 'organisation', 'description', 'details')
+# The full crawl keeps this many characters of a listing description, then "..."
+LISTING_DESCRIPTION_LENGTH = 200
+
+
+def parse_listing_datetime(text):
+    """'16 September 2025,  3:00pm' -> datetime, or None if missing/unparseable"""
+    if not text:
+        return None
+    try:
+        return datetime.strptime(re.sub(r"\s+", " ", text.strip()), LISTING_DATETIME_FORMAT)
+    except ValueError:
+        return None
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _parse_iso(value, parse):
+    """ISO text -> date/datetime; anything unparseable is kept as given so it serialises back unchanged"""
+    if not isinstance(value, str):
+        return value
+    try:
+        return parse(value)
+    except ValueError:
+        return value
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, (date, datetime)) else value
+
+
+class Tender(Mapping):
+    """One scraped tender, with dict-style read access under the JSON field names"""
+
+    __slots__ = ('title', 'link', 'organisation', 'description', '_details', 'publication_date_text',
+                 'publication_date', 'submission_deadline', 'scraped_at', 'tender_id',
+                 'cpv', '_cpv_text', '_extra')
+
+    def __init__(self, title, link, organisation, description, details, publication_date_text=None,
+                 publication_date=None, scraped_at=None, tender_id=None, cpv_codes=(), cpv_descriptions=()):
+        self.title = title
+        self.link = link
+        self.organisation = _intern(organisation)
+        self.description = description
+        flat = []
+        for key, value in (details or {}).items():
+            flat.append(sys.intern(key))
+            flat.append(_intern(value) if key in INTERNED_DETAILS else value)
+            if value == publication_date_text:
+                # Usually the 'Publication date' detail; share the string instead of keeping two copies
+                publication_date_text = flat[-1]
+        self._details = tuple(flat)
+        self.publication_date_text = publication_date_text
+        self.publication_date = publication_date
+        self.submission_deadline = parse_listing_datetime((details or {}).get(SUBMISSION_DEADLINE_KEY))
+        self.scraped_at = scraped_at
+        self.tender_id = tender_id
+        self._extra = None
+        self.set_cpv(cpv_codes, cpv_descriptions)
+
+    def set_cpv(self, cpv_codes, cpv_descriptions):
+        """Keep the codes as integers in the shared CPV table, or as given if they can't be packed"""
+        self.cpv = cpv_table.add(cpv_codes, cpv_descriptions)
+        self._cpv_text = None
+        if self.cpv is None:
+            self._cpv_text = (tuple(_intern(code) for code in cpv_codes or ()),
+                              tuple(_intern(description) for description in cpv_descriptions or ()))
+
+    @property
+    def cpv_codes(self):
+        if self._cpv_text is not None:
+            return self._cpv_text[0]
+        return tuple(unpack_code(code) for code in self.cpv)
+
+    @property
+    def cpv_descriptions(self):
+        if self._cpv_text is not None:
+            return self._cpv_text[1]
+        return tuple(cpv_table.descriptions(self.cpv))
+
+    @property
+    def details(self):
+        return dict(zip(self._details[::2], self._details[1::2]))
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a tender dict in the JSON schema; unknown keys are kept for to_dict()"""
+        tender = cls(
+            data.get('title'), data.get('link'), data.get('organisation'), data.get('description'),
+            data.get('details'), data.get('publication_date_text'),
+            _parse_iso(data.get('publication_date_parsed'), date.fromisoformat),
+            _parse_iso(data.get('scraped_at'), datetime.fromisoformat),
+            data.get('tender_id'), data.get('cpv_codes'), data.get('cpv_descriptions')
+        )
+        extra = {key: value for key, value in data.items() if key not in TENDER_FIELDS}
+        tender._extra = extra or None
+        return tender
+
+    def to_dict(self):
+        """The tender as a JSON-schema dict, identical to the one it was built from"""
+        data = {field: self[field] for field in TENDER_FIELDS}
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def __getitem__(self, key):
+        if key == 'details':
+            return self.details
+        if key == 'publication_date_parsed':
+            return _iso(self.publication_date)
+        if key == 'scraped_at':
+            return _iso(self.scraped_at)
+        if key in ('cpv_codes', 'cpv_descriptions'):
+            return list(getattr(self, key))
+        if key in TENDER_FIELDS:
+            return getattr(self, key)
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        yield from TENDER_FIELDS
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return len(TENDER_FIELDS) + len(self._extra or ())
+
+    def __reduce__(self):
+        # Pickle (e.g. back from backfill workers) as the dict, so strings are re-interned on arrival
+        return Tender.from_dict, (self.to_dict(),)
+
+    def __repr__(self):
+        return f"Tender({self.tender_id!r}, {self.title!r})"
+
+
+def listing_description(text):
+    """text cut to LISTING_DESCRIPTION_LENGTH characters plus "...", as the full crawl stores it; idempotent"""
+    return text[:LISTING_DESCRIPTION_LENGTH] + "..." if len(text) > LISTING_DESCRIPTION_LENGTH else text
+
+
+def listing_hash(tender):
+    """Hash of a tender's listing row (LISTING_FIELDS), so a rescrape can tell which notices were amended"""
+    # Missing and empty fields hash alike, as the tender store keeps no details as {}
+    row = [tender.get(field) or None for field in LISTING_FIELDS]
+    # Dailyscraper keeps the whole description and the full crawl a cut one; both hash the cut form
+    description = LISTING_FIELDS.index('description')
+    if row[description]:
+        row[description] = listing_description(row[description])
+    canonical = json.dumps(row, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.blake2b(canonical.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def as_dict(tender):
+    """JSON-ready dict for a Tender or a tender dict"""
+    return tender.to_dict() if isinstance(tender, Tender) else tender
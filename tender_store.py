@@ -0,0 +1,354 @@
+"""SQLite tender store shared by the scrapers and the dashboards.
+
+Tenders live in output/tenders.sqlite, keyed by tender_id, with indexes on
+publication date and submission deadline and a tender_cpv join table indexed
+by CPV code. The database runs in WAL mode, so a scraper writing new pages
+doesn't block a dashboard reading at the same time. Queries return the same
+tender dicts as the JSON files, and JSON import/export keeps those files
+working.
+
+Each row keeps the hash of its listing fields (tender_record.listing_hash).
+When an upsert changes that hash the notice has been amended, and the
+replaced version is kept, zlib-compressed, in tender_history; the scraper
+uses listing_hashes() to refetch only amended notices.
+
+Import existing outputs:  python tender_store.py import output/*.json
+Export to JSON:           python tender_store.py export output/tender_opportunities.json
+                          (or output/tender_opportunities.json.zst for a zstd-compressed export)
+Earlier versions:         python tender_store.py history <tender_id>
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+import zlib
+from datetime import datetime
+
+from tender_io import write_tender_file
+from tender_log import load_tenders, stream_tenders
+from tender_record import listing_hash, parse_listing_datetime
+
+TENDER_DB_PATH = "output/tenders.sqlite"
+# PRAGMA user_version of a store whose listing hashes follow tender_record.listing_hash;
+# 1: descriptions are hashed in their cut listing form
+LISTING_HASH_VERSION = 1
+# Source name that reads the tender store instead of a JSON tender file
+STORE_SOURCE = "store"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tenders (
+    tender_id TEXT PRIMARY KEY,
+    title TEXT,
+    link TEXT,
+    organisation TEXT,
+    description TEXT,
+    details TEXT,
+    publication_date_text TEXT,
+    publication_date TEXT,
+    published_at TEXT,
+    submission_deadline TEXT,
+    scraped_at TEXT,
+    listing_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tenders_publication_date ON tenders (publication_date);
+CREATE INDEX IF NOT EXISTS idx_tenders_submission_deadline ON tenders (submission_deadline);
+CREATE TABLE IF NOT EXISTS tender_cpv (
+    tender_id TEXT NOT NULL REFERENCES tenders (tender_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    cpv_code TEXT NOT NULL,
+    cpv_description TEXT,
+    PRIMARY KEY (tender_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_tender_cpv_code ON tender_cpv (cpv_code);
+CREATE TABLE IF NOT EXISTS tender_history (
+    tender_id TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    listing_hash TEXT,
+    replaced_at TEXT NOT NULL,
+    tender BLOB NOT NULL,
+    PRIMARY KEY (tender_id, version)
+);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+TENDER_COLUMNS = ("tender_id, title, link, organisation, description, details, "
+                  "publication_date_text, publication_date, scraped_at")
+
+
+class TenderStore:
+    """Indexed SQLite tender table plus CPV join table with a small data-access API"""
+
+    def __init__(self, path=TENDER_DB_PATH):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript(SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(tenders)")}
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if 'listing_hash' not in columns or version < LISTING_HASH_VERSION:
+                self._hash_listings(self._conn, add_column='listing_hash' not in columns)
+        return self._conn
+
+    @staticmethod
+    def _hash_listings(conn, add_column):
+        """Upgrade a store created before change detection, or hashed by an older listing_hash,
+        hashing the listing fields of every row once"""
+        rows = conn.execute("SELECT tender_id, title, organisation, description, details FROM tenders").fetchall()
+        with conn:
+            if add_column:
+                conn.execute("ALTER TABLE tenders ADD COLUMN listing_hash TEXT")
+            conn.executemany("UPDATE tenders SET listing_hash = ? WHERE tender_id = ?", [
+                (listing_hash({'title': title, 'organisation': organisation, 'description': description,
+                               'details': json.loads(details) if details else {}}), tender_id)
+                for tender_id, title, organisation, description, details in rows])
+            conn.execute(f"PRAGMA user_version = {LISTING_HASH_VERSION}")
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def upsert_tenders(self, tenders):
+        """Insert or replace tenders (and their CPV rows) in one transaction; returns the number written"""
+        # A batch can hold a notice twice (met on two listing pages, or repeated in an older output);
+        # the last copy wins, as it would across separate upserts
+        latest = {}
+        for tender in tenders:
+            if tender.get('tender_id'):
+                latest[tender['tender_id']] = tender
+        rows, cpv_rows, tender_ids = [], [], []
+        for tender_id, tender in latest.items():
+            details = tender.get('details') or {}
+            deadline = parse_listing_datetime(details.get('Submission deadline'))
+            published_at = parse_listing_datetime(tender.get('publication_date_text'))
+            rows.append((
+                tender_id, tender.get('title'), tender.get('link'), tender.get('organisation'),
+                tender.get('description'), json.dumps(details, ensure_ascii=False),
+                tender.get('publication_date_text'), tender.get('publication_date_parsed'),
+                published_at.isoformat() if published_at else None,
+                deadline.isoformat() if deadline else None, tender.get('scraped_at'), listing_hash(tender)
+            ))
+            tender_ids.append((tender_id,))
+            for position, (code, description) in enumerate(zip(tender.get('cpv_codes') or [],
+                                                              tender.get('cpv_descriptions') or [])):
+                cpv_rows.append((tender_id, position, code, description))
+        if not rows:
+            return 0
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                stored = self._stored_hashes(conn, [row[0] for row in rows])
+                amended = [row[0] for row in rows if row[0] in stored and stored[row[0]] != row[-1]]
+                if amended:
+                    self._record_history(conn, amended, stored)
+                conn.executemany("DELETE FROM tender_cpv WHERE tender_id = ?", tender_ids)
+                conn.executemany(
+                    "INSERT OR REPLACE INTO tenders (tender_id, title, link, organisation, description, details, "
+                    "publication_date_text, publication_date, published_at, submission_deadline, scraped_at, "
+                    "listing_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                conn.executemany("INSERT INTO tender_cpv (tender_id, position, cpv_code, cpv_description) "
+                                 "VALUES (?, ?, ?, ?)", cpv_rows)
+        return len(rows)
+
+    @staticmethod
+    def _stored_hashes(conn, tender_ids):
+        """{tender_id: listing hash} for the stored tenders among tender_ids"""
+        hashes = {}
+        for start in range(0, len(tender_ids), 500):
+            batch = tender_ids[start:start + 500]
+            hashes.update(conn.execute(f"SELECT tender_id, listing_hash FROM tenders "
+                                       f"WHERE tender_id IN ({','.join('?' * len(batch))})", batch))
+        return hashes
+
+    def _record_history(self, conn, tender_ids, stored_hashes):
+        """Copy the stored versions of tender_ids into tender_history before they are replaced"""
+        replaced_at = datetime.now().isoformat()
+        history = []
+        for start in range(0, len(tender_ids), 500):
+            batch = tender_ids[start:start + 500]
+            placeholders = ','.join('?' * len(batch))
+            versions = dict(conn.execute(f"SELECT tender_id, MAX(version) FROM tender_history "
+                                         f"WHERE tender_id IN ({placeholders}) GROUP BY tender_id", batch))
+            rows = conn.execute(f"SELECT {TENDER_COLUMNS} FROM tenders WHERE tender_id IN ({placeholders})",
+                                batch).fetchall()
+            for tender in self._rows_to_tenders(conn, rows):
+                tender_id = tender['tender_id']
+                data = json.dumps(tender, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                history.append((tender_id, versions.get(tender_id, 0) + 1, stored_hashes[tender_id], replaced_at,
+                                zlib.compress(data, 6)))
+        conn.executemany("INSERT INTO tender_history (tender_id, version, listing_hash, replaced_at, tender) "
+                         "VALUES (?, ?, ?, ?, ?)", history)
+
+    def _rows_to_tenders(self, conn, rows):
+        ids = [row[0] for row in rows]
+        cpvs = {tender_id: ([], []) for tender_id in ids}
+        # Fetch CPV rows in batches that stay under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            for tender_id, code, description in conn.execute(
+                    f"SELECT tender_id, cpv_code, cpv_description FROM tender_cpv "
+                    f"WHERE tender_id IN ({','.join('?' * len(batch))}) ORDER BY tender_id, position", batch):
+                cpvs[tender_id][0].append(code)
+                cpvs[tender_id][1].append(description)
+        return [{
+            'title': title,
+            'link': link,
+            'organisation': organisation,
+            'description': description,
+            'details': json.loads(details) if details else {},
+            'publication_date_text': publication_date_text,
+            'publication_date_parsed': publication_date,
+            'scraped_at': scraped_at,
+            'tender_id': tender_id,
+            'cpv_codes': cpvs[tender_id][0],
+            'cpv_descriptions': cpvs[tender_id][1]
+        } for (tender_id, title, link, organisation, description, details,
+               publication_date_text, publication_date, scraped_at) in rows]
+
+    def query(self, published_from=None, published_to=None, deadline_from=None, cpv_code=None, limit=None):
+        """Tenders newest first, optionally filtered by publication date, deadline (ISO strings) or CPV code"""
+        where, params = [], []
+        if published_from:
+            where.append("publication_date >= ?")
+            params.append(str(published_from))
+        if published_to:
+            where.append("publication_date <= ?")
+            params.append(str(published_to))
+        if deadline_from:
+            where.append("submission_deadline >= ?")
+            params.append(str(deadline_from))
+        if cpv_code:
+            where.append("tender_id IN (SELECT tender_id FROM tender_cpv WHERE cpv_code = ?)")
+            params.append(cpv_code)
+        sql = f"SELECT {TENDER_COLUMNS} FROM tenders"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        # Newest first, as the site lists them
+        sql += " ORDER BY published_at DESC, tender_id DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            conn = self._connection()
+            return self._rows_to_tenders(conn, conn.execute(sql, params).fetchall())
+
+    def iter_tenders(self, batch_size=500):
+        """Yield every tender newest first, fetching batch_size rows at a time"""
+        with self._lock:
+            self._connection()
+        # A separate read connection keeps one consistent WAL snapshot for the whole iteration
+        # without holding the shared connection's lock between batches
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            cursor = conn.execute(f"SELECT {TENDER_COLUMNS} FROM tenders ORDER BY published_at DESC, tender_id DESC")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from self._rows_to_tenders(conn, rows)
+        finally:
+            conn.close()
+
+    def get(self, tender_id):
+        with self._lock:
+            conn = self._connection()
+            rows = conn.execute(f"SELECT {TENDER_COLUMNS} FROM tenders WHERE tender_id = ?", (tender_id,)).fetchall()
+            return self._rows_to_tenders(conn, rows)[0] if rows else None
+
+    def listing_hashes(self, tender_ids):
+        """{tender_id: stored listing hash} for the tender_ids already in the store"""
+        with self._lock:
+            return self._stored_hashes(self._connection(), list(tender_ids))
+
+    def history(self, tender_id):
+        """Earlier versions of a tender, oldest first, as {'version', 'replaced_at', 'tender'} dicts"""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT version, replaced_at, tender FROM tender_history WHERE tender_id = ? ORDER BY version",
+                (tender_id,)).fetchall()
+        return [{'version': version, 'replaced_at': replaced_at, 'tender': json.loads(zlib.decompress(data))}
+                for version, replaced_at, data in rows]
+
+    def tender_ids(self):
+        with self._lock:
+            return {row[0] for row in self._connection().execute("SELECT tender_id FROM tenders")}
+
+    def count(self):
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM tenders").fetchone()[0]
+
+    def get_metadata(self):
+        with self._lock:
+            return {key: json.loads(value) for key, value in self._connection().execute("SELECT key, value FROM metadata")}
+
+    def set_metadata(self, **values):
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO metadata (key, value) VALUES (?, ?)",
+                                 [(key, json.dumps(value)) for key, value in values.items()])
+
+    def import_json(self, json_file):
+        """Upsert every tender from a scraper output file (and its pending log); returns the number imported"""
+        data = load_tenders(json_file)
+        imported = self.upsert_tenders(data['tenders'])
+        last_scraped = data['metadata'].get('last_scraped_at')
+        if last_scraped and last_scraped > (self.get_metadata().get('last_scraped_at') or ''):
+            self.set_metadata(last_scraped_at=last_scraped)
+        return imported
+
+    def export_json(self, json_file, **filters):
+        """Write tenders in the scrapers' JSON layout; returns the number exported"""
+        tenders = self.query(**filters)
+        metadata = dict(self.get_metadata(), total_tenders=len(tenders), last_updated=datetime.now().isoformat(),
+                        source_url="https://www.find-tender.service.gov.uk/Search/Results")
+        os.makedirs(os.path.dirname(json_file) or '.', exist_ok=True)
+        write_tender_file(json_file, metadata, tenders)
+        return len(tenders)
+
+
+# Shared store used by the scrapers and the dashboards
+tender_store = TenderStore()
+
+
+def load_tender_data(source):
+    """{'metadata', 'tenders'} for a dashboard from source: the tender store for STORE_SOURCE, otherwise the
+    JSON tender file (and its log) at that path. The store is only read when asked for by name"""
+    if source == STORE_SOURCE:
+        return {'metadata': tender_store.get_metadata(), 'tenders': tender_store.query()}
+    return load_tenders(source)
+
+
+def iter_tender_data(source):
+    """Streaming load_tender_data: (metadata, tender iterator), so callers that aggregate run in constant memory"""
+    if source == STORE_SOURCE:
+        return tender_store.get_metadata(), tender_store.iter_tenders()
+    return stream_tenders(source)
+
+
+if __name__ == "__main__":
+    command, paths = (sys.argv[1], sys.argv[2:]) if len(sys.argv) > 1 else ("", [])
+    if command == "import" and paths:
+        for json_file in paths:
+            print(f"📥 {json_file}: {tender_store.import_json(json_file)} tenders")
+        print(f"🗃️ Tender store {tender_store.path} now holds {tender_store.count()} tenders")
+    elif command == "export" and len(paths) == 1:
+        print(f"📤 Exported {tender_store.export_json(paths[0])} tenders to {paths[0]}")
+    elif command == "history" and len(paths) == 1:
+        versions = tender_store.history(paths[0])
+        for version in versions:
+            details = version['tender'].get('details') or {}
+            print(f"🕘 v{version['version']} replaced {version['replaced_at']}: {version['tender'].get('title')} "
+                  f"(deadline {details.get('Submission deadline', 'n/a')})")
+        print(f"📚 {len(versions)} earlier versions of {paths[0]}")
+    else:
+        print("Usage: python tender_store.py import <file.json> [...] | export <file.json> | history <tender_id>")
+        sys.exit(1)